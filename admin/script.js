@@ -22,17 +22,94 @@ async function detectAPI() {
 let dashboardData = null;
 let allPredictions = [];
 let filteredPredictions = [];
+let nextPredictionsCursor = null;
+
+// The predictions list only needs these columns, not the full input and result objects
+const PREDICTION_LIST_FIELDS = 'id,timestamp,prediction_type,outcome,success_probability,confidence_level';
 let allMessages = [];
 let filteredMessages = [];
+let dashboardRefreshTimer = null;
 
 // Initialize dashboard
 document.addEventListener('DOMContentLoaded', async () => {
     await detectAPI();
     initializeNavigation();
     loadDashboardData();
-    setInterval(loadDashboardData, 60000); // Auto-refresh every 60 seconds
+    startPolling();
+    connectEventStream();
 });
 
+// Auto-refresh every 60 seconds when the event stream is not available
+function startPolling() {
+    if (!dashboardRefreshTimer) {
+        dashboardRefreshTimer = setInterval(loadDashboardData, 60000);
+    }
+}
+
+function stopPolling() {
+    clearInterval(dashboardRefreshTimer);
+    dashboardRefreshTimer = null;
+}
+
+// Live updates pushed by the API; falls back to polling if the stream is unavailable
+function connectEventStream() {
+    if (!window.EventSource) return;
+    
+    const source = new EventSource(`${API_URL}/admin/events`);
+    source.onopen = () => stopPolling();
+    source.onerror = () => {
+        // The browser reconnects on its own unless the stream is gone for good (e.g. an older API)
+        startPolling();
+        if (source.readyState === EventSource.CLOSED) {
+            console.log('Admin event stream unavailable, polling instead');
+        }
+    };
+    
+    source.addEventListener('counters', event => {
+        const counters = JSON.parse(event.data);
+        dashboardData = Object.assign(dashboardData || {}, counters);
+        updateOverviewStats();
+        updateUnreadBadge(counters.unread_messages || 0);
+        updateLastUpdated();
+    });
+    
+    source.addEventListener('prediction', event => {
+        const prediction = JSON.parse(event.data);
+        if (dashboardData) {
+            dashboardData.recent_predictions = [prediction, ...(dashboardData.recent_predictions || [])].slice(0, 10);
+            const byDate = dashboardData.predictions_by_date || {};
+            const date = prediction.timestamp.slice(0, 10);
+            byDate[date] = (byDate[date] || 0) + 1;
+            dashboardData.predictions_by_date = Object.fromEntries(Object.entries(byDate).sort().slice(-7));
+            renderRecentPredictions();
+            renderPredictionsChart();
+        }
+        if (document.getElementById('predictions-section').classList.contains('active')) {
+            allPredictions.unshift(prediction);
+            searchPredictions();
+        }
+    });
+    
+    source.addEventListener('feedback', event => {
+        allMessages.unshift(JSON.parse(event.data));
+        if (document.getElementById('messages-section').classList.contains('active')) {
+            searchMessages();
+        }
+    });
+    
+    source.addEventListener('feedback_read', event => {
+        const { id } = JSON.parse(event.data);
+        const message = allMessages.find(msg => msg.id === id);
+        if (message) {
+            message.status = 'read';
+            searchMessages();
+        }
+    });
+    
+    // Sent when predictions were cleared, or when this tab fell too far behind
+    ['predictions_cleared', 'resync'].forEach(name => source.addEventListener(name, () => refreshDashboard()));
+}
+
 // Navigation
 function initializeNavigation() {
     const navItems = document.querySelectorAll('.nav-item');
@@ -203,9 +280,10 @@ function renderRecentPredictions() {
 async function loadAllPredictions() {
     showLoading(true);
     try {
-        const response = await fetch(`${API_URL}/admin/predictions?limit=100`);
+        const response = await fetch(`${API_URL}/admin/predictions?limit=100&fields=${PREDICTION_LIST_FIELDS}`);
         const data = await response.json();
         allPredictions = data.predictions || [];
+        nextPredictionsCursor = data.next_cursor || null;
         filteredPredictions = [...allPredictions];
         renderAllPredictions();
     } catch (error) {
@@ -216,20 +294,52 @@ async function loadAllPredictions() {
     }
 }
 
+// Load the next page after the last loaded prediction
+async function loadMorePredictions() {
+    if (!nextPredictionsCursor) return;
+    showLoading(true);
+    try {
+        const response = await fetch(`${API_URL}/admin/predictions?limit=100&fields=${PREDICTION_LIST_FIELDS}&cursor=${encodeURIComponent(nextPredictionsCursor)}`);
+        const data = await response.json();
+        allPredictions = allPredictions.concat(data.predictions || []);
+        nextPredictionsCursor = data.next_cursor || null;
+        searchPredictions();
+    } catch (error) {
+        console.error('Error loading predictions:', error);
+        showToast('Failed to load predictions', 'error');
+    } finally {
+        showLoading(false);
+    }
+}
+
 function renderAllPredictions() {
     const container = document.getElementById('all-predictions-list');
+    const loadMore = nextPredictionsCursor
+        ? '<button class="view-all-btn" onclick="loadMorePredictions()">Load more</button>'
+        : '';
     
     if (filteredPredictions.length === 0) {
-        container.innerHTML = '<div class="empty-state"><i class="fas fa-inbox"></i><h3>No predictions found</h3><p>Try adjusting your filters</p></div>';
+        container.innerHTML = '<div class="empty-state"><i class="fas fa-inbox"></i><h3>No predictions found</h3><p>Try adjusting your filters</p></div>' + loadMore;
         return;
     }
     
-    container.innerHTML = filteredPredictions.map(pred => createPredictionHTML(pred, true)).join('');
+    container.innerHTML = filteredPredictions.map(pred => createPredictionHTML(pred, true)).join('') + loadMore;
+}
+
+// Full entries carry prediction_result; list pages carry the flat outcome columns instead
+function predictionResult(prediction) {
+    if (prediction.prediction_result) return prediction.prediction_result;
+    const isNewBusiness = prediction.prediction_type === 'new_business';
+    return {
+        prediction: isNewBusiness ? prediction.outcome : (prediction.outcome === 1 ? 'Success' : 'Failure'),
+        success_probability: prediction.success_probability,
+        confidence_level: prediction.confidence_level
+    };
 }
 
 function createPredictionHTML(prediction, detailed = false) {
     const isNewBusiness = prediction.prediction_type === 'new_business';
-    const result = prediction.prediction_result;
+    const result = predictionResult(prediction);
     const isSuccess = isNewBusiness ? result.prediction === 1 : result.prediction === 'Success';
     
     const probability = (result.success_probability * 100).toFixed(1);
@@ -281,7 +391,7 @@ function searchPredictions() {
         const matchesSearch = searchTerm === '' || 
             pred.id.toString().includes(searchTerm) ||
             pred.prediction_type.includes(searchTerm) ||
-            JSON.stringify(pred.prediction_result).toLowerCase().includes(searchTerm);
+            JSON.stringify(predictionResult(pred)).toLowerCase().includes(searchTerm);
         
         return matchesFilter && matchesSearch;
     });
@@ -489,9 +599,9 @@ function renderDistributionChart() {
 function renderConfidenceChart() {
     const newBusinessPredictions = allPredictions.filter(p => p.prediction_type === 'new_business');
     
-    const high = newBusinessPredictions.filter(p => p.prediction_result.confidence_level === 'High').length;
-    const medium = newBusinessPredictions.filter(p => p.prediction_result.confidence_level === 'Medium').length;
-    const low = newBusinessPredictions.filter(p => p.prediction_result.confidence_level === 'Low').length;
+    const high = newBusinessPredictions.filter(p => predictionResult(p).confidence_level === 'High').length;
+    const medium = newBusinessPredictions.filter(p => predictionResult(p).confidence_level === 'Medium').length;
+    const low = newBusinessPredictions.filter(p => predictionResult(p).confidence_level === 'Low').length;
     const total = high + medium + low;
     
     if (total === 0) {
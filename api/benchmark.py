@@ -0,0 +1,389 @@
+"""
+In-process benchmark suite for the scoring, explanation and logging paths
+
+Times each path separately for both models, from realistic payloads drawn
+from data/sme_best_enhanced.csv and data/sme_final_15k_enhanced.csv:
+    score / explain        the model call and SHAP recommendations, single row and batch of N
+    explain_fast           scoring plus tree-path recommendations from one walk over the compiled trees
+    endpoint               POST through the FastAPI app (validation, pool, logging), single row and batch of N
+    log_append             inserting a batch into the prediction store as the log grows
+    startup                importing the app and loading models, with explanations on and off by default
+
+Usage (from the api directory):
+    python benchmark.py [--rows 200] [--batch-size 100] [--repeat 3] [--agreement-rows 400] [--output benchmark_results.json]
+    python benchmark.py --compare baseline.json [--tolerance 0.25]
+    python benchmark.py --current benchmark_results.json --compare baseline.json
+
+The report also records how often the fast tree-path attributions pick the
+same top-5 features as exact SHAP (--agreement-rows rows per model).
+
+Save a run's output as the baseline; --compare exits with status 1 when a
+case's median latency is more than `tolerance` slower than the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+import main
+from model_registry import ModelVersion
+from payloads import load_existing_business_payloads, load_new_business_payloads
+from prediction_cache import PredictionCache
+from prediction_log import PredictionLogWriter
+from scoring import score
+from store import SQLiteStore
+
+# Log sizes at which the append cost is measured
+LOG_SIZES = (0, 10000, 50000)
+
+# Run in a fresh interpreter per startup sample: seconds to import and load, then peak RSS in KiB
+STARTUP_SCRIPT = (
+    "import resource, time; start = time.perf_counter(); import main; main.load_models(); "
+    "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss); "
+    "import json; print(json.dumps(main.startup_profile.totals()))"
+)
+
+
+# ----- payloads -----
+
+def existing_business_matrix(payloads: List[Dict[str, Any]]) -> np.ndarray:
+    """Scaled feature matrix, as the batch endpoint builds it"""
+    businesses = [main.ExistingBusinessData(**payload) for payload in payloads]
+    columns = main.sanitize_existing_business_batch(businesses)
+    engineered = main.engineer_features_batch(columns)
+    encoded = main.encode_categorical_features_batch([business.business_sector for business in businesses], engineered)
+    return main.feature_scaler.transform(main.build_existing_feature_matrix(columns, engineered, encoded))
+
+
+# ----- timing -----
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 3) -> List[float]:
+    """Seconds per call of fn(i) for i in range(iterations), after a few warmup calls"""
+    for i in range(min(warmup, iterations)):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples: List[float], rows_per_call: int = 1) -> Dict[str, float]:
+    """Latency percentiles in milliseconds, plus per-row time and throughput"""
+    ordered = sorted(samples)
+
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    mean = statistics.fmean(samples)
+    return {
+        "calls": len(samples),
+        "rows_per_call": rows_per_call,
+        "mean_ms": round(mean * 1000, 4),
+        "p50_ms": round(percentile(0.50), 4),
+        "p95_ms": round(percentile(0.95), 4),
+        "p99_ms": round(percentile(0.99), 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "per_row_ms": round(mean * 1000 / rows_per_call, 4),
+        "rows_per_second": round(rows_per_call / mean, 1) if mean > 0 else 0.0
+    }
+
+
+def best_of(repeat: int, run: Callable[[], List[float]], rows_per_call: int = 1) -> Dict[str, float]:
+    """Summary of the repetition with the lowest median, which filters out background noise"""
+    runs = [run() for _ in range(max(1, repeat))]
+    return summarize(min(runs, key=statistics.median), rows_per_call)
+
+
+# ----- benchmark cases -----
+
+def benchmark_models(results: Dict[str, Dict[str, float]], new_payloads, existing_payloads, batch_size: int, repeat: int):
+    """Model-call and SHAP explanation latency, without the HTTP layer"""
+    models = main.model_registry.active("new_business")
+    if models is not None:
+        processed = main.preprocess_business_batch(new_payloads)[0]
+        batches = max(3, len(processed) // batch_size)
+        batch = np.resize(processed, (batch_size, processed.shape[1]))
+        results["new_business.score.single"] = best_of(repeat, lambda: measure(
+            lambda i: score(main.new_business_scorer, processed[i % len(processed)][None, :], main.NEW_BUSINESS_DECISION_THRESHOLD),
+            len(processed)))
+        results[f"new_business.score.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: score(main.new_business_scorer, batch, main.NEW_BUSINESS_DECISION_THRESHOLD), batches), batch_size)
+        results["new_business.explain.single"] = best_of(repeat, lambda: measure(
+            lambda i: main.generate_new_business_recommendations(new_payloads[i], 0.5, processed[i][None, :], models),
+            min(len(processed), 50)))
+        results[f"new_business.explain.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: main.generate_new_business_recommendations_batch(batch, models), batches), batch_size)
+        results["new_business.explain_fast.single"] = best_of(repeat, lambda: measure(
+            lambda i: fast_explain(models, main.PREDICTION_FEATURES, processed[i % len(processed)][None, :]),
+            len(processed)))
+        results[f"new_business.explain_fast.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: fast_explain(models, main.PREDICTION_FEATURES, batch),
+            batches), batch_size)
+
+    models = main.model_registry.active("existing_business")
+    if models is not None:
+        scaled = existing_business_matrix(existing_payloads)
+        batches = max(3, len(scaled) // batch_size)
+        batch = np.resize(scaled, (batch_size, scaled.shape[1]))
+        results["existing_business.score.single"] = best_of(repeat, lambda: measure(
+            lambda i: score(main.existing_business_scorer, scaled[i % len(scaled)][None, :], main.EXISTING_BUSINESS_DECISION_THRESHOLD),
+            len(scaled)))
+        results[f"existing_business.score.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: score(main.existing_business_scorer, batch, main.EXISTING_BUSINESS_DECISION_THRESHOLD), batches), batch_size)
+        results["existing_business.explain.single"] = best_of(repeat, lambda: measure(
+            lambda i: main.generate_existing_business_recommendations(None, {}, 0.5, scaled[i], models),
+            min(len(scaled), 50)))
+        results[f"existing_business.explain.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: main.generate_existing_business_recommendations_batch(batch, models), batches), batch_size)
+        results["existing_business.explain_fast.single"] = best_of(repeat, lambda: measure(
+            lambda i: fast_explain(models, main.feature_names, scaled[i % len(scaled)][None, :]),
+            len(scaled)))
+        results[f"existing_business.explain_fast.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: fast_explain(models, main.feature_names, batch),
+            batches), batch_size)
+
+
+def fast_explain(models: ModelVersion, features: List[str], X: np.ndarray):
+    """Score and explain a matrix from one tree-path walk, as the explain_method=fast requests do"""
+    probabilities, contributions = main.walk_tree_paths(models, X)
+    return probabilities, main.tree_path_recommendations(features, contributions, [], len(X))
+
+
+# ----- attribution agreement -----
+
+def top_k_agreement(exact: np.ndarray, fast: np.ndarray, k: int = 5) -> Dict[str, float]:
+    """How often two attributions of the same rows rank the same features highest by magnitude"""
+    exact_top = np.argsort(-np.abs(exact), axis=1, kind="stable")[:, :k]
+    fast_top = np.argsort(-np.abs(fast), axis=1, kind="stable")[:, :k]
+    overlap = np.array([len(set(a) & set(b)) for a, b in zip(exact_top, fast_top)])
+    return {
+        "rows": len(exact),
+        "top_k": k,
+        "same_set": round(float(np.mean(overlap == k)), 4),
+        "same_order": round(float(np.mean(np.all(exact_top == fast_top, axis=1))), 4),
+        "mean_overlap": round(float(np.mean(overlap)) / k, 4),
+        "top1": round(float(np.mean(exact_top[:, 0] == fast_top[:, 0])), 4)
+    }
+
+
+def attribution_agreement(rows: int) -> Dict[str, Dict[str, float]]:
+    """Top-5 agreement of the fast tree-path attributions with exact SHAP, per model"""
+    matrices = {}
+    if main.trained_model is not None:
+        matrices["new_business"] = main.preprocess_business_batch(load_new_business_payloads(rows))[0]
+    if main.xgb_model is not None:
+        matrices["existing_business"] = existing_business_matrix(load_existing_business_payloads(rows))
+
+    agreement = {}
+    for name, X in matrices.items():
+        models = main.model_registry.active(name)
+        exact = main.positive_class_shap_values(main.shap_explainers.get(models.name, models.model).shap_values(X))
+        _, fast = main.shap_explainers.tree_paths(models.name, models.model).predict_proba_with_contributions(X)
+        agreement[name] = top_k_agreement(exact, fast)
+    return agreement
+
+
+def benchmark_endpoints(results: Dict[str, Dict[str, float]], client, new_payloads, existing_payloads, batch_size: int, repeat: int):
+    """End-to-end latency through the app, with the response cache off so every call is scored"""
+
+    def post(path: str, payload: Any):
+        response = client.post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+
+    if main.trained_model is not None:
+        batch = (new_payloads * (batch_size // len(new_payloads) + 1))[:batch_size]
+        results["new_business.endpoint.single"] = best_of(repeat, lambda: measure(
+            lambda i: post("/predict", new_payloads[i % len(new_payloads)]), min(len(new_payloads), 100)))
+        results[f"new_business.endpoint.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: post("/batch-predict", batch), 3), batch_size)
+
+    if main.xgb_model is not None:
+        batch = (existing_payloads * (batch_size // len(existing_payloads) + 1))[:batch_size]
+        results["existing_business.endpoint.single"] = best_of(repeat, lambda: measure(
+            lambda i: post("/predict-existing-business", existing_payloads[i % len(existing_payloads)]), min(len(existing_payloads), 100)))
+        results[f"existing_business.endpoint.batch_{batch_size}"] = best_of(repeat, lambda: measure(
+            lambda i: post("/batch-predict-existing-business", batch), 3), batch_size)
+
+
+def benchmark_log_append(results: Dict[str, Dict[str, float]], new_payloads, batch_size: int, log_dir: str):
+    """Cost of appending a batch of log entries once the log already holds N rows"""
+    store = SQLiteStore(os.path.join(log_dir, "log_append.db"), legacy_prediction_files=[], legacy_feedback_file=None)
+    writer = PredictionLogWriter(store)
+    result = {"prediction": 1, "prediction_label": "Successful", "success_probability": 0.8, "confidence_level": "High"}
+    entries = [("new_business", new_payloads[i % len(new_payloads)], result) for i in range(batch_size)]
+    try:
+        for size in LOG_SIZES:
+            while store.count_predictions() < size:
+                writer.append(entries * 10)
+            results[f"log_append.batch_{batch_size}.at_{size}"] = summarize(measure(lambda i: writer.append(entries), 20), batch_size)
+    finally:
+        writer.close()
+        store.close()
+
+
+def benchmark_startup(results: Dict[str, Dict[str, float]], repeat: int, log_dir: str):
+    """Cold start (import, model load, explainer build) with explanations on and off by default.
+
+    Each startup phase from the startup profile (e.g. startup.explain_on.import.shap)
+    is a case of its own, so --compare points at the import or load that regressed.
+    """
+    for label, explain in (("explain_on", "1"), ("explain_off", "0")):
+        env = dict(os.environ, EXPLAIN_BY_DEFAULT=explain, STORE_DB_FILE=os.path.join(log_dir, "startup.db"))
+        samples, peak_rss = [], 0
+        phase_samples: Dict[str, List[float]] = {}
+        for _ in range(max(1, repeat)):
+            output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=env, capture_output=True, text=True, check=True).stdout
+            lines = output.strip().splitlines()
+            seconds, rss_kib = lines[-2].split()
+            samples.append(float(seconds))
+            peak_rss = max(peak_rss, int(rss_kib))
+            for phase, phase_seconds in json.loads(lines[-1]).items():
+                phase_samples.setdefault(phase, []).append(phase_seconds)
+        results[f"startup.{label}"] = {**summarize(samples), "peak_rss_mb": round(peak_rss / 1024, 1)}
+        for phase, values in phase_samples.items():
+            results[f"startup.{label}.{phase}"] = summarize(values)
+
+
+def run_benchmarks(rows: int, batch_size: int, repeat: int, agreement_rows: int = 400) -> Dict[str, Any]:
+    new_payloads = load_new_business_payloads(rows)
+    existing_payloads = load_existing_business_payloads(rows)
+    results: Dict[str, Dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Keep the benchmark's predictions out of the real store and off the response cache
+        original = main.store, main.prediction_log, main.prediction_cache
+        main.store = SQLiteStore(os.path.join(log_dir, "benchmark.db"), legacy_prediction_files=[], legacy_feedback_file=None)
+        main.prediction_log = PredictionLogWriter(main.store)
+        main.prediction_cache = PredictionCache(max_size=0)
+        try:
+            from fastapi.testclient import TestClient
+            with TestClient(main.app) as client:
+                benchmark_models(results, new_payloads, existing_payloads, batch_size, repeat)
+                benchmark_endpoints(results, client, new_payloads, existing_payloads, batch_size, repeat)
+                agreement = attribution_agreement(agreement_rows) if agreement_rows else {}
+        finally:
+            main.prediction_log.close()
+            main.store.close()
+            main.store, main.prediction_log, main.prediction_cache = original
+
+        benchmark_log_append(results, new_payloads, batch_size, log_dir)
+        benchmark_startup(results, repeat, log_dir)
+
+    return {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "rows": rows,
+            "batch_size": batch_size,
+            "repeat": repeat,
+            "settings": {
+                name: os.environ[name]
+                for name in ("COMPILED_TREE_MODELS", "COMPILED_TREE_MAX_ROWS", "INFERENCE_POOL_MODE",
+                             "INFERENCE_POOL_SIZE", "COALESCE_WINDOW_MS", "METRICS_ENABLED", "EXPLAIN_BY_DEFAULT")
+                if name in os.environ
+            }
+        },
+        "results": results,
+        "attribution_agreement": agreement
+    }
+
+
+# ----- baseline comparison -----
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                    metric: str = "p50_ms") -> List[Dict[str, Any]]:
+    """Per-case change against the baseline; a case regresses when it is more than tolerance slower"""
+    comparison = []
+    for case, stats in sorted(current["results"].items()):
+        base = baseline["results"].get(case)
+        if base is None or not base.get(metric):
+            comparison.append({"case": case, "current": stats[metric], "baseline": None, "change": None, "regression": False})
+            continue
+        change = stats[metric] / base[metric] - 1
+        comparison.append({
+            "case": case,
+            "current": stats[metric],
+            "baseline": base[metric],
+            "change": round(change, 4),
+            "regression": change > tolerance
+        })
+    return comparison
+
+
+def print_results(results: Dict[str, Dict[str, float]]):
+    print(f"{'case':48} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'per row ms':>11}")
+    for case, stats in results.items():
+        print(f"{case:48} {stats['p50_ms']:10.3f} {stats['p95_ms']:10.3f} {stats['p99_ms']:10.3f} {stats['per_row_ms']:11.4f}")
+
+
+def print_agreement(agreement: Dict[str, Dict[str, float]]):
+    print(f"\n{'tree-path vs SHAP':24} {'rows':>6} {'same set':>9} {'same order':>11} {'overlap':>8} {'top-1':>7}")
+    for name, stats in agreement.items():
+        print(f"{name:24} {stats['rows']:6d} {stats['same_set']:9.1%} {stats['same_order']:11.1%} "
+              f"{stats['mean_overlap']:8.1%} {stats['top1']:7.1%}")
+
+
+def print_comparison(comparison: List[Dict[str, Any]], tolerance: float):
+    print(f"\n{'case':48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in comparison:
+        if row["baseline"] is None:
+            print(f"{row['case']:48} {'-':>10} {row['current']:10.3f} {'new':>8}")
+            continue
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:48} {row['baseline']:10.3f} {row['current']:10.3f} {row['change']:+8.1%}{flag}")
+    regressions = sum(row["regression"] for row in comparison)
+    print(f"\n{regressions} regression(s) beyond {tolerance:.0%}")
+
+
+def main_benchmark(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200, help="payloads drawn from each dataset")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--agreement-rows", type=int, default=400,
+                        help="rows per model for the tree-path vs SHAP agreement report (0 to skip)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against this results file")
+    parser.add_argument("--current", metavar="RESULTS", help="compare this results file instead of running the benchmarks")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown of the median, as a fraction")
+    args = parser.parse_args(argv)
+
+    if args.current:
+        with open(args.current) as f:
+            report = json.load(f)
+    else:
+        report = run_benchmarks(args.rows, args.batch_size, args.repeat, args.agreement_rows)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print_results(report["results"])
+        print_agreement(report["attribution_agreement"])
+        print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparison = compare_results(report, baseline, args.tolerance)
+        print_comparison(comparison, args.tolerance)
+        if any(row["regression"] for row in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
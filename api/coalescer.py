@@ -0,0 +1,124 @@
+"""
+Micro-batching coalescer for single-row prediction requests
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Coalescing configuration (override with environment variables); a window of 0 disables coalescing
+COALESCE_WINDOW_MS = float(os.environ.get("COALESCE_WINDOW_MS", 0))
+COALESCE_MAX_BATCH_SIZE = int(os.environ.get("COALESCE_MAX_BATCH_SIZE", 64))
+
+# Number of recent waits kept for the latency percentile
+_WAIT_SAMPLES = 1000
+
+
+class RequestCoalescer:
+    """Gathers concurrent requests into one batch call.
+
+    The first request into an empty queue opens a window of window_ms; the
+    batch is flushed when the window closes or max_batch_size requests have
+    arrived, whichever comes first. batch_fn receives the items in arrival
+    order and must return one result per item in the same order.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+                 window_ms: float = COALESCE_WINDOW_MS, max_batch_size: int = COALESCE_MAX_BATCH_SIZE):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._flush_handle = None
+        self._tasks = set()
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.batch_size_histogram: Dict[str, int] = {}
+        self.max_batch_seen = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent_waits = deque(maxlen=_WAIT_SAMPLES)
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0 and self.max_batch_size > 1
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its own result from the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        self._record_batch(batch)
+        try:
+            results = await self.batch_fn([item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        flushed_at = time.perf_counter()
+        size = len(batch)
+        self.batches += 1
+        self.items += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+
+        # Power-of-two buckets: "1", "2", "3-4", "5-8", ...
+        upper = 1 << (size - 1).bit_length()
+        lower = upper // 2 + 1 if upper > 2 else upper
+        bucket = str(upper) if lower == upper else f"{lower}-{upper}"
+        self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+        for _, _, enqueued_at in batch:
+            wait = flushed_at - enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent_waits.append(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Achieved batch sizes and the queueing latency they add"""
+        recent = sorted(self._recent_waits)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "requests": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "largest_batch": self.max_batch_seen,
+            "batch_size_histogram": dict(self.batch_size_histogram),
+            "mean_added_latency_ms": round(self.total_wait / self.items * 1000, 3) if self.items else 0,
+            "p95_added_latency_ms": round(p95 * 1000, 3),
+            "max_added_latency_ms": round(self.max_wait * 1000, 3)
+        }
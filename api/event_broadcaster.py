@@ -0,0 +1,125 @@
+"""
+In-process broadcaster for the admin server-sent events stream
+"""
+
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Set
+
+# Stream configuration (override with environment variables)
+EVENT_STREAM_QUEUE_SIZE = int(os.environ.get("EVENT_STREAM_QUEUE_SIZE", 256))
+EVENT_STREAM_HEARTBEAT_SECONDS = float(os.environ.get("EVENT_STREAM_HEARTBEAT_SECONDS", 15))
+
+# Sent in place of the events a slow subscriber missed; the client reloads over REST
+RESYNC_EVENT = "event: resync\ndata: {}\n\n"
+
+
+class Subscription:
+    """One client's bounded queue of encoded events"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Next encoded event, an SSE comment after `timeout` idle seconds, or None once the broadcaster closes"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return ": heartbeat\n\n"
+
+
+class EventBroadcaster:
+    """Fans events out to every connected admin stream.
+
+    Each event is encoded once and put on every subscriber's bounded queue.
+    A subscriber that falls queue_size events behind has its backlog
+    replaced by a single resync event instead of holding up the others or
+    growing without bound. publish() may be called from any thread.
+    """
+
+    def __init__(self, queue_size: int = EVENT_STREAM_QUEUE_SIZE):
+        self.queue_size = max(1, queue_size)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_id = 1
+
+        # Metrics
+        self.published = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Register a stream; must be called on the event loop that serves it"""
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Send an event to every subscriber; a no-op when nobody is listening"""
+        with self._lock:
+            if not self._subscribers or self._loop is None or self._loop.is_closed():
+                return
+            event_id, self._next_id = self._next_id, self._next_id + 1
+            loop = self._loop
+        message = f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        self.published += 1
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(message)
+        else:
+            loop.call_soon_threadsafe(self._deliver, message)
+
+    def close(self):
+        """End every open stream, e.g. on shutdown"""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, set()
+        for subscription in subscribers:
+            self._replace_backlog(subscription, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {
+            "subscribers": subscribers,
+            "published": self.published,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs
+        }
+
+    def _deliver(self, message: str):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and tell it to reload
+                missed = subscription.queue.qsize() + 1
+                subscription.dropped += missed
+                self.dropped += missed
+                self.resyncs += 1
+                self._replace_backlog(subscription, RESYNC_EVENT)
+
+    @staticmethod
+    def _replace_backlog(subscription: Subscription, message: Optional[str]):
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(message)
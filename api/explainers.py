@@ -0,0 +1,129 @@
+"""
+SHAP explainer and tree-path attribution cache shared by the prediction APIs
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from startup_profile import startup_profile
+from tree_engine import compile_shared
+
+# Explanation configuration (override with environment variables). With
+# EXPLAIN_BY_DEFAULT off, requests that do not pass explain=true skip SHAP,
+# and the shap module is neither imported nor built until one does.
+EXPLAIN_BY_DEFAULT = os.environ.get("EXPLAIN_BY_DEFAULT", "1").lower() not in ("0", "false", "no")
+# "shap" for exact TreeSHAP values, "fast" for tree-path contributions taken from the scoring walk
+EXPLAIN_METHOD = os.environ.get("EXPLAIN_METHOD", "shap")
+EXPLAIN_METHODS = ("shap", "fast")
+
+# Where a response's recommendations came from
+SOURCE_SHAP = "shap"
+SOURCE_TREE_PATH = "tree_path"
+SOURCE_FALLBACK = "fallback"
+SOURCE_NONE = "none"
+SOURCE_PENDING = "pending"  # queued as an explanation job; fetch from /explanations/{id}
+
+_shap = None
+_shap_lock = threading.Lock()
+shap_import_seconds: Optional[float] = None
+
+
+def import_shap():
+    """Import shap on first use; it takes seconds and a large share of the process's memory"""
+    global _shap, shap_import_seconds
+    if _shap is None:
+        with _shap_lock:
+            if _shap is None:
+                start = time.perf_counter()
+                with startup_profile.phase("import", "shap"):
+                    import shap
+                shap_import_seconds = time.perf_counter() - start
+                _shap = shap
+    return _shap
+
+
+def resolve_explain(explain: Optional[bool]) -> bool:
+    """A request's explain flag, falling back to the server default"""
+    return EXPLAIN_BY_DEFAULT if explain is None else explain
+
+
+def resolve_explain_method(method: Optional[str]) -> str:
+    """A request's explanation method, falling back to the server default; raises ValueError if unknown"""
+    method = EXPLAIN_METHOD if method is None else method
+    if method not in EXPLAIN_METHODS:
+        raise ValueError(f"explain_method must be one of {', '.join(EXPLAIN_METHODS)}")
+    return method
+
+
+class ExplainerCache:
+    """Holds one SHAP TreeExplainer per loaded model, and its compiled tree paths for fast attributions.
+
+    Each entry pairs a model with the explainer built from it, so a model
+    change swaps both together under a lock. Explainers are read-only after
+    construction and are shared by concurrent requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self._tree_paths: Dict[str, Tuple[Any, Any]] = {}
+        self.build_times: Dict[str, float] = {}
+
+    def load(self, name: str, model: Any) -> float:
+        """Build the explainer for a model and swap it in, returning the build time in seconds"""
+        with self._lock:
+            self._tree_paths.pop(name, None)  # compiled again for the new model on first use
+        self._build(name, model)
+        return self.build_times[name]
+
+    def _build(self, name: str, model: Any) -> Any:
+        start = time.perf_counter()
+        explainer = import_shap().TreeExplainer(model)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._entries[name] = (model, explainer)
+            self.build_times[name] = elapsed
+        return explainer
+
+    def get(self, name: str, model: Any) -> Optional[Any]:
+        """Return the explainer built for this exact model, rebuilding it if the model changed"""
+        if model is None:
+            return None
+        entry = self._entries.get(name)
+        if entry is None or entry[0] is not model:
+            return self._build(name, model)
+        return entry[1]
+
+    def tree_paths(self, name: str, model: Any) -> Optional[Any]:
+        """The compiled ensemble giving tree-path contributions for this exact model, compiled on first use"""
+        if model is None:
+            return None
+        entry = self._tree_paths.get(name)
+        if entry is None or entry[0] is not model:
+            compiled = compile_shared(model, name)
+            with self._lock:
+                self._tree_paths[name] = entry = (model, compiled)
+        return entry[1]
+
+    def clear(self, name: str):
+        """Drop the explainer for a model that has been unloaded"""
+        with self._lock:
+            self._entries.pop(name, None)
+            self._tree_paths.pop(name, None)
+            self.build_times.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            built = sorted(self._entries)
+            tree_paths = sorted(self._tree_paths)
+        return {
+            "explain_by_default": EXPLAIN_BY_DEFAULT,
+            "explain_method": EXPLAIN_METHOD,
+            "tree_paths_compiled": tree_paths,
+            "shap_imported": _shap is not None,
+            "shap_import_seconds": None if shap_import_seconds is None else round(shap_import_seconds, 3),
+            "explainers_built": built,
+            "build_seconds": {name: round(seconds, 3) for name, seconds in self.build_times.items()}
+        }
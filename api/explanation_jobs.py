@@ -0,0 +1,194 @@
+"""
+Background explanation jobs: predictions return a ticket, recommendations follow
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Job configuration (override with environment variables)
+EXPLANATION_JOB_WORKERS = int(os.environ.get("EXPLANATION_JOB_WORKERS", 1))
+EXPLANATION_JOB_QUEUE_SIZE = int(os.environ.get("EXPLANATION_JOB_QUEUE_SIZE", 1000))
+EXPLANATION_JOB_BATCH_SIZE = int(os.environ.get("EXPLANATION_JOB_BATCH_SIZE", 32))
+EXPLANATION_JOB_TTL_SECONDS = float(os.environ.get("EXPLANATION_JOB_TTL_SECONDS", 600))
+EXPLANATION_JOB_MAX_RESULTS = int(os.environ.get("EXPLANATION_JOB_MAX_RESULTS", 10000))
+EXPLANATION_JOB_MAX_WAIT_SECONDS = float(os.environ.get("EXPLANATION_JOB_MAX_WAIT_SECONDS", 30))
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class ExplanationJob:
+    """One queued explanation and, once finished, its result or error"""
+
+    def __init__(self, kind: str, payload: Any):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = JOB_PENDING
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.completed_at: Optional[str] = None
+        self.finished = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "prediction_type": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at
+        }
+
+
+class ExplanationJobQueue:
+    """Runs explanations on background workers so the prediction can be returned first.
+
+    submit() queues a job and returns it, or None when queue_size jobs are
+    already waiting, so a backlog never holds up scoring. Workers take up to
+    batch_size waiting jobs at a time and pass each kind's payloads to
+    explain_fn(kind, payloads) in one call; it returns one (result, error)
+    pair per payload. Finished jobs are kept for ttl_seconds, and at most
+    max_results of them, then dropped. Must be used from one event loop.
+    """
+
+    def __init__(self, explain_fn: Callable[[str, List[Any]], Awaitable[List[Tuple[Any, Optional[str]]]]],
+                 workers: int = EXPLANATION_JOB_WORKERS, queue_size: int = EXPLANATION_JOB_QUEUE_SIZE,
+                 batch_size: int = EXPLANATION_JOB_BATCH_SIZE, ttl_seconds: float = EXPLANATION_JOB_TTL_SECONDS,
+                 max_results: int = EXPLANATION_JOB_MAX_RESULTS, clock: Callable[[], float] = time.monotonic):
+        self.explain_fn = explain_fn
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.ttl_seconds = ttl_seconds
+        self.max_results = max(1, max_results)
+        self._clock = clock
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, ExplanationJob]" = OrderedDict()
+        self._finished: deque = deque()  # (finish time, job id), oldest first
+
+        # Metrics
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers; jobs still queued are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            self._finish(self._queue.get_nowait(), None, "Server shutting down")
+        self._queue = None
+
+    def submit(self, kind: str, payload: Any) -> Optional[ExplanationJob]:
+        """Queue an explanation; None if the queue is full"""
+        if self._queue is None:
+            self.start()
+        self._expire()
+        job = ExplanationJob(kind, payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return None
+        self._jobs[job.id] = job
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[ExplanationJob]:
+        """The job with this ID, or None if it is unknown or has expired"""
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[ExplanationJob]:
+        """The job once it has finished or timeout seconds have passed, whichever is first"""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(job.finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "stored": len(self._jobs),
+            "ttl_seconds": self.ttl_seconds,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired
+        }
+
+    async def _work(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[ExplanationJob]):
+        by_kind: Dict[str, List[ExplanationJob]] = {}
+        for job in batch:
+            job.status = JOB_RUNNING
+            by_kind.setdefault(job.kind, []).append(job)
+        for kind, jobs in by_kind.items():
+            try:
+                outcomes = await self.explain_fn(kind, [job.payload for job in jobs])
+            except asyncio.CancelledError:
+                for job in jobs:
+                    self._finish(job, None, "Server shutting down")
+                raise
+            except Exception as e:
+                outcomes = [(None, str(e))] * len(jobs)
+            for job, (result, error) in zip(jobs, outcomes):
+                self._finish(job, result, error)
+
+    def _finish(self, job: ExplanationJob, result: Any, error: Optional[str]):
+        job.result, job.error = result, error
+        job.status = JOB_FAILED if error is not None else JOB_DONE
+        job.completed_at = datetime.now().isoformat()
+        job.payload = None
+        if error is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._finished.append((self._clock(), job.id))
+        job.finished.set()
+        self._expire()
+
+    def _expire(self):
+        """Drop finished jobs older than the TTL, then the oldest beyond max_results"""
+        cutoff = self._clock() - self.ttl_seconds
+        while self._finished and (self._finished[0][0] < cutoff or len(self._finished) > self.max_results):
+            _, job_id = self._finished.popleft()
+            self._jobs.pop(job_id, None)
+            self.expired += 1
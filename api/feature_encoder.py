@@ -0,0 +1,70 @@
+"""
+Pandas-free feature encoder for new business predictions
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Encoded value for categories missing from a mapping
+UNKNOWN_CATEGORY = -1
+
+
+class BusinessFeatureEncoder:
+    """Encodes business records straight into NumPy buffers in model column order.
+
+    Built once from PREDICTION_FEATURES and CATEGORICAL_MAPPINGS, it replaces
+    the per-request DataFrame construction, .map().fillna(-1) and reindexing
+    with plain dict lookups. Unknown categories encode to -1, as before.
+    """
+
+    def __init__(self, features: List[str], categorical_mappings: Dict[str, Dict[str, int]]):
+        self.features = list(features)
+        self.n_features = len(self.features)
+        # (column index, feature name, category mapping or None for numeric features)
+        self._columns: List[Tuple[int, str, Optional[Dict[str, int]]]] = [
+            (i, feature, categorical_mappings.get(feature))
+            for i, feature in enumerate(self.features)
+        ]
+
+    def encode_into(self, record: Dict[str, Any], row: np.ndarray):
+        """Write one record into a preallocated row of length n_features"""
+        for i, feature, mapping in self._columns:
+            value = record[feature]
+            if mapping is not None:
+                row[i] = mapping.get(value, UNKNOWN_CATEGORY)
+            else:
+                row[i] = value
+
+    def missing_features(self, record: Dict[str, Any]) -> List[str]:
+        return [feature for feature in self.features if feature not in record]
+
+    def encode_row(self, record: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode one record as a (1, n_features) matrix"""
+        missing = self.missing_features(record)
+        if missing:
+            raise ValueError(f"Missing required features: {missing}")
+        if out is None:
+            out = np.empty((1, self.n_features))
+        self.encode_into(record, out[0])
+        return out
+
+    def encode_batch(self, records: List[Dict[str, Any]], out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[int], Dict[int, str]]:
+        """Encode many records into one matrix.
+
+        Returns the matrix of valid rows, the batch positions of those rows and
+        an error message for every rejected position.
+        """
+        if out is None:
+            out = np.empty((len(records), self.n_features))
+
+        row_ids, errors = [], {}
+        for position, record in enumerate(records):
+            missing = self.missing_features(record)
+            if missing:
+                errors[position] = f"Missing required features: {missing}"
+                continue
+            self.encode_into(record, out[len(row_ids)])
+            row_ids.append(position)
+
+        return out[:len(row_ids)], row_ids, errors
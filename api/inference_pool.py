@@ -0,0 +1,127 @@
+"""
+Worker pool that keeps CPU-bound inference off the asyncio event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Pool configuration (override with environment variables)
+INFERENCE_POOL_MODE = os.environ.get("INFERENCE_POOL_MODE", "thread")  # "thread" or "process"
+INFERENCE_POOL_SIZE = int(os.environ.get("INFERENCE_POOL_SIZE", os.cpu_count() or 1))
+
+
+class InferencePool:
+    """Runs blocking model work on a thread or process pool.
+
+    Concurrency is capped at the pool size with a semaphore, so callers
+    waiting for a free worker are counted as queued and the executor never
+    holds a hidden backlog. In process mode, submitted functions and their
+    arguments and results must be picklable. restart() replaces the workers,
+    e.g. so forked processes pick up newly loaded models, while tasks already
+    running finish on the old ones.
+    """
+
+    def __init__(self, mode: str = INFERENCE_POOL_MODE, max_workers: int = INFERENCE_POOL_SIZE):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown inference pool mode: {mode}")
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._initializer: Optional[Callable[[], None]] = None
+        self._executor_lock = threading.Lock()  # guards swapping the executor against submissions
+        self.restarts = 0
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self, initializer: Optional[Callable[[], None]] = None):
+        """Create the executor; call after models are loaded so forked workers inherit them.
+
+        initializer loads the models in spawned worker processes and must be
+        a picklable module-level function.
+        """
+        if self._executor is not None:
+            return
+        self._initializer = initializer
+        self._executor = self._create_executor()
+        self._slots = asyncio.Semaphore(self.max_workers)
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "process":
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+            # Forked workers inherit the loaded models; spawned ones must load their own
+            initializer = None if context.get_start_method() == "fork" else self._initializer
+            return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context, initializer=initializer)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+
+    def restart(self, initializer: Optional[Callable[[], None]] = None):
+        """Send new work to fresh workers; the old ones exit once their running tasks finish.
+
+        Only process pools need this: thread workers already share the
+        loaded models. May be called from any thread.
+        """
+        if self.mode != "process" or self._executor is None:
+            return
+        if initializer is not None:
+            self._initializer = initializer
+        replacement = self._create_executor()
+        with self._executor_lock:
+            retired, self._executor = self._executor, replacement
+        retired.shutdown(wait=False)
+        self.restarts += 1
+
+    def shutdown(self):
+        """Wait for running work to finish and release the workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._slots = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on a pool worker and await its result"""
+        if self._executor is None:
+            self.start()
+        slots = self._slots
+
+        self.queued += 1
+        waiting = True
+        try:
+            async with slots:
+                self.queued -= 1
+                waiting = False
+                self.active += 1
+                try:
+                    # Submit to the current executor, which restart() may have replaced while this call waited
+                    with self._executor_lock:
+                        future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+                    result = await future
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.active -= 1
+                self.completed += 1
+                return result
+        finally:
+            if waiting:
+                self.queued -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and saturation for monitoring"""
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "active": self.active,
+            "queued": self.queued,
+            "saturation": round(self.active / self.max_workers, 3),
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts
+        }
@@ -0,0 +1,419 @@
+"""
+Closed-loop load generator for the API
+
+Starts the API under uvicorn (or prefork.py) with the given worker count,
+or targets a running server with --url, and drives it with async clients,
+each sending its next request as soon as the previous one returns. A run
+steps through one or more concurrency levels and reports, per step and
+per endpoint, the latency percentiles, throughput and error rate, plus
+the server's CPU and RSS over time. Throughput that stops growing while
+latency climbs marks the saturation point.
+
+Usage (from the api directory):
+    python loadtest.py [--workers 2] [--concurrency 1,8,32] [--duration 20] [--warmup 3]
+                       [--mix predict=45,predict-existing=45,batch=5,admin=5] [--output loadtest_results.json]
+    python loadtest.py --workers 4 --env INFERENCE_POOL_MODE=process --mix predict=1
+    python loadtest.py --workers 4 --server prefork
+    python loadtest.py --url http://localhost:8000 --concurrency 16
+
+Each request gets a slightly different business_capital so the response
+cache does not answer it; pass --allow-cache-hits to replay payloads as-is.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from payloads import load_existing_business_payloads, load_new_business_payloads
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = "predict=45,predict-existing=45,batch=5,admin=5"
+ADMIN_PATHS = ("/admin/dashboard", "/admin/predictions?limit=50", "/admin/stats")
+SERVER_START_TIMEOUT = 180
+SERVERS = ("uvicorn", "prefork", "prefork-no-preload")
+
+# A step saturates once raising concurrency gains less than this much throughput
+SATURATION_GAIN = 0.10
+
+
+# ----- request mix -----
+
+class RequestMix:
+    """Weighted choice of operations, each building its own request"""
+
+    OPERATIONS = ("predict", "predict-existing", "batch", "admin")
+
+    def __init__(self, spec: str, new_payloads: List[Dict[str, Any]], existing_payloads: List[Dict[str, Any]],
+                 batch_size: int, allow_cache_hits: bool = False, seed: int = 42):
+        self.weights = parse_mix(spec)
+        self.new_payloads = new_payloads
+        self.existing_payloads = existing_payloads
+        self.batch_size = batch_size
+        self.allow_cache_hits = allow_cache_hits
+        self.random = random.Random(seed)
+
+    def next_request(self) -> Tuple[str, str, str, Optional[Any]]:
+        """(operation, method, path, json body)"""
+        operation = self.random.choices(list(self.weights), weights=list(self.weights.values()))[0]
+        if operation == "predict":
+            return operation, "POST", "/predict", self._payload(self.new_payloads)
+        if operation == "predict-existing":
+            return operation, "POST", "/predict-existing-business", self._payload(self.existing_payloads)
+        if operation == "batch":
+            return operation, "POST", "/batch-predict", [self._payload(self.new_payloads) for _ in range(self.batch_size)]
+        return operation, "GET", self.random.choice(ADMIN_PATHS), None
+
+    def _payload(self, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        payload = self.random.choice(payloads)
+        if self.allow_cache_hits:
+            return payload
+        return {**payload, "business_capital": payload["business_capital"] + self.random.randint(1, 10 ** 6)}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'predict=3,admin=1' -> {"predict": 3.0, "admin": 1.0}"""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in RequestMix.OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'; expected one of {', '.join(RequestMix.OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    if not any(weight > 0 for weight in weights.values()):
+        raise ValueError("The request mix needs at least one positive weight")
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+# ----- server process -----
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, env: Dict[str, str], server: str = "uvicorn") -> subprocess.Popen:
+    """The API in its own process group, so stopping it takes its workers too.
+
+    server is "uvicorn" (uvicorn --workers), "prefork" (prefork.py, models
+    loaded once before forking) or "prefork-no-preload" (prefork.py, each
+    worker loads its own).
+    """
+    if server == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "main:app"]
+    elif server in ("prefork", "prefork-no-preload"):
+        command = [sys.executable, "prefork.py"] + (["--no-preload"] if server == "prefork-no-preload" else [])
+    else:
+        raise ValueError(f"Unknown server: {server}")
+    command += ["--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=API_DIR, env={**os.environ, **env}, start_new_session=True,
+                            stdout=subprocess.DEVNULL)
+
+
+def stop_server(process: subprocess.Popen):
+    if process.poll() is not None:
+        return
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+async def wait_until_healthy(url: str, process: Optional[subprocess.Popen], timeout: float = SERVER_START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=5) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode} during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {url} not healthy after {timeout:.0f}s")
+
+
+# ----- server resource usage (Linux /proc; no extra dependencies) -----
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_tree(root_pid: int) -> List[int]:
+    """The root process and all of its descendants"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+    return pids
+
+
+def process_usage(pids: List[int]) -> Tuple[float, int]:
+    """(CPU seconds used, resident bytes) summed over the processes"""
+    cpu_seconds, rss = 0.0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue  # exited between listing and reading
+        cpu_seconds += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        rss += resident_pages * PAGE_SIZE
+    return cpu_seconds, rss
+
+
+class ResourceSampler:
+    """Samples server CPU and RSS, plus client-side completions, at a fixed interval"""
+
+    def __init__(self, server_pid: Optional[int], interval: float):
+        self.server_pid = server_pid
+        self.interval = interval
+        self.enabled = server_pid is not None and os.path.isdir("/proc")
+        self.samples: List[Dict[str, Any]] = []
+        self.completed = 0
+        self.step: Optional[int] = None
+
+    async def run(self):
+        start = time.monotonic()
+        last_time, last_cpu, last_completed = start, self._usage()[0], 0
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            cpu_seconds, rss = self._usage()
+            elapsed = now - last_time
+            self.samples.append({
+                "t": round(now - start, 2),
+                "concurrency": self.step,
+                "cpu_percent": round((cpu_seconds - last_cpu) / elapsed * 100, 1) if self.enabled else None,
+                "rss_mb": round(rss / 2 ** 20, 1) if self.enabled else None,
+                "requests_per_second": round((self.completed - last_completed) / elapsed, 1)
+            })
+            last_time, last_cpu, last_completed = now, cpu_seconds, self.completed
+
+    def _usage(self) -> Tuple[float, int]:
+        if not self.enabled:
+            return 0.0, 0
+        return process_usage(process_tree(self.server_pid))
+
+
+# ----- load steps -----
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds over successful requests, throughput and error rate"""
+    ordered = sorted(latencies)
+    requests = len(latencies) + errors
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "throughput_rps": round(len(latencies) / seconds, 2) if seconds > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0
+    }
+
+
+async def run_step(client: httpx.AsyncClient, mix: RequestMix, concurrency: int, duration: float, warmup: float,
+                   sampler: ResourceSampler) -> Dict[str, Any]:
+    """Keep `concurrency` requests in flight for warmup + duration seconds; only the last `duration` count"""
+    latencies: Dict[str, List[float]] = {operation: [] for operation in mix.weights}
+    errors: Dict[str, int] = {operation: 0 for operation in mix.weights}
+    error_samples: List[str] = []
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def client_loop():
+        while loop.time() < stop_at:
+            operation, method, path, body = mix.next_request()
+            start = loop.time()
+            try:
+                response = await client.request(method, path, json=body)
+                failed = response.status_code >= 400
+                if failed and len(error_samples) < 5:
+                    error_samples.append(f"{method} {path}: {response.status_code} {response.text[:120]}")
+            except httpx.HTTPError as e:
+                failed = True
+                if len(error_samples) < 5:
+                    error_samples.append(f"{method} {path}: {type(e).__name__} {e}")
+            end = loop.time()
+            sampler.completed += 1
+            if start < measure_from:
+                continue
+            if failed:
+                errors[operation] += 1
+            else:
+                latencies[operation].append(end - start)
+
+    sampler.step = concurrency
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "concurrency": concurrency,
+        "overall": summarize(all_latencies, sum(errors.values()), duration),
+        "endpoints": {operation: summarize(latencies[operation], errors[operation], duration) for operation in mix.weights},
+        "error_samples": error_samples
+    }
+
+
+def find_saturation(steps: List[Dict[str, Any]], key: Optional[str] = None) -> Optional[int]:
+    """Lowest concurrency beyond which more clients add less than SATURATION_GAIN throughput"""
+    throughputs = [(step["concurrency"], (step["endpoints"][key] if key else step["overall"])["throughput_rps"]) for step in steps]
+    for (concurrency, throughput), (_, next_throughput) in zip(throughputs, throughputs[1:]):
+        if throughput > 0 and next_throughput < throughput * (1 + SATURATION_GAIN):
+            return concurrency
+    return None
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = RequestMix(args.mix, load_new_business_payloads(args.rows), load_existing_business_payloads(args.rows),
+                     args.batch_size, args.allow_cache_hits)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    env = dict(item.split("=", 1) for item in args.env)
+
+    process, store_dir = None, None
+    if args.url:
+        url = args.url.rstrip("/")
+    else:
+        if "STORE_DB_FILE" not in env:
+            # Keep load-test predictions out of the real store
+            store_dir = tempfile.mkdtemp(prefix="sme_loadtest_")
+            env["STORE_DB_FILE"] = os.path.join(store_dir, "loadtest.db")
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        print(f"Starting {args.server} with {args.workers} worker(s) on {url}...")
+        process = start_server(args.workers, port, env, args.server)
+
+    try:
+        await wait_until_healthy(url, process)
+        print(f"✓ Server ready")
+        sampler = ResourceSampler(process.pid if process else None, args.sample_interval)
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        steps = []
+        async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+            sampler_task = asyncio.create_task(sampler.run())
+            try:
+                for concurrency in levels:
+                    step = await run_step(client, mix, concurrency, args.duration, args.warmup, sampler)
+                    steps.append(step)
+                    print_step(step)
+            finally:
+                sampler_task.cancel()
+    finally:
+        if process is not None:
+            stop_server(process)
+        if store_dir is not None:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    return {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "url": url if args.url else None,
+            "workers": None if args.url else args.workers,
+            "server": None if args.url else args.server,
+            "env": env if not args.url else {},
+            "mix": mix.weights,
+            "batch_size": args.batch_size,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "cpu_count": os.cpu_count(),
+            "allow_cache_hits": args.allow_cache_hits
+        },
+        "steps": steps,
+        "saturation": {
+            "overall": find_saturation(steps),
+            **{operation: find_saturation(steps, operation) for operation in mix.weights}
+        },
+        "resources": sampler.samples
+    }
+
+
+def print_step(step: Dict[str, Any]):
+    print(f"\nConcurrency {step['concurrency']}")
+    print(f"  {'endpoint':18} {'requests':>9} {'rps':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in [*step["endpoints"].items(), ("overall", step["overall"])]:
+        print(f"  {name:18} {stats['requests']:9} {stats['throughput_rps']:9.1f} {stats['error_rate']:7.1%} "
+              f"{stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f}")
+    for sample in step["error_samples"]:
+        print(f"  ! {sample}")
+
+
+def print_resources(samples: List[Dict[str, Any]]):
+    if not samples or samples[0]["cpu_percent"] is None:
+        return
+    print(f"\n{'concurrency':>11} {'peak CPU %':>11} {'peak RSS MB':>12}")
+    for concurrency in dict.fromkeys(sample["concurrency"] for sample in samples if sample["concurrency"] is not None):
+        step_samples = [sample for sample in samples if sample["concurrency"] == concurrency]
+        print(f"{concurrency:11} {max(s['cpu_percent'] for s in step_samples):11.1f} {max(s['rss_mb'] for s in step_samples):12.1f}")
+
+
+def main_load_test(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    parser.add_argument("--server", choices=SERVERS, default="uvicorn", help="uvicorn --workers, or prefork.py with models loaded before forking")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="server environment, e.g. INFERENCE_POOL_MODE=process")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated client counts, one step each")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds at the start of each step")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights: predict, predict-existing, batch, admin")
+    parser.add_argument("--batch-size", type=int, default=20, help="businesses per /batch-predict request")
+    parser.add_argument("--rows", type=int, default=500, help="payloads drawn from each dataset")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between CPU/RSS samples")
+    parser.add_argument("--allow-cache-hits", action="store_true", help="replay payloads unchanged")
+    parser.add_argument("--output", default="loadtest_results.json")
+    args = parser.parse_args(argv)
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = asyncio.run(run_load_test(args))
+    print_resources(report["resources"])
+    print(f"\nSaturation (concurrency): {report['saturation']}")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results written to {args.output}")
+    return 1 if any(step["overall"]["errors"] for step in report["steps"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_load_test())
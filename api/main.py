@@ -2,47 +2,82 @@
 SME Success Predictor FastAPI Application
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
-import joblib
-import pandas as pd
-import numpy as np
+# Imported first, so the imports below are timed (see /debug/startup)
+from startup_profile import startup_profile
+
+with startup_profile.phase("import", "fastapi"):
+    from fastapi import FastAPI, HTTPException, Query
+    from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Tuple, Union
+with startup_profile.phase("import", "numpy"):
+    import numpy as np
+with startup_profile.phase("import", "joblib"):
+    import joblib
 import os
 import json
+import asyncio
+import functools
+import time
 from datetime import datetime
-import shap
+with startup_profile.phase("import", "api modules"):
+    from explainers import (ExplainerCache, EXPLAIN_BY_DEFAULT, SOURCE_SHAP, SOURCE_TREE_PATH, SOURCE_FALLBACK, SOURCE_NONE,
+                            SOURCE_PENDING, resolve_explain, resolve_explain_method)
+    from explanation_jobs import ExplanationJobQueue, EXPLANATION_JOB_MAX_WAIT_SECONDS
+    from inference_pool import InferencePool
+    from model_registry import ModelRegistry, ModelVersion
+    from readiness import ReadinessGate, WARMUP_ENABLED
+    from coalescer import RequestCoalescer
+    from feature_encoder import BusinessFeatureEncoder
+    from tree_engine import CompiledTreeEnsemble, select_scorer
+    from prediction_cache import PredictionCache
+    from prediction_log import PredictionLogWriter
+    from store import SQLiteStore, ROLLUP_RESOLUTIONS, normalize_time_bound, DEFAULT_PREDICTION_FIELDS, prediction_outcome
+    from event_broadcaster import EventBroadcaster, EVENT_STREAM_HEARTBEAT_SECONDS
+    from metrics import MetricsRegistry, RequestMetricsMiddleware, stage, timed_call
+    from scoring import score, classify, NEW_BUSINESS_DECISION_THRESHOLD, EXISTING_BUSINESS_DECISION_THRESHOLD
+
+# SQLite store for predictions and feedback (see store.py for settings)
+store = SQLiteStore()
+
+# Live admin dashboard events (see event_broadcaster.py for settings)
+admin_events = EventBroadcaster()
+
+def publish_admin_event(event: Optional[str] = None, data: Optional[Dict[str, Any]] = None):
+    """Push an event, then the updated dashboard counters, to open admin streams"""
+    if not admin_events.has_subscribers:
+        return
+    if event:
+        admin_events.publish(event, data or {})
+    admin_events.publish("counters", dashboard_counters())
 
-# Prediction tracking file path
-PREDICTIONS_LOG_FILE = "predictions_log.json"
-FEEDBACK_LOG_FILE = "feedback_log.json"
+def publish_logged_predictions(entries: List[Dict[str, Any]]):
+    """Push newly stored predictions and the updated counters to open admin streams"""
+    if not admin_events.has_subscribers:
+        return
+    for entry in entries:
+        result = entry["prediction_result"]
+        admin_events.publish("prediction", {
+            "id": entry["id"],
+            "timestamp": entry["timestamp"],
+            "prediction_type": entry["prediction_type"],
+            "outcome": prediction_outcome(result),
+            "success_probability": result.get("success_probability"),
+            "confidence_level": result.get("confidence_level")
+        })
+    publish_admin_event()
+
+# Buffered prediction log writer (see prediction_log.py for settings)
+prediction_log = PredictionLogWriter(store, on_flush=publish_logged_predictions)
 
 def log_prediction(prediction_type: str, input_data: dict, prediction_result: dict):
-    """Log prediction to JSON file for admin tracking"""
-    try:
-        # Load existing logs
-        if os.path.exists(PREDICTIONS_LOG_FILE):
-            with open(PREDICTIONS_LOG_FILE, 'r') as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        
-        # Create new log entry
-        log_entry = {
-            "id": len(logs) + 1,
-            "timestamp": datetime.now().isoformat(),
-            "prediction_type": prediction_type,  # "new_business" or "existing_business"
-            "input_data": input_data,
-            "prediction_result": prediction_result
-        }
-        
-        # Append and save
-        logs.append(log_entry)
-        with open(PREDICTIONS_LOG_FILE, 'w') as f:
-            json.dump(logs, f, indent=2)
-    except Exception as e:
-        print(f"Error logging prediction: {e}")
+    """Log prediction for admin tracking"""
+    log_predictions([(prediction_type, input_data, prediction_result)])
+
+def log_predictions(predictions: List[Tuple[str, dict, dict]]):
+    """Queue many predictions for the background log flusher; returns without touching the disk"""
+    prediction_log.append(predictions)
 
 app = FastAPI(
     title="Combined SME Success Predictor API",
@@ -72,29 +107,111 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variables for NEW BUSINESS model and mappings
+# Global variables for NEW BUSINESS model and mappings; the model and scorer
+# mirror the active version in model_registry, which requests read instead
 trained_model = None
+new_business_scorer = None
 CATEGORICAL_MAPPINGS = None
 PREDICTION_FEATURES = None
+business_encoder = None
 
-# Global variables for EXISTING BUSINESS model components
+# Global variables for EXISTING BUSINESS model components, mirrored the same way
 xgb_model = None
+existing_business_scorer = None
 feature_scaler = None
 label_encoders = None
 feature_names = None
 model_metadata = None
 
-# Model file paths for existing business
-MODEL_VERSION = "20251106_133503"
-EXISTING_MODEL_PATH = f"../models/existing_business_predictor_{MODEL_VERSION}.joblib"
-EXISTING_SCALER_PATH = f"../models/feature_scaler_{MODEL_VERSION}.joblib"
-EXISTING_ENCODERS_PATH = f"../models/label_encoders_{MODEL_VERSION}.joblib"
-EXISTING_METADATA_PATH = f"../models/model_metadata_{MODEL_VERSION}.json"
+# SHAP explainers, built once per loaded model and shared across requests (see explainers.py for settings)
+shap_explainers = ExplainerCache()
+
+# Seconds taken to load models and explainers at startup
+startup_seconds = None
+
+# Set by prefork.py once it has loaded the models in the parent, so forked workers skip loading them again
+models_preloaded = False
+
+# Opened by the startup warmup once sample requests meet the latency budget (see readiness.py for settings)
+readiness = ReadinessGate()
+warmup_task = None
+
+# Full responses for repeated submissions (see prediction_cache.py for settings)
+prediction_cache = PredictionCache()
+
+# Worker pool for CPU-bound scoring and explanation (see inference_pool.py for settings)
+inference_pool = InferencePool()
+
+# Stage timers, request counters and /metrics (see metrics.py for settings)
+metrics_registry = MetricsRegistry()
+if metrics_registry.enabled:
+    app.add_middleware(RequestMetricsMiddleware, registry=metrics_registry)
+
+async def run_inference(endpoint: str, model_version: str, fn, *args):
+    """Run fn(*args) on the inference pool, recording its stage timings under the endpoint and model version"""
+    if not metrics_registry.enabled:
+        return await inference_pool.run(fn, *args)
+    result, samples = await inference_pool.run(timed_call, fn, *args)
+    metrics_registry.record_stages(endpoint, model_version, samples)
+    return result
+
+# Largest number of rows accepted by the batch endpoints
+MAX_BATCH_SIZE = 5000
+
+# Largest page /admin/predictions returns; larger limits are clamped
+MAX_ADMIN_PAGE_SIZE = 1000
 
 @app.on_event("startup")
 async def startup_event():
     """Load model and initialize mappings on startup"""
-    global trained_model, CATEGORICAL_MAPPINGS, PREDICTION_FEATURES
+    global startup_seconds, warmup_task
+    if not models_preloaded:
+        start = time.perf_counter()
+        load_models()
+        startup_seconds = time.perf_counter() - start
+        print(f"✓ Models loaded in {startup_seconds:.2f}s (explanations {'on' if EXPLAIN_BY_DEFAULT else 'off'} by default)")
+    prediction_log.start()
+    inference_pool.start(initializer=functools.partial(load_models, active_model_versions()))
+    print(f"✓ Inference pool started ({inference_pool.mode} mode, {inference_pool.max_workers} workers)")
+    explanation_jobs.start()
+    model_registry.start_watching()
+    
+    # Warm up in the background; /ready stays 503 until the sample requests are fast enough
+    if WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(warm_up())
+    else:
+        readiness.open()
+    
+    # Log where the boot's time and memory went, once per process (workers forked after a preload inherit it)
+    if startup_profile.mark_booted():
+        startup_profile.log()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let in-flight predictions finish and release the inference workers"""
+    if warmup_task is not None:
+        warmup_task.cancel()
+    admin_events.close()
+    model_registry.stop_watching()
+    await explanation_jobs.close()
+    inference_pool.shutdown()
+    prediction_log.close()
+    store.close()
+
+def load_scorer(name: str, model, version: Optional[str] = None):
+    """Compiled tree evaluator for the model if enabled in COMPILED_TREE_MODELS, else the model itself"""
+    try:
+        scorer = select_scorer(name, model, version)
+    except Exception as e:
+        print(f"Error compiling {name} model, scoring with the library model: {e}")
+        return model
+    if scorer is not model:
+        print(f"✓ Compiled {name} model into {scorer.n_trees} flat trees ({scorer.n_nodes} nodes)")
+    return scorer
+
+def load_models(versions: Optional[Dict[str, str]] = None):
+    """Define the features and mappings, then load the newest (or the given) version of each model"""
+    global CATEGORICAL_MAPPINGS, PREDICTION_FEATURES, business_encoder, feature_names
     
     # Define prediction features (order must match trained model)
     PREDICTION_FEATURES = [
@@ -175,71 +292,99 @@ async def startup_event():
         }
     }
     
-    # Load the trained model
-    try:
-        model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'sme_success_predictor_random_forest_20251105_124414.joblib')
-        trained_model = joblib.load(model_path)
-        print(f"✓ New business model loaded successfully from {model_path}")
-    except Exception as e:
-        print(f"Error loading new business model: {e}")
-        trained_model = None
+    # Precompile the encoder that turns requests into model rows
+    business_encoder = BusinessFeatureEncoder(PREDICTION_FEATURES, CATEGORICAL_MAPPINGS)
     
-    # === LOAD EXISTING BUSINESS MODEL COMPONENTS ===
-    global xgb_model, feature_scaler, label_encoders, feature_names, model_metadata
+    # Define feature names for existing business (must match training order)
+    feature_names = [
+        'turnover_first_year',
+        'turnover_second_year',
+        'turnover_third_year',
+        'turnover_fourth_year',
+        'employment_first_year',
+        'employment_second_year',
+        'employment_third_year',
+        'employment_fourth_year',
+        'revenue_per_employee_trend',
+        'employment_efficiency',
+        'business_capital',
+        'employment_fourth_year',
+        'business_sector_encoded',
+        'business_scaling_encoded',
+        'employment_growth_encoded'
+    ]
     
-    try:
-        # Load XGBoost model
-        if os.path.exists(EXISTING_MODEL_PATH):
-            xgb_model = joblib.load(EXISTING_MODEL_PATH)
-            print(f"✓ Existing business XGBoost model loaded from {EXISTING_MODEL_PATH}")
-        else:
-            print(f" Existing business model not found: {EXISTING_MODEL_PATH}")
-        
-        # Load feature scaler
-        if os.path.exists(EXISTING_SCALER_PATH):
-            feature_scaler = joblib.load(EXISTING_SCALER_PATH)
-            print(f"✓ Feature scaler loaded from {EXISTING_SCALER_PATH}")
-        else:
-            print(f" Feature scaler not found: {EXISTING_SCALER_PATH}")
-        
-        # Load label encoders
-        if os.path.exists(EXISTING_ENCODERS_PATH):
-            label_encoders = joblib.load(EXISTING_ENCODERS_PATH)
-            print(f"✓ Label encoders loaded from {EXISTING_ENCODERS_PATH}")
-        else:
-            print(f" Label encoders not found: {EXISTING_ENCODERS_PATH}")
-        
-        # Load metadata
-        if os.path.exists(EXISTING_METADATA_PATH):
-            with open(EXISTING_METADATA_PATH, 'r') as f:
-                model_metadata = json.load(f)
-            print(f"✓ Model metadata loaded from {EXISTING_METADATA_PATH}")
-        else:
-            print(f" Metadata file not found: {EXISTING_METADATA_PATH}")
-        
-        # Define feature names for existing business (must match training order)
-        feature_names = [
-            'turnover_first_year',
-            'turnover_second_year',
-            'turnover_third_year',
-            'turnover_fourth_year',
-            'employment_first_year',
-            'employment_second_year',
-            'employment_third_year',
-            'employment_fourth_year',
-            'revenue_per_employee_trend',
-            'employment_efficiency',
-            'business_capital',
-            'employment_fourth_year',
-            'business_sector_encoded',
-            'business_scaling_encoded',
-            'employment_growth_encoded'
-        ]
-        
-        print(" Combined SME Predictor API startup complete!")
-        
-    except Exception as e:
-        print(f"Error loading existing business model components: {e}")
+    # Load, compile and warm up each model; a kind that fails keeps its current version
+    for kind in ("new_business", "existing_business"):
+        try:
+            model_registry.load(kind, (versions or {}).get(kind))
+        except Exception as e:
+            print(f"Error loading {kind} model: {e}")
+    
+    print(" Combined SME Predictor API startup complete!")
+
+def prepare_model_version(models: ModelVersion):
+    """Compile, explain and warm up a freshly loaded version before it takes traffic"""
+    features = PREDICTION_FEATURES if models.kind == "new_business" else feature_names
+    expected = getattr(models.model, "n_features_in_", len(features))
+    if expected != len(features):
+        raise ValueError(f"{models.kind} model {models.version} expects {expected} features, the API builds {len(features)}")
+    print(f"✓ {models.kind} model {models.version} loaded in {models.load_seconds:.2f}s")
+    
+    # Score with the compiled tree evaluator when enabled for this model
+    with startup_profile.phase("compile", f"{models.kind} scorer", models.version):
+        models.scorer = load_scorer(models.kind, models.model, models.version)
+    
+    # Build the SHAP explainer now, or leave it to the first explained request
+    explainer = None
+    if EXPLAIN_BY_DEFAULT:
+        try:
+            with startup_profile.phase("build", f"{models.kind} SHAP explainer", models.version):
+                build_time = shap_explainers.load(models.name, models.model)
+            explainer = shap_explainers.get(models.name, models.model)
+            print(f"✓ {models.kind} SHAP explainer built in {build_time:.2f}s")
+        except Exception as e:
+            print(f"Error building {models.kind} SHAP explainer: {e}")
+    
+    # Warm up with one scoring (and explanation) call, so the first request does not pay for lazy setup
+    with startup_profile.phase("warmup", f"{models.kind} first call", models.version):
+        row = np.zeros((1, len(features)))
+        if models.scaler is not None:
+            row = models.scaler.transform(row)
+        models.scorer.predict_proba(row)
+        if explainer is not None:
+            explainer.shap_values(row)
+
+def activate_model_version(models: ModelVersion):
+    """Point the module globals at a newly active version and drop what came from the old one"""
+    global trained_model, new_business_scorer, xgb_model, existing_business_scorer, feature_scaler, label_encoders, model_metadata
+    if models.kind == "new_business":
+        trained_model, new_business_scorer = models.model, models.scorer
+    else:
+        xgb_model, existing_business_scorer = models.model, models.scorer
+        feature_scaler, label_encoders, model_metadata = models.scaler, models.encoders, models.metadata
+    
+    # Cached responses came from the previous models
+    prediction_cache.invalidate()
+    
+    # Forked inference workers only hold the models they were forked with
+    inference_pool.restart(initializer=functools.partial(load_models, active_model_versions()))
+
+def retire_model_version(models: ModelVersion):
+    """Free the explainer of a version that can no longer be rolled back to"""
+    shap_explainers.clear(models.name)
+
+def active_model_versions() -> Dict[str, str]:
+    """Active version of each loaded model kind"""
+    versions = {}
+    for kind in ("new_business", "existing_business"):
+        models = model_registry.active(kind)
+        if models is not None:
+            versions[kind] = models.version
+    return versions
+
+# Versioned models in ../models, swapped in without a restart (see model_registry.py for settings)
+model_registry = ModelRegistry(prepare=prepare_model_version, on_activate=activate_model_version, on_retire=retire_model_version)
 
 # Pydantic models for request/response
 class BusinessData(BaseModel):
@@ -261,6 +406,8 @@ class PredictionResponse(BaseModel):
     success_probability: Optional[float] = None
     confidence_level: Optional[str] = None
     recommendations: Optional[List[str]] = None  # Changed to List[str] for SHAP recommendations
+    recommendation_source: Optional[str] = None  # "shap", "tree_path", "fallback", "pending" for an explanation job, or "none" when skipped
+    explanation_id: Optional[str] = None  # ticket for /explanations/{id} when explain_async was requested
     error: Optional[str] = None
 
 class FeedbackData(BaseModel):
@@ -363,6 +510,8 @@ class ExistingBusinessPredictionResponse(BaseModel):
     confidence: float = Field(description="Model confidence in the prediction (0.0 to 1.0). Higher values indicate more certainty")
     business_insights: Dict[str, Any] = Field(description="Key business metrics and performance indicators")
     recommendations: List[str] = Field(description="SHAP-based actionable business recommendations")
+    recommendation_source: str = Field(default=SOURCE_SHAP, description="'shap', 'tree_path' for fast attributions, 'fallback' when they failed, 'pending' for an explanation job, or 'none' when explanations were skipped")
+    explanation_id: Optional[str] = Field(default=None, description="Ticket for GET /explanations/{id} when explain_async was requested")
     risk_factors: List[str] = Field(description="Identified potential risks that could impact business success")
     model_version: str = Field(description="Version of the machine learning model used for prediction")
     timestamp: str = Field(description="ISO timestamp when the prediction was made")
@@ -391,6 +540,7 @@ class ExistingBusinessPredictionResponse(BaseModel):
                     "4. Capital Utilization: Optimize capital allocation for maximum return on investment",
                     "5. Market Leadership: Leverage strong performance to explore new markets and strategic partnerships"
                 ],
+                "recommendation_source": "shap",
                 "risk_factors": [],
                 "model_version": "20251106_133503",
                 "timestamp": "2025-11-06T15:30:45.123456"
@@ -398,83 +548,223 @@ class ExistingBusinessPredictionResponse(BaseModel):
         }
     }
 
-def preprocess_business_data(data: Dict[str, Any]) -> pd.DataFrame:
-    """Preprocess business data for prediction"""
+def preprocess_business_data(data: Dict[str, Any]) -> np.ndarray:
+    """Preprocess business data for prediction into a (1, n_features) matrix"""
     try:
-        # Convert to DataFrame
-        df = pd.DataFrame([data])
-        
-        # Validate all required features are present
-        missing_features = [f for f in PREDICTION_FEATURES if f not in df.columns]
-        if missing_features:
-            raise ValueError(f"Missing required features: {missing_features}")
-        
-        # Encode categorical features
-        for feature, mapping in CATEGORICAL_MAPPINGS.items():
-            if feature in df.columns:
-                # Handle unknown categories
-                df[feature] = df[feature].map(mapping).fillna(-1)
-        
-        # Select and reorder features to match model training
-        df = df[PREDICTION_FEATURES]
-        
-        return df
+        # Encode straight into a NumPy row in PREDICTION_FEATURES order
+        return business_encoder.encode_row(data)
         
     except Exception as e:
         raise ValueError(f"Data preprocessing error: {str(e)}")
 
-def generate_new_business_recommendations(business_data: Dict[str, Any], success_probability: float, processed_data: pd.DataFrame) -> List[str]:
-    """Generate SHAP-based business recommendations for new business"""
+def preprocess_business_batch(records: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[int], Dict[int, str]]:
+    """Preprocess many businesses into one feature matrix, collecting per-row errors.
+    
+    Returns the matrix, the batch position of each of its rows and the errors of rejected rows.
+    """
+    
+    # Rows are validated individually so one bad record does not fail the batch
+    matrix, row_ids, errors = business_encoder.encode_batch(records)
+    errors = {i: f"Data preprocessing error: {error}" for i, error in errors.items()}
+    return matrix, row_ids, errors
+
+def score_new_business_batch(processed_data: np.ndarray, row_ids: List[int], models: ModelVersion) -> Tuple[Dict[int, np.ndarray], Dict[int, str]]:
+    """Score a preprocessed batch with one predict_proba call, keyed by batch position"""
+    if len(processed_data) == 0:
+        return {}, {}
+    
+    try:
+        probabilities = models.scorer.predict_proba(processed_data)
+        return dict(zip(row_ids, probabilities)), {}
+    except Exception:
+        pass
+    
+    # The batch call failed, so score rows one at a time to report which ones are bad
+    probabilities, errors = {}, {}
+    for row, i in zip(processed_data, row_ids):
+        try:
+            probabilities[i] = models.scorer.predict_proba(row.reshape(1, -1))[0]
+        except Exception as e:
+            errors[i] = str(e)
+    return probabilities, errors
+
+def get_confidence_level(confidence: float) -> str:
+    """Bucket a prediction confidence into High/Medium/Low"""
+    if confidence >= 0.8:
+        return "High"
+    elif confidence >= 0.6:
+        return "Medium"
+    return "Low"
+
+NEW_BUSINESS_FALLBACK_RECOMMENDATIONS = [
+    "1. Capital Management: Ensure adequate funding for business operations",
+    "2. Experience Building: Leverage business experience for strategic decisions",
+    "3. Market Position: Strengthen your position in the chosen business sector",
+    "4. Location Strategy: Optimize business location for market access",
+    "5. Growth Planning: Develop sustainable growth strategies for long-term success"
+]
+
+def positive_class_shap_values(shap_values: Any) -> np.ndarray:
+    """Return an (n_rows, n_features) array of SHAP values for the positive class"""
+    
+    # Handle different SHAP output formats
+    if isinstance(shap_values, list):
+        # Binary classification - use positive class (index 1)
+        return np.asarray(shap_values[1] if len(shap_values) > 1 else shap_values[0])
+    
+    shap_values = np.asarray(shap_values)
+    if shap_values.ndim == 3:
+        # Newer SHAP releases stack the classes on the last axis
+        return shap_values[:, :, 1] if shap_values.shape[2] > 1 else shap_values[:, :, 0]
+    
+    return shap_values
+
+def format_shap_recommendations(features: List[str], shap_vals: np.ndarray) -> List[str]:
+    """Turn one row of SHAP values into the top 5 recommendations"""
+    
+    # Get feature impacts with names
+    feature_impacts = list(zip(features, shap_vals))
+    
+    # Sort by absolute impact (most influential features first)
+    top_features = sorted(feature_impacts, key=lambda x: abs(x[1]), reverse=True)[:5]
+    
+    recommendations = []
+    
+    # Generate recommendations based on SHAP insights
+    for i, (feature, impact) in enumerate(top_features, 1):
+        feature_name = feature.replace('_', ' ').title()
+        
+        if impact < -0.1:  # Strong negative impact
+            recommendations.append(f"{i}. Improve {feature_name}: This factor is significantly reducing your success probability (Impact: {impact:.3f})")
+        elif impact < 0:  # Mild negative impact
+            recommendations.append(f"{i}. Address {feature_name}: Minor negative influence on success - consider optimization (Impact: {impact:.3f})")
+        elif impact > 0.1:  # Strong positive impact
+            recommendations.append(f"{i}. Leverage {feature_name}: Strong positive driver - maintain and enhance this strength (Impact: +{impact:.3f})")
+        else:  # Mild positive impact
+            recommendations.append(f"{i}. Optimize {feature_name}: Positive contributor - opportunities for further improvement (Impact: +{impact:.3f})")
+    
+    return recommendations
+
+def generate_new_business_recommendations(business_data: Dict[str, Any], success_probability: float, processed_data: np.ndarray, models: ModelVersion) -> Tuple[List[str], str]:
+    """Generate SHAP-based business recommendations for new business, with their source"""
     
     try:
-        # Create SHAP explainer for the new business model
-        explainer = shap.TreeExplainer(trained_model)
+        # Reuse the SHAP explainer built for this version of the new business model
+        explainer = shap_explainers.get(models.name, models.model)
         
         # Calculate SHAP values for this specific prediction
-        shap_values = explainer.shap_values(processed_data)
-        
-        # Handle different SHAP output formats
-        if isinstance(shap_values, list):
-            # Binary classification - use positive class (index 1)
-            shap_vals = shap_values[1][0] if len(shap_values) > 1 else shap_values[0][0]
-        else:
-            shap_vals = shap_values[0]
+        shap_vals = positive_class_shap_values(explainer.shap_values(processed_data))[0]
         
-        # Get feature impacts with names (use PREDICTION_FEATURES order)
-        feature_impacts = list(zip(PREDICTION_FEATURES, shap_vals))
+        # Feature impacts follow PREDICTION_FEATURES order
+        return format_shap_recommendations(PREDICTION_FEATURES, shap_vals), SOURCE_SHAP
         
-        # Sort by absolute impact (most influential features first)
-        top_features = sorted(feature_impacts, key=lambda x: abs(x[1]), reverse=True)[:5]
-        
-        recommendations = []
-        
-        # Generate recommendations based on SHAP insights
-        for i, (feature, impact) in enumerate(top_features, 1):
-            feature_name = feature.replace('_', ' ').title()
-            
-            if impact < -0.1:  # Strong negative impact
-                recommendations.append(f"{i}. Improve {feature_name}: This factor is significantly reducing your success probability (Impact: {impact:.3f})")
-            elif impact < 0:  # Mild negative impact
-                recommendations.append(f"{i}. Address {feature_name}: Minor negative influence on success - consider optimization (Impact: {impact:.3f})")
-            elif impact > 0.1:  # Strong positive impact
-                recommendations.append(f"{i}. Leverage {feature_name}: Strong positive driver - maintain and enhance this strength (Impact: +{impact:.3f})")
-            else:  # Mild positive impact
-                recommendations.append(f"{i}. Optimize {feature_name}: Positive contributor - opportunities for further improvement (Impact: +{impact:.3f})")
-        
-        return recommendations
+    except Exception as e:
+        # Fallback to basic recommendations if SHAP fails
+        return list(NEW_BUSINESS_FALLBACK_RECOMMENDATIONS), SOURCE_FALLBACK
+
+def generate_new_business_recommendations_batch(processed_data: np.ndarray, models: ModelVersion) -> Tuple[List[List[str]], str]:
+    """Generate SHAP-based recommendations for every row of a batch with one explainer call, with their source"""
+    
+    try:
+        explainer = shap_explainers.get(models.name, models.model)
+        shap_matrix = positive_class_shap_values(explainer.shap_values(processed_data))
+        return [format_shap_recommendations(PREDICTION_FEATURES, row) for row in shap_matrix], SOURCE_SHAP
         
     except Exception as e:
         # Fallback to basic recommendations if SHAP fails
-        return [
-            "1. Capital Management: Ensure adequate funding for business operations",
-            "2. Experience Building: Leverage business experience for strategic decisions",
-            "3. Market Position: Strengthen your position in the chosen business sector",
-            "4. Location Strategy: Optimize business location for market access",
-            "5. Growth Planning: Develop sustainable growth strategies for long-term success"
-        ]
+        return [list(NEW_BUSINESS_FALLBACK_RECOMMENDATIONS) for _ in range(len(processed_data))], SOURCE_FALLBACK
+
+def explain_rows(explain: Union[Any, List[Any]], n_rows: int, dtype=bool) -> np.ndarray:
+    """Per-row explain flags (or methods) from one value for the whole batch or one value per row"""
+    return np.broadcast_to(np.asarray(explain, dtype=dtype), (n_rows,))
+
+def walk_tree_paths(models: ModelVersion, X: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Probabilities and tree-path contributions from one walk over the compiled trees, or None if the model cannot be compiled"""
+    try:
+        engine = models.scorer if isinstance(models.scorer, CompiledTreeEnsemble) else shap_explainers.tree_paths(models.name, models.model)
+        return engine.predict_proba_with_contributions(X)
+    except Exception as e:
+        print(f"Error computing {models.kind} tree-path contributions: {e}")
+        return None
+
+def tree_path_recommendations(features: List[str], contributions: Optional[np.ndarray], fallback: List[str], n_rows: int) -> Tuple[List[List[str]], str]:
+    """Recommendations from tree-path contributions, with their source; the fallback list if there are none"""
+    if contributions is None:
+        return [list(fallback) for _ in range(n_rows)], SOURCE_FALLBACK
+    return [format_shap_recommendations(features, row) for row in contributions], SOURCE_TREE_PATH
 
 # ===== EXISTING BUSINESS HELPER FUNCTIONS =====
 
+# Input clamping bounds applied before feature engineering (lower, upper)
+EXISTING_BUSINESS_INPUT_BOUNDS = {
+    'business_capital': (10000, 1000000000),
+    'employment_first_year': (1, 10000),
+    'employment_second_year': (1, 10000),
+    'employment_third_year': (1, 10000),
+    'employment_fourth_year': (1, 10000),
+    'turnover_first_year': (0, 10000000000),
+    'turnover_second_year': (0, 10000000000),
+    'turnover_third_year': (0, 10000000000),
+    'turnover_fourth_year': (0, 10000000000)
+}
+
+# Existing business sector encoding - ALL 24 sectors from dataset
+EXISTING_SECTOR_MAPPING = {
+    'Other Service Activities': 0,
+    'Wholesale And Retail Trade; Repair Of Motor Vehicles And Motorcycles': 1,
+    'Transportation And Storage': 2,
+    'Financial And Insurance Activities': 3,
+    'Accommodation And Food Service Activities': 4,
+    'Unclassified': 5,
+    'Construction': 6,
+    'Professional, Scientific And Technical Activities': 7,
+    'Agriculture, Forestry And Fishing': 8,
+    'Manufacturing': 9,
+    'Information And Communication': 10,
+    'Administrative And Support Service Activities': 11,
+    'Education': 12,
+    'Arts, Entertainment And Recreation': 13,
+    'Human Health And Social Work Activities': 14,
+    'Water Supply, Gas And Remediation Services': 15,
+    'Mining And Quarrying': 16,
+    'Real Estate Activities': 17,
+    'Public Administration And Defence; Compulsory Social Security': 18,
+    'Activities Of Households As Employers; Undifferentiated Goods- And Services-Producing Activities Of Households For Own Use': 19,
+    'Electricity, Gas And Air Conditioning Supply': 20,
+    'Activities Of Extraterritorial Organizations And Bodies': 21,
+    'Motorcycle transport': 22,
+    'Activities of Mobile Money Agents': 23,
+    'Other': 24  # Fallback for unknown sectors
+}
+
+# Business scaling encoding
+SCALING_MAPPING = {
+    'High_Scaling': 0,
+    'Mixed_Performance': 1,
+    'Declining': 2
+}
+
+# Employment growth encoding - matching dataset values
+EMPLOYMENT_GROWTH_MAPPING = {
+    'Increased': 0,
+    'Decreased': 1,
+    'Stable': 2  # Changed from 'No_Change' to 'Stable' to match dataset
+}
+
+def sanitize_existing_business_data(data: ExistingBusinessData) -> ExistingBusinessData:
+    """Clamp numeric inputs to EXISTING_BUSINESS_INPUT_BOUNDS to prevent model crashes"""
+    for field, (lower, upper) in EXISTING_BUSINESS_INPUT_BOUNDS.items():
+        setattr(data, field, max(min(getattr(data, field), upper), lower))
+    return data
+
+def sanitize_existing_business_batch(businesses: List[ExistingBusinessData]) -> Dict[str, np.ndarray]:
+    """Gather the numeric inputs of many businesses into clamped NumPy columns"""
+    columns = {}
+    for field, (lower, upper) in EXISTING_BUSINESS_INPUT_BOUNDS.items():
+        values = np.array([getattr(business, field) for business in businesses], dtype=float)
+        columns[field] = np.clip(values, lower, upper)
+    return columns
+
 def engineer_features(data: ExistingBusinessData) -> Dict[str, float]:
     """Engineer features from existing business input data"""
     
@@ -569,102 +859,150 @@ def engineer_features(data: ExistingBusinessData) -> Dict[str, float]:
         'business_scaling_indicator': business_scaling
     }
 
-def encode_categorical_features(data: ExistingBusinessData, engineered: Dict[str, any]) -> Dict[str, int]:
-    """Encode categorical features for existing business prediction"""
+def engineer_features_batch(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Engineer existing business features for N rows as NumPy column operations (mirrors engineer_features)"""
     
-    # Business sector encoding - ALL 24 sectors from dataset
-    sector_mapping = {
-        'Other Service Activities': 0,
-        'Wholesale And Retail Trade; Repair Of Motor Vehicles And Motorcycles': 1,
-        'Transportation And Storage': 2,
-        'Financial And Insurance Activities': 3,
-        'Accommodation And Food Service Activities': 4,
-        'Unclassified': 5,
-        'Construction': 6,
-        'Professional, Scientific And Technical Activities': 7,
-        'Agriculture, Forestry And Fishing': 8,
-        'Manufacturing': 9,
-        'Information And Communication': 10,
-        'Administrative And Support Service Activities': 11,
-        'Education': 12,
-        'Arts, Entertainment And Recreation': 13,
-        'Human Health And Social Work Activities': 14,
-        'Water Supply, Gas And Remediation Services': 15,
-        'Mining And Quarrying': 16,
-        'Real Estate Activities': 17,
-        'Public Administration And Defence; Compulsory Social Security': 18,
-        'Activities Of Households As Employers; Undifferentiated Goods- And Services-Producing Activities Of Households For Own Use': 19,
-        'Electricity, Gas And Air Conditioning Supply': 20,
-        'Activities Of Extraterritorial Organizations And Bodies': 21,
-        'Motorcycle transport': 22,
-        'Activities of Mobile Money Agents': 23,
-        'Other': 24  # Fallback for unknown sectors
-    }
+    turnover = np.column_stack([columns['turnover_first_year'], columns['turnover_second_year'],
+                                columns['turnover_third_year'], columns['turnover_fourth_year']])
+    employment = np.column_stack([columns['employment_first_year'], columns['employment_second_year'],
+                                  columns['employment_third_year'], columns['employment_fourth_year']])
+    first_year, third_year = turnover[:, 0], turnover[:, 2]
     
-    # Business scaling encoding
-    scaling_mapping = {
-        'High_Scaling': 0,
-        'Mixed_Performance': 1,
-        'Declining': 2
-    }
+    # Calculate revenue growth rate, bounded to prevent extreme values
+    safe_first_year = np.where(first_year == 0, 1, first_year)
+    revenue_growth_rate = np.where(
+        first_year == 0,
+        np.where(third_year > 0, 300.0, 0.0),
+        (third_year - first_year) / safe_first_year * 100
+    )
+    revenue_growth_rate = np.clip(revenue_growth_rate, -100.0, 1000.0)
     
-    # Employment growth encoding - matching dataset values
-    employment_mapping = {
-        'Increased': 0,
-        'Decreased': 1,
-        'Stable': 2  # Changed from 'No_Change' to 'Stable' to match dataset
+    # Calculate revenue consistency score
+    revenue_std = np.std(turnover[:, :3], axis=1)
+    revenue_mean = np.mean(turnover[:, :3], axis=1)
+    revenue_consistency_score = 1 / (1 + (revenue_std / (revenue_mean + 1)))
+    
+    # Calculate employment efficiency, bounded to prevent extreme values
+    revenue_per_employee = turnover / np.maximum(employment, 1)
+    current_revenue_per_employee = revenue_per_employee[:, 3]
+    initial_revenue_per_employee = revenue_per_employee[:, 0]
+    safe_initial = np.where(initial_revenue_per_employee == 0, 1, initial_revenue_per_employee)
+    employment_efficiency = np.where(
+        initial_revenue_per_employee == 0,
+        np.where(current_revenue_per_employee > 0, 2.0, 1.0),
+        current_revenue_per_employee / safe_initial
+    )
+    employment_efficiency = np.clip(employment_efficiency, 0.1, 10.0)
+    
+    # Calculate capital efficiency, bounded to prevent extreme values
+    total_revenue = turnover[:, 0] + turnover[:, 1] + turnover[:, 2] + turnover[:, 3]
+    capital_efficiency = np.clip(total_revenue / np.maximum(columns['business_capital'], 1), 0.001, 1000.0)
+    
+    # Calculate revenue per employee trend, bounded to prevent extreme values
+    revenue_per_employee_trend = np.clip(np.mean(np.diff(revenue_per_employee, axis=1), axis=1), -10000000, 10000000)
+    
+    # Calculate turnover and employment growth
+    def growth_direction(first, fourth):
+        return np.select([fourth > first, fourth < first], ["Increased", "Decreased"], default="Stable")
+    
+    turnover_growth = growth_direction(turnover[:, 0], turnover[:, 3])
+    employment_growth = growth_direction(employment[:, 0], employment[:, 3])
+    
+    # Calculate business scaling bucket based on revenue and employment growth
+    revenue_change_pct = ((turnover[:, 3] - turnover[:, 0]) / np.maximum(turnover[:, 0], 1)) * 100
+    employment_change_pct = ((employment[:, 3] - employment[:, 0]) / np.maximum(employment[:, 0], 1)) * 100
+    avg_growth = (revenue_change_pct + employment_change_pct) / 2
+    business_scaling = np.select([avg_growth > 50, avg_growth > 10], ["High_Scaling", "Medium_Scaling"], default="Low_Scaling")
+    
+    return {
+        'revenue_growth_rate': revenue_growth_rate,
+        'revenue_consistency_score': revenue_consistency_score,
+        'employment_efficiency': employment_efficiency,
+        'capital_efficiency': capital_efficiency,
+        'current_revenue_per_employee': current_revenue_per_employee,
+        'revenue_per_employee_trend': revenue_per_employee_trend,
+        'turnover_growth': turnover_growth,
+        'employment_growth': employment_growth,
+        'business_scaling_indicator': business_scaling
     }
+
+def encode_categorical_features(data: ExistingBusinessData, engineered: Dict[str, any]) -> Dict[str, int]:
+    """Encode categorical features for existing business prediction"""
     
     encoded = {
-        'business_sector_encoded': sector_mapping.get(data.business_sector, 24),  # Default to 'Other' (index 24)
-        'business_scaling_encoded': scaling_mapping.get(engineered['business_scaling_indicator'], 1),  # Use calculated value
-        'employment_growth_encoded': employment_mapping.get(engineered['employment_growth'], 2)  # Use calculated value
+        'business_sector_encoded': EXISTING_SECTOR_MAPPING.get(data.business_sector, 24),  # Default to 'Other' (index 24)
+        'business_scaling_encoded': SCALING_MAPPING.get(engineered['business_scaling_indicator'], 1),  # Use calculated value
+        'employment_growth_encoded': EMPLOYMENT_GROWTH_MAPPING.get(engineered['employment_growth'], 2)  # Use calculated value
     }
     
     return encoded
 
-def generate_existing_business_recommendations(data: ExistingBusinessData, engineered: Dict, prediction_prob: float, input_features: np.ndarray) -> List[str]:
-    """Generate SHAP-based business recommendations"""
+def encode_categorical_features_batch(business_sectors: List[str], engineered: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Encode categorical features for many existing businesses at once"""
+    
+    return {
+        'business_sector_encoded': np.array([EXISTING_SECTOR_MAPPING.get(sector, 24) for sector in business_sectors]),
+        'business_scaling_encoded': np.array([SCALING_MAPPING.get(scaling, 1) for scaling in engineered['business_scaling_indicator']]),
+        'employment_growth_encoded': np.array([EMPLOYMENT_GROWTH_MAPPING.get(growth, 2) for growth in engineered['employment_growth']])
+    }
+
+def build_existing_feature_matrix(columns: Dict[str, np.ndarray], engineered: Dict[str, np.ndarray], encoded: Dict[str, np.ndarray]) -> np.ndarray:
+    """Stack batch columns into the model's feature order (see feature_names)"""
+    
+    return np.column_stack([
+        columns['turnover_first_year'],
+        columns['turnover_second_year'],
+        columns['turnover_third_year'],
+        columns['turnover_fourth_year'],
+        columns['employment_first_year'],
+        columns['employment_second_year'],
+        columns['employment_third_year'],
+        columns['employment_fourth_year'],
+        engineered['revenue_per_employee_trend'],
+        engineered['employment_efficiency'],
+        columns['business_capital'],
+        np.maximum(columns['employment_fourth_year'], 1),
+        encoded['business_sector_encoded'],
+        encoded['business_scaling_encoded'],
+        encoded['employment_growth_encoded']
+    ]).astype(float)
+
+EXISTING_BUSINESS_FALLBACK_RECOMMENDATIONS = [
+    "1. Monitor revenue trends and implement growth strategies",
+    "2. Optimize employment efficiency and productivity",
+    "3. Strengthen financial management practices",
+    "4. Focus on business scaling indicators",
+    "5. Enhance market positioning and competitiveness"
+]
+
+def generate_existing_business_recommendations(data: ExistingBusinessData, engineered: Dict, prediction_prob: float, input_features: np.ndarray, models: ModelVersion) -> Tuple[List[str], str]:
+    """Generate SHAP-based business recommendations, with their source"""
     
     try:
-        # Create SHAP explainer for the model
-        explainer = shap.TreeExplainer(xgb_model)
+        # Reuse the SHAP explainer built for this version of the existing business model
+        explainer = shap_explainers.get(models.name, models.model)
         
         # Calculate SHAP values for this specific prediction
-        shap_values = explainer.shap_values(input_features.reshape(1, -1))
-        
-        # Get feature impacts with names
-        feature_impacts = list(zip(feature_names, shap_values[0]))
+        shap_vals = positive_class_shap_values(explainer.shap_values(input_features.reshape(1, -1)))[0]
         
-        # Sort by absolute impact (most influential features first)
-        top_features = sorted(feature_impacts, key=lambda x: abs(x[1]), reverse=True)[:5]
+        # Feature impacts follow feature_names order
+        return format_shap_recommendations(feature_names, shap_vals), SOURCE_SHAP
         
-        recommendations = []
-        
-        # Generate recommendations based on SHAP insights
-        for i, (feature, impact) in enumerate(top_features, 1):
-            feature_name = feature.replace('_', ' ').title()
-            
-            if impact < -0.1:  # Strong negative impact
-                recommendations.append(f"{i}. Improve {feature_name}: This factor is significantly reducing your success probability (Impact: {impact:.3f})")
-            elif impact < 0:  # Mild negative impact
-                recommendations.append(f"{i}. Address {feature_name}: Minor negative influence on success - consider optimization (Impact: {impact:.3f})")
-            elif impact > 0.1:  # Strong positive impact
-                recommendations.append(f"{i}. Leverage {feature_name}: Strong positive driver - maintain and enhance this strength (Impact: +{impact:.3f})")
-            else:  # Mild positive impact
-                recommendations.append(f"{i}. Optimize {feature_name}: Positive contributor - opportunities for further improvement (Impact: +{impact:.3f})")
-        
-        return recommendations
+    except Exception as e:
+        # Fallback to basic recommendations if SHAP fails
+        return list(EXISTING_BUSINESS_FALLBACK_RECOMMENDATIONS), SOURCE_FALLBACK
+
+def generate_existing_business_recommendations_batch(scaled_matrix: np.ndarray, models: ModelVersion) -> Tuple[List[List[str]], str]:
+    """Generate SHAP-based recommendations for every row of a batch with one explainer call, with their source"""
+    
+    try:
+        explainer = shap_explainers.get(models.name, models.model)
+        shap_matrix = positive_class_shap_values(explainer.shap_values(scaled_matrix))
+        return [format_shap_recommendations(feature_names, row) for row in shap_matrix], SOURCE_SHAP
         
     except Exception as e:
         # Fallback to basic recommendations if SHAP fails
-        return [
-            "1. Monitor revenue trends and implement growth strategies",
-            "2. Optimize employment efficiency and productivity",
-            "3. Strengthen financial management practices", 
-            "4. Focus on business scaling indicators",
-            "5. Enhance market positioning and competitiveness"
-        ]
+        return [list(EXISTING_BUSINESS_FALLBACK_RECOMMENDATIONS) for _ in range(len(scaled_matrix))], SOURCE_FALLBACK
 
 def identify_risk_factors(data: ExistingBusinessData, engineered: Dict) -> List[str]:
     """Identify potential risk factors"""
@@ -697,6 +1035,57 @@ def identify_risk_factors(data: ExistingBusinessData, engineered: Dict) -> List[
     
     return risks
 
+def build_business_insights(engineered: Dict) -> Dict[str, Any]:
+    """Summarize engineered features into the business insights shown to users"""
+    return {
+        "revenue_growth_rate": round(float(engineered['revenue_growth_rate']), 2),
+        "employment_growth": str(engineered['employment_growth']),
+        "business_scaling": str(engineered['business_scaling_indicator']),
+        "employment_efficiency": round(float(engineered['employment_efficiency']), 3),
+        "revenue_consistency": round(float(engineered['revenue_consistency_score']), 3),
+        "current_revenue_per_employee": round(float(engineered['current_revenue_per_employee']), 0),
+        "capital_efficiency": round(float(engineered['capital_efficiency']), 3)
+    }
+
+def existing_model_version() -> Optional[str]:
+    """Version of the active existing business model"""
+    return active_model_versions().get("existing_business")
+
+def score_existing_business_batch(feature_matrix: np.ndarray, models: ModelVersion, with_tree_paths: bool = False) -> Tuple[Dict[int, np.ndarray], Dict[int, np.ndarray], Dict[int, np.ndarray], Dict[int, str]]:
+    """Scale and score a batch feature matrix in one call, keyed by row position.
+    
+    Returns (scaled rows, probabilities, tree-path contributions, errors); contributions are
+    only computed, in the scoring walk, when with_tree_paths is set.
+    """
+    if len(feature_matrix) == 0:
+        return {}, {}, {}, {}
+    
+    try:
+        with stage("scale"):
+            scaled_matrix = models.scaler.transform(feature_matrix)
+        with stage("predict"):
+            walked = walk_tree_paths(models, scaled_matrix) if with_tree_paths else None
+            probabilities = walked[0] if walked else models.scorer.predict_proba(scaled_matrix)
+        contributions = dict(enumerate(walked[1])) if walked else {}
+        return dict(enumerate(scaled_matrix)), dict(enumerate(probabilities)), contributions, {}
+    except Exception:
+        pass
+    
+    # The batch call failed, so score rows one at a time to report which ones are bad
+    scaled_rows, probabilities, errors = {}, {}, {}
+    for i, feature_vector in enumerate(feature_matrix):
+        try:
+            scaled_rows[i] = models.scaler.transform(feature_vector.reshape(1, -1))[0]
+        except Exception:
+            errors[i] = "Input values outside valid business ranges. Please check your data and try again."
+            continue
+        try:
+            probabilities[i] = models.scorer.predict_proba(scaled_rows[i].reshape(1, -1))[0]
+        except Exception:
+            del scaled_rows[i]
+            errors[i] = "Unable to process prediction with provided data. Please verify input ranges."
+    return scaled_rows, probabilities, {}, errors
+
 # ===== API ENDPOINTS =====
 
 @app.get("/")
@@ -714,9 +1103,67 @@ async def health_check():
     return {
         "status": "healthy",
         "model_loaded": trained_model is not None,
+        "inference_pool": inference_pool.stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "prediction_log": prediction_log.stats(),
+        "admin_events": admin_events.stats(),
+        "explanations": shap_explainers.stats(),
+        "explanation_jobs": explanation_jobs.stats(),
+        "model_versions": active_model_versions(),
+        "startup_seconds": None if startup_seconds is None else round(startup_seconds, 3),
+        "ready": readiness.ready,
+        "coalescers": {
+            "new_business": new_business_coalescer.stats(),
+            "existing_business": existing_business_coalescer.stats()
+        },
         "timestamp": datetime.now().isoformat()
     }
 
+def collect_runtime_metrics():
+    """Pool, cache, log and stream figures kept by their own components, read at scrape time"""
+    pool = inference_pool.stats()
+    yield ("sme_inference_pool_queue_depth", "gauge", "Requests waiting for an inference worker", {}, pool["queued"])
+    yield ("sme_inference_pool_active", "gauge", "Inference workers busy", {}, pool["active"])
+    yield ("sme_inference_pool_workers", "gauge", "Inference pool size", {"mode": pool["mode"]}, pool["workers"])
+    yield ("sme_inference_pool_tasks_total", "counter", "Inference tasks finished", {"result": "completed"}, pool["completed"])
+    yield ("sme_inference_pool_tasks_total", "counter", "Inference tasks finished", {"result": "failed"}, pool["failed"])
+    
+    cache = prediction_cache.stats()
+    for key in ("hits", "misses", "evictions", "expired"):
+        yield (f"sme_prediction_cache_{key}_total", "counter", f"Prediction cache {key}", {}, cache[key])
+    yield ("sme_prediction_cache_size", "gauge", "Responses held in the prediction cache", {}, cache["size"])
+    
+    log = prediction_log.stats()
+    yield ("sme_prediction_log_buffered", "gauge", "Predictions waiting to be written to the store", {}, log["buffered"])
+    yield ("sme_prediction_log_write_errors_total", "counter", "Failed prediction log writes", {}, log["write_errors"])
+    
+    for name, coalescer in (("new_business", new_business_coalescer), ("existing_business", existing_business_coalescer)):
+        stats = coalescer.stats()
+        yield ("sme_coalescer_batches_total", "counter", "Micro-batches flushed by the request coalescers", {"model": name}, stats["batches"])
+        yield ("sme_coalescer_requests_total", "counter", "Requests served through the request coalescers", {"model": name}, stats["requests"])
+    
+    yield ("sme_admin_event_subscribers", "gauge", "Open admin event streams", {}, admin_events.stats()["subscribers"])
+    
+    jobs = explanation_jobs.stats()
+    yield ("sme_explanation_jobs_queued", "gauge", "Explanation jobs waiting for a worker", {}, jobs["queued"])
+    for result in ("completed", "failed", "expired"):
+        yield ("sme_explanation_jobs_total", "counter", "Explanation jobs finished or expired", {"result": result}, jobs[result])
+    
+    yield ("sme_ready", "gauge", "1 once the startup warmup has met the latency budget", {}, int(readiness.ready))
+
+metrics_registry.describe("sme_stage_duration_seconds", "Time spent in each prediction stage, by endpoint and model version")
+metrics_registry.describe("sme_http_requests_total", "HTTP requests by route, method and status")
+metrics_registry.describe("sme_http_request_errors_total", "HTTP requests answered with a 5xx status")
+metrics_registry.describe("sme_http_request_duration_seconds", "HTTP request latency by route")
+metrics_registry.describe("sme_prediction_failures_total", "Predictions returned as failed, including rows of batch requests")
+metrics_registry.describe("sme_explanation_jobs_rejected_total", "explain_async predictions returned without a ticket because the job queue was full")
+metrics_registry.add_collector(collect_runtime_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics: stage and request latency histograms, request and error counts, cache and pool figures"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/categories")
 async def get_categories():
     """Get all available categories for categorical features"""
@@ -731,38 +1178,46 @@ async def get_categories():
         "genders": list(CATEGORICAL_MAPPINGS['owner_gender'].keys())
     }
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_sme_success(business_data: BusinessData):
-    """Make a prediction for SME success"""
-    
-    if trained_model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+# ===== PREDICTION CORES (run on the inference pool) =====
+
+def run_new_business_prediction(data_dict: Dict[str, Any], explain: bool = True, explain_method: str = "shap",
+                                model_version: Optional[str] = None) -> Tuple[PredictionResponse, Optional[dict]]:
+    """Score and (unless explain is False) explain one new business with the given (default: active) model version,
+    returning the response and its log entry"""
     
+    models = model_registry.get("new_business", model_version)
     try:
-        # Convert Pydantic model to dict
-        data_dict = business_data.dict()
-        
         # Preprocess the data
-        processed_data = preprocess_business_data(data_dict)
-        
-        # Make prediction
-        prediction = trained_model.predict(processed_data)[0]
-        prediction_proba = trained_model.predict_proba(processed_data)[0]
+        with stage("preprocess"):
+            processed_data = preprocess_business_data(data_dict)
+        
+        # Make prediction with a single pass over the ensemble, taking fast attributions from the same walk
+        fast = explain and explain_method == "fast"
+        with stage("predict"):
+            walked = walk_tree_paths(models, processed_data) if fast else None
+            if walked:
+                probabilities, contributions = walked
+                labels, confidences = classify(probabilities, models.scorer.classes_, NEW_BUSINESS_DECISION_THRESHOLD)
+            else:
+                probabilities, labels, confidences = score(models.scorer, processed_data, NEW_BUSINESS_DECISION_THRESHOLD)
+                contributions = None
+        prediction = labels[0]
         
         # Get success probability
-        success_probability = prediction_proba[1]  # Probability of success (class 1)
+        success_probability = probabilities[0][1]  # Probability of success (class 1)
         
         # Determine confidence level
-        confidence = max(prediction_proba)
-        if confidence >= 0.8:
-            confidence_level = "High"
-        elif confidence >= 0.6:
-            confidence_level = "Medium"
-        else:
-            confidence_level = "Low"
+        confidence_level = get_confidence_level(confidences[0])
         
         # Generate recommendations
-        recommendations = generate_new_business_recommendations(data_dict, success_probability, processed_data)
+        recommendations, recommendation_source = None, SOURCE_NONE
+        if fast:
+            with stage("explain"):
+                explained, recommendation_source = tree_path_recommendations(PREDICTION_FEATURES, contributions, NEW_BUSINESS_FALLBACK_RECOMMENDATIONS, 1)
+            recommendations = explained[0]
+        elif explain:
+            with stage("explain"):
+                recommendations, recommendation_source = generate_new_business_recommendations(data_dict, success_probability, processed_data, models)
         
         # Prepare response
         response = PredictionResponse(
@@ -771,169 +1226,616 @@ async def predict_sme_success(business_data: BusinessData):
             prediction_label="Successful" if prediction == 1 else "Unsuccessful",
             success_probability=round(success_probability, 4),
             confidence_level=confidence_level,
-            recommendations=recommendations
+            recommendations=recommendations,
+            recommendation_source=recommendation_source
         )
         
-        # Log prediction
-        log_prediction(
-            prediction_type="new_business",
-            input_data=data_dict,
-            prediction_result={
-                "prediction": int(prediction),
-                "prediction_label": "Successful" if prediction == 1 else "Unsuccessful",
-                "success_probability": round(success_probability, 4),
+        prediction_result = {
+            "prediction": int(prediction),
+            "prediction_label": "Successful" if prediction == 1 else "Unsuccessful",
+            "success_probability": round(success_probability, 4),
+            "confidence_level": confidence_level
+        }
+        
+        return response, prediction_result
+        
+    except Exception as e:
+        return PredictionResponse(success=False, error=str(e)), None
+
+def run_new_business_predictions(records: List[Dict[str, Any]], explain: Union[bool, List[bool]] = True,
+                                 explain_method: Union[str, List[str]] = "shap", model_version: Optional[str] = None) -> List[Tuple[PredictionResponse, Optional[dict]]]:
+    """Score and explain many new businesses with one model version, returning each row's response and log result.
+    
+    explain and explain_method are one value for the batch or one per record; rows with
+    explain off skip attribution, and "fast" rows take tree-path contributions from the scoring walk.
+    """
+    
+    models = model_registry.get("new_business", model_version)
+    outcomes: Dict[int, Tuple[PredictionResponse, Optional[dict]]] = {}
+    
+    try:
+        # Step 1: Encode all rows into one feature matrix
+        with stage("preprocess"):
+            processed_data, row_ids, errors = preprocess_business_batch(records)
+        for i, error in errors.items():
+            outcomes[i] = (PredictionResponse(success=False, error=error), None)
+        
+        # Step 2: Score the whole matrix in one call, isolating bad rows only if it fails;
+        # when any row wants fast attributions, one walk over the compiled trees scores and attributes
+        row_index = np.array(row_ids, dtype=int)
+        fast_rows = explain_rows(explain, len(records))[row_index] & (explain_rows(explain_method, len(records), object)[row_index] == "fast")
+        with stage("predict"):
+            walked = walk_tree_paths(models, processed_data) if fast_rows.any() else None
+            if walked:
+                probabilities, score_errors = dict(zip(row_ids, walked[0])), {}
+            else:
+                probabilities, score_errors = score_new_business_batch(processed_data, row_ids, models)
+        for i, error in score_errors.items():
+            outcomes[i] = (PredictionResponse(success=False, error=error), None)
+        scored_mask = np.array([i not in score_errors for i in row_ids], dtype=bool)
+        scored_data = processed_data[scored_mask]
+        scored_ids = [i for i in row_ids if i not in score_errors]
+        
+        # Step 3: Explain every scored row that asked for it, with one SHAP call or the walk's contributions
+        fast_mask = fast_rows[scored_mask]
+        shap_mask = explain_rows(explain, len(records))[np.array(scored_ids, dtype=int)] & ~fast_mask
+        recommendations = [None] * len(scored_ids)
+        sources = [SOURCE_NONE] * len(scored_ids)
+        if shap_mask.any():
+            with stage("explain"):
+                explained, source = generate_new_business_recommendations_batch(scored_data[shap_mask], models)
+            for j, row_recommendations in zip(np.flatnonzero(shap_mask), explained):
+                recommendations[j], sources[j] = row_recommendations, source
+        if fast_mask.any():
+            with stage("explain"):
+                explained, source = tree_path_recommendations(
+                    PREDICTION_FEATURES, walked[1][scored_mask][fast_mask] if walked else None,
+                    NEW_BUSINESS_FALLBACK_RECOMMENDATIONS, int(fast_mask.sum())
+                )
+            for j, row_recommendations in zip(np.flatnonzero(fast_mask), explained):
+                recommendations[j], sources[j] = row_recommendations, source
+        
+        # Step 4: Threshold every scored row at once
+        scored_probabilities = np.array([probabilities[i] for i in scored_ids])
+        labels, confidences = classify(scored_probabilities, models.scorer.classes_, NEW_BUSINESS_DECISION_THRESHOLD)
+        
+        # Step 5: Build per-row responses and their log results
+        for row_recommendations, source, i, label, confidence in zip(recommendations, sources, scored_ids, labels, confidences):
+            prediction = int(label)
+            success_probability = round(float(probabilities[i][1]), 4)
+            confidence_level = get_confidence_level(confidence)
+            prediction_label = "Successful" if prediction == 1 else "Unsuccessful"
+            
+            response = PredictionResponse(
+                success=True,
+                prediction=prediction,
+                prediction_label=prediction_label,
+                success_probability=success_probability,
+                confidence_level=confidence_level,
+                recommendations=row_recommendations,
+                recommendation_source=source
+            )
+            outcomes[i] = (response, {
+                "prediction": prediction,
+                "prediction_label": prediction_label,
+                "success_probability": success_probability,
                 "confidence_level": confidence_level
-            }
+            })
+        
+    except Exception as e:
+        for i in range(len(records)):
+            outcomes.setdefault(i, (PredictionResponse(success=False, error=str(e)), None))
+    
+    return [outcomes[i] for i in range(len(records))]
+
+def run_existing_business_prediction(business_data: ExistingBusinessData, explain: bool = True, explain_method: str = "shap",
+                                     model_version: Optional[str] = None) -> Tuple[ExistingBusinessPredictionResponse, dict, dict]:
+    """Score and (unless explain is False) explain one existing business with the given (default: active) model version,
+    returning the response, sanitized input and log entry"""
+    
+    models = model_registry.get("existing_business", model_version)
+    
+    # Step 0: Sanitize input data to prevent model crashes
+    with stage("sanitize"):
+        sanitize_existing_business_data(business_data)
+    
+    # Step 1: Engineer features
+    with stage("engineer_features"):
+        engineered = engineer_features(business_data)
+    
+    # Step 2: Encode categorical features
+    with stage("encode_categorical"):
+        encoded = encode_categorical_features(business_data, engineered)
+    
+    # Step 3: Create feature vector
+    feature_vector = np.array([
+        business_data.turnover_first_year,
+        business_data.turnover_second_year, 
+        business_data.turnover_third_year,
+        business_data.turnover_fourth_year,
+        business_data.employment_first_year,
+        business_data.employment_second_year,
+        business_data.employment_third_year,
+        business_data.employment_fourth_year,
+        engineered['revenue_per_employee_trend'],
+        engineered['employment_efficiency'],
+        business_data.business_capital,
+        max(business_data.employment_fourth_year, 1),
+        encoded['business_sector_encoded'],
+        encoded['business_scaling_encoded'],
+        encoded['employment_growth_encoded']
+    ]).reshape(1, -1)
+    
+    # Step 4: Scale features
+    try:
+        with stage("scale"):
+            feature_vector_scaled = models.scaler.transform(feature_vector)
+    except Exception as scaling_error:
+        raise ValueError("Input values outside valid business ranges. Please check your data and try again.")
+    
+    # Step 5: Make prediction with a single pass over the ensemble, taking fast attributions from the same walk
+    fast = explain and explain_method == "fast"
+    try:
+        with stage("predict"):
+            walked = walk_tree_paths(models, feature_vector_scaled) if fast else None
+            if walked:
+                probabilities, contributions = walked
+                labels, confidences = classify(probabilities, models.scorer.classes_, EXISTING_BUSINESS_DECISION_THRESHOLD)
+            else:
+                probabilities, labels, confidences = score(models.scorer, feature_vector_scaled, EXISTING_BUSINESS_DECISION_THRESHOLD)
+                contributions = None
+    except Exception as prediction_error:
+        raise ValueError("Unable to process prediction with provided data. Please verify input ranges.")
+    
+    prediction = labels[0]
+    success_probability = probabilities[0][1]
+    confidence = confidences[0]
+    prediction_label = "Success" if prediction == 1 else "Failure"
+    
+    # Step 6: Generate insights and recommendations
+    recommendations, recommendation_source = [], SOURCE_NONE
+    if fast:
+        with stage("explain"):
+            explained, recommendation_source = tree_path_recommendations(feature_names, contributions, EXISTING_BUSINESS_FALLBACK_RECOMMENDATIONS, 1)
+        recommendations = explained[0]
+    elif explain:
+        with stage("explain"):
+            recommendations, recommendation_source = generate_existing_business_recommendations(business_data, engineered, success_probability, feature_vector_scaled, models)
+    with stage("risk_factors"):
+        risk_factors = identify_risk_factors(business_data, engineered)
+    
+    # Step 7: Prepare business insights
+    business_insights = build_business_insights(engineered)
+    
+    # Prepare response
+    response = ExistingBusinessPredictionResponse(
+        success=bool(prediction),
+        prediction=prediction_label,
+        success_probability=float(success_probability),
+        confidence=float(confidence),
+        business_insights=business_insights,
+        recommendations=recommendations,
+        recommendation_source=recommendation_source,
+        risk_factors=risk_factors,
+        model_version=models.version,
+        timestamp=datetime.now().isoformat()
+    )
+    
+    prediction_result = {
+        "prediction": prediction_label,
+        "success_probability": float(success_probability),
+        "confidence": float(confidence),
+        "business_insights": business_insights
+    }
+    
+    return response, business_data.dict(), prediction_result
+
+def run_existing_business_predictions(businesses: List[ExistingBusinessData], explain: Union[bool, List[bool]] = True,
+                                      explain_method: Union[str, List[str]] = "shap", model_version: Optional[str] = None) -> List[Tuple[Optional[ExistingBusinessPredictionResponse], Optional[dict], Optional[dict], Optional[str]]]:
+    """Score and explain many existing businesses with one model version.
+    
+    Each row yields (response, sanitized input, log result, error), with error set only when the row failed.
+    explain and explain_method are one value for the batch or one per business; rows with explain
+    off skip attribution, and "fast" rows take tree-path contributions from the scoring walk.
+    """
+    
+    models = model_registry.get("existing_business", model_version)
+    outcomes: Dict[int, Tuple[Any, Any, Any, Optional[str]]] = {}
+    
+    try:
+        # Step 0: Sanitize all rows into clamped NumPy columns
+        with stage("sanitize"):
+            columns = sanitize_existing_business_batch(businesses)
+        
+        # Step 1-3: Engineer, encode and stack features for the whole batch
+        with stage("engineer_features"):
+            engineered = engineer_features_batch(columns)
+        with stage("encode_categorical"):
+            encoded = encode_categorical_features_batch([business.business_sector for business in businesses], engineered)
+            feature_matrix = build_existing_feature_matrix(columns, engineered, encoded)
+        
+        # Step 4-5: Scale and score the whole matrix in one call
+        fast_rows = explain_rows(explain, len(businesses)) & (explain_rows(explain_method, len(businesses), object) == "fast")
+        scaled_rows, probabilities, contributions, errors = score_existing_business_batch(feature_matrix, models, with_tree_paths=bool(fast_rows.any()))
+        for i, error in errors.items():
+            outcomes[i] = (None, None, None, error)
+        
+        # Step 6: Explain every scored row that asked for it, with one SHAP call or the walk's contributions
+        scored_rows = sorted(probabilities)
+        scored_index = np.array(scored_rows, dtype=int)
+        fast_mask = fast_rows[scored_index]
+        shap_mask = explain_rows(explain, len(businesses))[scored_index] & ~fast_mask
+        recommendations = [[] for _ in scored_rows]
+        sources = [SOURCE_NONE] * len(scored_rows)
+        if shap_mask.any():
+            with stage("explain"):
+                explained, source = generate_existing_business_recommendations_batch(
+                    np.array([scaled_rows[i] for i in scored_index[shap_mask]]), models
+                )
+            for j, row_recommendations in zip(np.flatnonzero(shap_mask), explained):
+                recommendations[j], sources[j] = row_recommendations, source
+        if fast_mask.any():
+            with stage("explain"):
+                explained, source = tree_path_recommendations(
+                    feature_names, np.array([contributions[i] for i in scored_index[fast_mask]]) if contributions else None,
+                    EXISTING_BUSINESS_FALLBACK_RECOMMENDATIONS, int(fast_mask.sum())
+                )
+            for j, row_recommendations in zip(np.flatnonzero(fast_mask), explained):
+                recommendations[j], sources[j] = row_recommendations, source
+        
+        # Step 7: Threshold every scored row at once
+        labels, confidences = classify(
+            np.array([probabilities[i] for i in scored_rows]), models.scorer.classes_, EXISTING_BUSINESS_DECISION_THRESHOLD
         )
         
+        # Step 8: Build per-row responses and their log results
+        engineered_rows = {key: values.tolist() for key, values in engineered.items()}
+        timestamp = datetime.now().isoformat()
+        for row_recommendations, source, i, label, confidence in zip(recommendations, sources, scored_rows, labels, confidences):
+            row_engineered = {key: values[i] for key, values in engineered_rows.items()}
+            success_probability = probabilities[i][1]
+            prediction = int(label)
+            prediction_label = "Success" if prediction == 1 else "Failure"
+            business_insights = build_business_insights(row_engineered)
+            with stage("risk_factors"):
+                risk_factors = identify_risk_factors(businesses[i], row_engineered)
+            
+            response = ExistingBusinessPredictionResponse(
+                success=bool(prediction),
+                prediction=prediction_label,
+                success_probability=float(success_probability),
+                confidence=float(confidence),
+                business_insights=business_insights,
+                recommendations=row_recommendations,
+                recommendation_source=source,
+                risk_factors=risk_factors,
+                model_version=models.version,
+                timestamp=timestamp
+            )
+            
+            # Log the sanitized input, as the single-row endpoint does
+            input_data = businesses[i].dict()
+            for field in EXISTING_BUSINESS_INPUT_BOUNDS:
+                value = getattr(businesses[i], field)
+                input_data[field] = type(value)(columns[field][i])
+            
+            outcomes[i] = (response, input_data, {
+                "prediction": prediction_label,
+                "success_probability": float(success_probability),
+                "confidence": float(confidence),
+                "business_insights": business_insights
+            }, None)
+        
+    except Exception as e:
+        for i in range(len(businesses)):
+            outcomes.setdefault(i, (None, None, None, str(e)))
+    
+    return [outcomes[i] for i in range(len(businesses))]
+
+# ===== REQUEST COALESCING =====
+
+def group_by_version(versions: List[str]) -> Dict[str, List[int]]:
+    """Positions of the items for each model version; items started on different versions are scored apart"""
+    groups: Dict[str, List[int]] = {}
+    for i, version in enumerate(versions):
+        groups.setdefault(version, []).append(i)
+    return groups
+
+async def score_new_business_coalesced(items: List[Tuple[Dict[str, Any], bool, str, str]]) -> List[Tuple[PredictionResponse, Optional[dict]]]:
+    """Batch function for the /predict coalescer: one pool call and one log write per batch of (record, explain, method, version)"""
+    outcomes: List[Any] = [None] * len(items)
+    for version, positions in group_by_version([item[3] for item in items]).items():
+        group = [items[i] for i in positions]
+        records = [record for record, _, _, _ in group]
+        group_outcomes = await run_inference(
+            "predict", version, run_new_business_predictions,
+            records, [explain for _, explain, _, _ in group], [method for _, _, method, _ in group], version
+        )
+        with metrics_registry.timed("predict", version, "log_prediction"):
+            log_predictions([
+                ("new_business", record, prediction_result)
+                for record, (_, prediction_result) in zip(records, group_outcomes)
+                if prediction_result is not None
+            ])
+        for i, outcome in zip(positions, group_outcomes):
+            outcomes[i] = outcome
+    return outcomes
+
+async def score_existing_business_coalesced(items: List[Tuple[ExistingBusinessData, bool, str, str]]) -> List[Tuple[Optional[ExistingBusinessPredictionResponse], Optional[dict], Optional[dict], Optional[str]]]:
+    """Batch function for the /predict-existing-business coalescer, over (business, explain, method, version) items"""
+    outcomes: List[Any] = [None] * len(items)
+    for version, positions in group_by_version([item[3] for item in items]).items():
+        group = [items[i] for i in positions]
+        group_outcomes = await run_inference(
+            "predict_existing_business", version, run_existing_business_predictions,
+            [business for business, _, _, _ in group], [explain for _, explain, _, _ in group], [method for _, _, method, _ in group], version
+        )
+        with metrics_registry.timed("predict_existing_business", version, "log_prediction"):
+            log_predictions([
+                ("existing_business", input_data, prediction_result)
+                for _, input_data, prediction_result, error in group_outcomes
+                if error is None
+            ])
+        for i, outcome in zip(positions, group_outcomes):
+            outcomes[i] = outcome
+    return outcomes
+
+new_business_coalescer = RequestCoalescer("new_business", score_new_business_coalesced)
+existing_business_coalescer = RequestCoalescer("existing_business", score_existing_business_coalesced)
+
+# ===== EXPLANATION JOBS =====
+
+async def run_explanation_jobs(kind: str, payloads: List[Tuple[Any, str, str]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Job function for explanation_jobs: explain queued (input, explain_method, model version) payloads, one pool call per version"""
+    results: List[Any] = [None] * len(payloads)
+    for version, positions in group_by_version([payload[2] for payload in payloads]).items():
+        inputs = [payloads[i][0] for i in positions]
+        methods = [payloads[i][1] for i in positions]
+        if kind == "new_business":
+            outcomes = await run_inference("explanation_job", version, run_new_business_predictions, inputs, True, methods, version)
+            explained = [
+                ({"recommendations": response.recommendations, "recommendation_source": response.recommendation_source}, None)
+                if response.success else (None, response.error)
+                for response, _ in outcomes
+            ]
+        else:
+            outcomes = await run_inference("explanation_job", version, run_existing_business_predictions, inputs, True, methods, version)
+            explained = [
+                ({"recommendations": response.recommendations, "recommendation_source": response.recommendation_source}, None)
+                if error is None else (None, error)
+                for response, _, _, error in outcomes
+            ]
+        for i, result in zip(positions, explained):
+            results[i] = result
+    return results
+
+# Background explanations for explain_async requests (see explanation_jobs.py for settings)
+explanation_jobs = ExplanationJobQueue(run_explanation_jobs)
+
+def explain_later(explain: bool, explain_async: bool, explain_method: str) -> bool:
+    """Whether to return the score first and queue the explanation; fast attributions cost no more than scoring, so they stay inline"""
+    return explain and explain_async and explain_method != "fast"
+
+def attach_explanation_job(response: BaseModel, kind: str, payload: Tuple[Any, str, str]) -> BaseModel:
+    """Queue the response's explanation and return a copy carrying its ticket; unchanged (source "none") if the queue is full"""
+    job = explanation_jobs.submit(kind, payload)
+    if job is None:
+        metrics_registry.inc("sme_explanation_jobs_rejected_total", {"model": kind})
+        return response
+    return response.copy(update={"explanation_id": job.id, "recommendation_source": SOURCE_PENDING})
+
+# ===== NEW BUSINESS ENDPOINTS =====
+
+def request_explain_method(explain_method: Optional[str]) -> str:
+    """The request's explanation method or the server default; 400 if unknown"""
+    try:
+        return resolve_explain_method(explain_method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/predict", response_model=PredictionResponse)
+async def predict_sme_success(business_data: BusinessData, explain: Optional[bool] = Query(None, description="Generate SHAP recommendations; defaults to the server's EXPLAIN_BY_DEFAULT"),
+        explain_method: Optional[str] = Query(None, description="'shap' for exact SHAP values or 'fast' for tree-path contributions; defaults to the server's EXPLAIN_METHOD"),
+        explain_async: bool = Query(False, description="Return the score now and the recommendations later from /explanations/{explanation_id}")):
+    """Make a prediction for SME success"""
+    
+    explain = resolve_explain(explain)
+    explain_method = request_explain_method(explain_method)
+    
+    # The request is served start to finish by the version active now, even if another is swapped in meanwhile
+    models = model_registry.active("new_business")
+    if models is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    model_version = models.version
+    
+    if explain_later(explain, explain_async, explain_method):
+        # Score without SHAP now; the explanation job runs after the response is sent
+        response = await predict_sme_success(business_data, False, explain_method, False)
+        if not response.success:
+            return response
+        return attach_explanation_job(response, "new_business", (business_data.dict(), explain_method, model_version))
+    
+    try:
+        # Convert Pydantic model to dict
+        data_dict = business_data.dict()
+        
+        # Serve repeated submissions from the response cache
+        with metrics_registry.timed("predict", model_version, "cache_lookup"):
+            cache_key = prediction_cache.key("new_business", data_dict, model_version, {"explain": explain, "explain_method": explain_method})
+            cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            response, prediction_result = cached
+            log_prediction("new_business", data_dict, prediction_result)
+            return response
+        
+        if new_business_coalescer.enabled:
+            # Join a micro-batch with concurrent requests (the batch is logged by the coalescer)
+            response, prediction_result = await new_business_coalescer.submit((data_dict, explain, explain_method, model_version))
+        else:
+            # Score and explain on the inference pool
+            response, prediction_result = await run_inference("predict", model_version, run_new_business_prediction, data_dict, explain, explain_method, model_version)
+            
+            # Log prediction
+            if prediction_result is not None:
+                with metrics_registry.timed("predict", model_version, "log_prediction"):
+                    log_prediction("new_business", data_dict, prediction_result)
+        
+        if prediction_result is not None:
+            prediction_cache.put(cache_key, (response, prediction_result))
+        else:
+            metrics_registry.inc("sme_prediction_failures_total", {"endpoint": "predict"})
+        
         return response
         
     except Exception as e:
+        metrics_registry.inc("sme_prediction_failures_total", {"endpoint": "predict"})
         return PredictionResponse(
             success=False,
             error=str(e)
         )
 
 @app.post("/batch-predict")
-async def batch_predict(businesses: list[BusinessData]):
-    """Make predictions for multiple businesses"""
+async def batch_predict(businesses: list[BusinessData], explain: Optional[bool] = Query(None, description="Generate SHAP recommendations; defaults to the server's EXPLAIN_BY_DEFAULT"),
+        explain_method: Optional[str] = Query(None, description="'shap' for exact SHAP values or 'fast' for tree-path contributions; defaults to the server's EXPLAIN_METHOD")):
+    """Make predictions for multiple businesses with one model call over the whole batch"""
     
-    if trained_model is None:
+    explain = resolve_explain(explain)
+    explain_method = request_explain_method(explain_method)
+    models = model_registry.active("new_business")
+    if models is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
+    model_version = models.version
     
-    if len(businesses) > 100:
-        raise HTTPException(status_code=400, detail="Maximum 100 businesses per batch")
+    if len(businesses) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} businesses per batch")
     
-    results = []
-    for i, business in enumerate(businesses):
-        try:
-            prediction_response = await predict_sme_success(business)
-            results.append({
-                "business_id": i + 1,
-                "result": prediction_response
-            })
-        except Exception as e:
-            results.append({
-                "business_id": i + 1,
-                "result": PredictionResponse(success=False, error=str(e))
-            })
+    records = [business.dict() for business in businesses]
+    try:
+        outcomes = await run_inference("batch_predict", model_version, run_new_business_predictions, records, explain, explain_method, model_version)
+    except Exception as e:
+        outcomes = [(PredictionResponse(success=False, error=str(e)), None) for _ in records]
+    
+    results = [
+        {"business_id": i + 1, "result": response}
+        for i, (response, _) in enumerate(outcomes)
+    ]
+    log_entries = [
+        ("new_business", record, prediction_result)
+        for record, (_, prediction_result) in zip(records, outcomes)
+        if prediction_result is not None
+    ]
+    if len(log_entries) < len(records):
+        metrics_registry.inc("sme_prediction_failures_total", {"endpoint": "batch_predict"}, len(records) - len(log_entries))
+    
+    # Log every scored row in one write
+    with metrics_registry.timed("batch_predict", model_version, "log_prediction"):
+        log_predictions(log_entries)
     
     return {"predictions": results}
 
 # ===== EXISTING BUSINESS ENDPOINTS =====
 
 @app.post("/predict-existing-business", response_model=ExistingBusinessPredictionResponse, tags=["Existing Business"])
-async def predict_existing_business_success(business_data: ExistingBusinessData):
+async def predict_existing_business_success(business_data: ExistingBusinessData, explain: Optional[bool] = Query(None, description="Generate SHAP recommendations; defaults to the server's EXPLAIN_BY_DEFAULT"),
+        explain_method: Optional[str] = Query(None, description="'shap' for exact SHAP values or 'fast' for tree-path contributions; defaults to the server's EXPLAIN_METHOD"),
+        explain_async: bool = Query(False, description="Return the score now and the recommendations later from /explanations/{explanation_id}")):
     """Predict success probability for existing business with historical data and SHAP-based recommendations"""
     
-    if xgb_model is None or feature_scaler is None or label_encoders is None:
+    explain = resolve_explain(explain)
+    explain_method = request_explain_method(explain_method)
+    
+    # The request is served start to finish by the version active now, even if another is swapped in meanwhile
+    models = model_registry.active("existing_business")
+    if models is None:
         raise HTTPException(status_code=503, detail="Existing business prediction model not loaded")
+    model_version = models.version
+    
+    if explain_later(explain, explain_async, explain_method):
+        # Score without SHAP now, queuing a copy of the input since scoring sanitizes it in place
+        queued_input = business_data.copy()
+        response = await predict_existing_business_success(business_data, False, explain_method, False)
+        return attach_explanation_job(response, "existing_business", (queued_input, explain_method, response.model_version))
     
     try:
-        # Step 0: Sanitize input data to prevent model crashes
-        business_data.business_capital = max(min(business_data.business_capital, 1000000000), 10000)
-        business_data.employment_first_year = max(min(business_data.employment_first_year, 10000), 1)
-        business_data.employment_second_year = max(min(business_data.employment_second_year, 10000), 1)
-        business_data.employment_third_year = max(min(business_data.employment_third_year, 10000), 1)
-        business_data.employment_fourth_year = max(min(business_data.employment_fourth_year, 10000), 1)
-        business_data.turnover_first_year = max(min(business_data.turnover_first_year, 10000000000), 0)
-        business_data.turnover_second_year = max(min(business_data.turnover_second_year, 10000000000), 0)
-        business_data.turnover_third_year = max(min(business_data.turnover_third_year, 10000000000), 0)
-        business_data.turnover_fourth_year = max(min(business_data.turnover_fourth_year, 10000000000), 0)
-        
-        # Step 1: Engineer features
-        engineered = engineer_features(business_data)
-        
-        # Step 2: Encode categorical features
-        encoded = encode_categorical_features(business_data, engineered)
-        
-        # Step 3: Create feature vector
-        feature_vector = np.array([
-            business_data.turnover_first_year,
-            business_data.turnover_second_year, 
-            business_data.turnover_third_year,
-            business_data.turnover_fourth_year,
-            business_data.employment_first_year,
-            business_data.employment_second_year,
-            business_data.employment_third_year,
-            business_data.employment_fourth_year,
-            engineered['revenue_per_employee_trend'],
-            engineered['employment_efficiency'],
-            business_data.business_capital,
-            max(business_data.employment_fourth_year, 1),
-            encoded['business_sector_encoded'],
-            encoded['business_scaling_encoded'],
-            encoded['employment_growth_encoded']
-        ]).reshape(1, -1)
-        
-        # Step 4: Scale features
-        try:
-            feature_vector_scaled = feature_scaler.transform(feature_vector)
-        except Exception as scaling_error:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Input values outside valid business ranges. Please check your data and try again."
-            )
-        
-        # Step 5: Make prediction with error handling
-        try:
-            prediction = xgb_model.predict(feature_vector_scaled)[0]
-            probabilities = xgb_model.predict_proba(feature_vector_scaled)[0]
-        except Exception as prediction_error:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unable to process prediction with provided data. Please verify input ranges."
+        # Serve repeated submissions from the response cache, keyed before inputs are sanitized
+        with metrics_registry.timed("predict_existing_business", model_version, "cache_lookup"):
+            cache_key = prediction_cache.key("existing_business", business_data.dict(), model_version, {"explain": explain, "explain_method": explain_method})
+            cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            response, input_data, prediction_result = cached
+            log_prediction("existing_business", input_data, prediction_result)
+            return response.copy(update={"timestamp": datetime.now().isoformat()})
+        
+        if existing_business_coalescer.enabled:
+            # Join a micro-batch with concurrent requests (the batch is logged by the coalescer)
+            response, input_data, prediction_result, error = await existing_business_coalescer.submit((business_data, explain, explain_method, model_version))
+            if error is not None:
+                raise ValueError(error)
+        else:
+            # Score and explain on the inference pool
+            response, input_data, prediction_result = await run_inference(
+                "predict_existing_business", model_version, run_existing_business_prediction, business_data, explain, explain_method, model_version
             )
+            
+            # Log prediction
+            with metrics_registry.timed("predict_existing_business", model_version, "log_prediction"):
+                log_prediction("existing_business", input_data, prediction_result)
         
-        success_probability = probabilities[1]
-        confidence = max(probabilities[0], probabilities[1])
-        prediction_label = "Success" if prediction == 1 else "Failure"
-        
-        # Step 6: Generate insights and recommendations
-        recommendations = generate_existing_business_recommendations(business_data, engineered, success_probability, feature_vector_scaled)
-        risk_factors = identify_risk_factors(business_data, engineered)
-        
-        # Step 7: Prepare business insights
-        business_insights = {
-            "revenue_growth_rate": round(engineered['revenue_growth_rate'], 2),
-            "employment_growth": engineered['employment_growth'],
-            "business_scaling": engineered['business_scaling_indicator'],
-            "employment_efficiency": round(engineered['employment_efficiency'], 3),
-            "revenue_consistency": round(engineered['revenue_consistency_score'], 3),
-            "current_revenue_per_employee": round(engineered['current_revenue_per_employee'], 0),
-            "capital_efficiency": round(engineered['capital_efficiency'], 3)
-        }
-        
-        # Prepare response
-        response = ExistingBusinessPredictionResponse(
-            success=bool(prediction),
-            prediction=prediction_label,
-            success_probability=float(success_probability),
-            confidence=float(confidence),
-            business_insights=business_insights,
-            recommendations=recommendations,
-            risk_factors=risk_factors,
-            model_version=model_metadata.get('version', MODEL_VERSION) if model_metadata else MODEL_VERSION,
-            timestamp=datetime.now().isoformat()
-        )
-        
-        # Log prediction
-        log_prediction(
-            prediction_type="existing_business",
-            input_data=business_data.dict(),
-            prediction_result={
-                "prediction": prediction_label,
-                "success_probability": float(success_probability),
-                "confidence": float(confidence),
-                "business_insights": business_insights
-            }
-        )
+        prediction_cache.put(cache_key, (response, input_data, prediction_result))
         
         return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/batch-predict-existing-business", tags=["Existing Business"])
+async def batch_predict_existing_business(businesses: list[ExistingBusinessData], explain: Optional[bool] = Query(None, description="Generate SHAP recommendations; defaults to the server's EXPLAIN_BY_DEFAULT"),
+        explain_method: Optional[str] = Query(None, description="'shap' for exact SHAP values or 'fast' for tree-path contributions; defaults to the server's EXPLAIN_METHOD")):
+    """Predict many existing businesses with vectorized feature engineering and one model call"""
+    
+    explain = resolve_explain(explain)
+    explain_method = request_explain_method(explain_method)
+    models = model_registry.active("existing_business")
+    if models is None:
+        raise HTTPException(status_code=503, detail="Existing business prediction model not loaded")
+    model_version = models.version
+    
+    if len(businesses) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} businesses per batch")
+    
+    try:
+        outcomes = await run_inference("batch_predict_existing_business", model_version, run_existing_business_predictions, businesses, explain, explain_method, model_version)
+    except Exception as e:
+        outcomes = [(None, None, None, str(e)) for _ in businesses]
+    
+    results = [
+        {"business_id": i + 1, "result": response} if error is None else {"business_id": i + 1, "error": error}
+        for i, (response, _, _, error) in enumerate(outcomes)
+    ]
+    log_entries = [
+        ("existing_business", input_data, prediction_result)
+        for _, input_data, prediction_result, error in outcomes
+        if error is None
+    ]
+    if len(log_entries) < len(businesses):
+        metrics_registry.inc("sme_prediction_failures_total", {"endpoint": "batch_predict_existing_business"}, len(businesses) - len(log_entries))
+    
+    # Log every scored row in one write
+    with metrics_registry.timed("batch_predict_existing_business", model_version, "log_prediction"):
+        log_predictions(log_entries)
+    
+    return {"predictions": results}
+
+# ===== EXPLANATIONS =====
+
+@app.get("/explanations/{explanation_id}", tags=["Explanations"])
+async def get_explanation(explanation_id: str, wait: float = Query(0, ge=0, description=f"Seconds to wait for a pending explanation before answering (long-poll), at most {EXPLANATION_JOB_MAX_WAIT_SECONDS:g}")):
+    """Status and, once done, the recommendations of an explain_async prediction"""
+    job = await explanation_jobs.wait(explanation_id, min(wait, EXPLANATION_JOB_MAX_WAIT_SECONDS))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Explanation not found or expired")
+    return job.to_dict()
+
 @app.get("/health-existing", tags=["Existing Business"])
 async def health_check_existing():
     """Health check for existing business prediction model"""
@@ -944,26 +1846,47 @@ async def health_check_existing():
         "scaler_loaded": feature_scaler is not None,
         "encoders_loaded": label_encoders is not None,
         "features": "SHAP-based recommendations enabled",
-        "model_version": MODEL_VERSION,
+        "model_version": existing_model_version(),
         "timestamp": datetime.now().isoformat()
     }
 
+# Sample payloads served by /sample-* and replayed by the startup warmup
+NEW_BUSINESS_SAMPLE = {
+    "business_capital": 1200000,
+    "owner_age": 30,
+    "owner_business_experience": 7,
+    "capital_source": "Personal Savings",
+    "business_sector": "Manufacturing",
+    "number_of_employees": 0,
+    "business_location": "RULINDO",
+    "entity_type": "COOPERATIVE",
+    "owner_gender": "M",
+    "education_level_numeric": 0
+}
+
+EXISTING_BUSINESS_SAMPLE = {
+    "business_capital": 25000000,
+    "business_sector": "Wholesale And Retail Trade; Repair Of Motor Vehicles And Motorcycles",
+    "entity_type": "PRIVATE CORPORATION",
+    "business_location": "GASABO",
+    "capital_source": "Bank Loan",
+    "turnover_first_year": 12000000,
+    "turnover_second_year": 18000000,
+    "turnover_third_year": 24000000,
+    "turnover_fourth_year": 30000000,
+    "employment_first_year": 5,
+    "employment_second_year": 8,
+    "employment_third_year": 12,
+    "employment_fourth_year": 15,
+    "business_scaling": "High_Scaling",
+    "employment_growth": "Increased"
+}
+
 @app.get("/sample-new-business", tags=["Samples"])
 async def get_new_business_sample():
     """Get sample data for new business prediction testing"""
     return {
-        "sample_data": {
-            "business_capital": 1200000,
-            "owner_age": 30,
-            "owner_business_experience": 7,
-            "capital_source": "Personal Savings",
-            "business_sector": "Manufacturing",
-            "number_of_employees": 0,
-            "business_location": "RULINDO",
-            "entity_type": "COOPERATIVE",
-            "owner_gender": "M",
-            "education_level_numeric": 0
-        },
+        "sample_data": dict(NEW_BUSINESS_SAMPLE),
         "description": "Sample data for testing new business prediction",
         "usage": "POST this data to /predict endpoint"
     }
@@ -972,85 +1895,150 @@ async def get_new_business_sample():
 async def get_existing_business_sample():
     """Get sample data for existing business prediction testing"""
     return {
-        "sample_data": {
-            "business_capital": 25000000,
-            "business_sector": "Wholesale And Retail Trade; Repair Of Motor Vehicles And Motorcycles",
-            "entity_type": "PRIVATE CORPORATION",
-            "business_location": "GASABO",
-            "capital_source": "Bank Loan",
-            "turnover_first_year": 12000000,
-            "turnover_second_year": 18000000,
-            "turnover_third_year": 24000000,
-            "turnover_fourth_year": 30000000,
-            "employment_first_year": 5,
-            "employment_second_year": 8,
-            "employment_third_year": 12,
-            "employment_fourth_year": 15,
-            "business_scaling": "High_Scaling",
-            "employment_growth": "Increased"
-        },
+        "sample_data": dict(EXISTING_BUSINESS_SAMPLE),
         "description": "Sample data for testing existing business prediction with 4-year historical data",
         "usage": "POST this data to /predict-existing-business endpoint"
     }
 
+# ===== WARMUP AND READINESS =====
+
+# Rows in the warmup's batch requests; enough to take the vectorized path
+WARMUP_BATCH_SIZE = 2
+
+async def warm_new_business(explain: bool, explain_method: str, model_version: str, batch: bool = False):
+    """Score (and explain) the sample business on the inference pool, through the single or batch path"""
+    if batch:
+        outcomes = await inference_pool.run(run_new_business_predictions, [dict(NEW_BUSINESS_SAMPLE)] * WARMUP_BATCH_SIZE,
+                                            explain, explain_method, model_version)
+    else:
+        outcomes = [await inference_pool.run(run_new_business_prediction, dict(NEW_BUSINESS_SAMPLE), explain, explain_method, model_version)]
+    for response, _ in outcomes:
+        if not response.success:
+            raise RuntimeError(response.error)
+
+async def warm_existing_business(explain: bool, explain_method: str, model_version: str, batch: bool = False):
+    """Score (and explain) the sample existing business on the inference pool, through the single or batch path"""
+    if batch:
+        businesses = [ExistingBusinessData(**EXISTING_BUSINESS_SAMPLE) for _ in range(WARMUP_BATCH_SIZE)]
+        outcomes = await inference_pool.run(run_existing_business_predictions, businesses, explain, explain_method, model_version)
+        for _, _, _, error in outcomes:
+            if error is not None:
+                raise RuntimeError(error)
+    else:
+        await inference_pool.run(run_existing_business_prediction, ExistingBusinessData(**EXISTING_BUSINESS_SAMPLE),
+                                 explain, explain_method, model_version)
+
+def warmup_checks() -> Dict[str, Any]:
+    """Warmup requests for every loaded model: scoring alone, each explanation method in use, and a batch"""
+    methods = ["fast", "shap"] if EXPLAIN_BY_DEFAULT else ["fast"]
+    checks = {}
+    for kind, warm in (("new_business", warm_new_business), ("existing_business", warm_existing_business)):
+        models = model_registry.active(kind)
+        if models is None:
+            continue
+        checks[f"{kind}:score"] = functools.partial(warm, False, "shap", models.version)
+        for method in methods:
+            checks[f"{kind}:{method}"] = functools.partial(warm, True, method, models.version)
+        checks[f"{kind}:batch"] = functools.partial(warm, EXPLAIN_BY_DEFAULT, methods[-1], models.version, True)
+    return checks
+
+async def warm_up():
+    """Replay the sample payloads until they meet the latency budget, then open /ready"""
+    ready = await readiness.run(warmup_checks())
+    stats = readiness.stats()
+    if ready:
+        slowest = max(stats["latest_ms"].values(), default=0.0)
+        print(f"✓ Warmed up in {stats['warmup_seconds']:.2f}s ({stats['rounds']} rounds, slowest request {slowest:.1f}ms), ready for traffic")
+    else:
+        print(f"Warmup missed the {stats['budget_ms']:.0f}ms budget after {stats['rounds']} rounds, not ready: "
+              f"{stats['errors'] or stats['latest_ms']}")
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once warmup has met the latency budget, 503 before that or if it never does"""
+    ready = readiness.ready and any(active_model_versions().values())
+    return JSONResponse(status_code=200 if ready else 503, content={
+        "ready": ready,
+        "warmup": readiness.stats(),
+        "model_versions": active_model_versions(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.get("/debug/startup")
+async def startup_report():
+    """Where this process's boot went: time and RSS added by each import, artifact load, parse and warmup"""
+    return startup_profile.report()
+
 # ===== ADMIN DASHBOARD ENDPOINTS =====
 
+def validate_time_range(start: Optional[str], end: Optional[str], resolution: str = "day") -> Tuple[Optional[str], Optional[str]]:
+    """Reject range bounds that are not ISO dates or timestamps, and unknown resolutions;
+    returns the bounds normalized to the form the rollup buckets use
+    """
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of: {', '.join(ROLLUP_RESOLUTIONS)}")
+    bounds = []
+    for name, value in (("from", start), ("to", end)):
+        if value is None:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(normalize_time_bound(value))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"'{name}' must be an ISO date or timestamp, e.g. 2025-11-20 or 2025-11-20T10:00")
+    return bounds[0], bounds[1]
+
+def dashboard_counters() -> Dict[str, Any]:
+    """Headline dashboard numbers, read from the running aggregates"""
+    summary = store.prediction_summary()
+    empty = {"total": 0, "successful": 0}
+    new_business = summary.get("new_business", empty)
+    existing_business = summary.get("existing_business", empty)
+    new_business_count = new_business["total"]
+    existing_business_count = existing_business["total"]
+    
+    return {
+        "total_predictions": sum(counts["total"] for counts in summary.values()),
+        "new_business_predictions": new_business_count,
+        "existing_business_predictions": existing_business_count,
+        "success_rate_new": round((new_business["successful"] / new_business_count * 100), 2) if new_business_count > 0 else 0,
+        "success_rate_existing": round((existing_business["successful"] / existing_business_count * 100), 2) if existing_business_count > 0 else 0,
+        "predictions_today": store.predictions_on_date(datetime.now().date().isoformat()),
+        "unread_messages": store.count_feedback("unread")
+    }
+
 @app.get("/admin/dashboard", tags=["Admin"])
-async def get_admin_dashboard():
-    """Get comprehensive admin dashboard statistics"""
+async def get_admin_dashboard(
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    resolution: str = "day"
+):
+    """Get comprehensive admin dashboard statistics
+
+    `predictions_by_date` covers the last 7 days with predictions, or every
+    hourly or daily bucket between `from` and `to` when either is given.
+    """
+    start, end = validate_time_range(start, end, resolution)
     try:
-        if not os.path.exists(PREDICTIONS_LOG_FILE):
+        await asyncio.to_thread(prediction_log.flush)
+        counters = dashboard_counters()
+        if counters["total_predictions"] == 0:
             return {
-                "total_predictions": 0,
-                "new_business_predictions": 0,
-                "existing_business_predictions": 0,
-                "success_rate_new": 0,
-                "success_rate_existing": 0,
-                "predictions_today": 0,
+                **counters,
                 "recent_predictions": [],
                 "message": "No predictions logged yet"
             }
         
-        with open(PREDICTIONS_LOG_FILE, 'r') as f:
-            logs = json.load(f)
-        
-        # Calculate statistics
-        total_predictions = len(logs)
-        new_business_count = sum(1 for log in logs if log["prediction_type"] == "new_business")
-        existing_business_count = sum(1 for log in logs if log["prediction_type"] == "existing_business")
-        
-        # Calculate success rates
-        new_success = sum(1 for log in logs if log["prediction_type"] == "new_business" and 
-                         log["prediction_result"].get("prediction") == 1)
-        existing_success = sum(1 for log in logs if log["prediction_type"] == "existing_business" and 
-                              log["prediction_result"].get("prediction") == "Success")
-        
-        success_rate_new = round((new_success / new_business_count * 100), 2) if new_business_count > 0 else 0
-        success_rate_existing = round((existing_success / existing_business_count * 100), 2) if existing_business_count > 0 else 0
-        
-        # Predictions today
-        today = datetime.now().date().isoformat()
-        predictions_today = sum(1 for log in logs if log["timestamp"].startswith(today))
-        
-        # Get recent predictions (last 10)
-        recent_predictions = logs[-10:][::-1]  # Last 10 in reverse order
-        
-        # Predictions by date (last 7 days)
-        from collections import defaultdict
-        predictions_by_date = defaultdict(int)
-        for log in logs:
-            date = log["timestamp"].split("T")[0]
-            predictions_by_date[date] += 1
+        # Chart buckets, read from the rollups
+        if start is None and end is None and resolution == "day":
+            predictions_by_date = store.predictions_by_date(days=7)
+        else:
+            predictions_by_date = {bucket["bucket"]: bucket["total"] for bucket in store.prediction_rollups(resolution, start, end)}
         
         return {
-            "total_predictions": total_predictions,
-            "new_business_predictions": new_business_count,
-            "existing_business_predictions": existing_business_count,
-            "success_rate_new": success_rate_new,
-            "success_rate_existing": success_rate_existing,
-            "predictions_today": predictions_today,
-            "predictions_by_date": dict(sorted(predictions_by_date.items())[-7:]),
-            "recent_predictions": recent_predictions,
+            **counters,
+            "predictions_by_date": predictions_by_date,
+            "recent_predictions": store.recent_predictions(limit=10),
             "last_updated": datetime.now().isoformat()
         }
     
@@ -1058,46 +2046,62 @@ async def get_admin_dashboard():
         raise HTTPException(status_code=500, detail=f"Error fetching dashboard data: {str(e)}")
 
 @app.get("/admin/predictions", tags=["Admin"])
-async def get_all_predictions(limit: int = 50, prediction_type: Optional[str] = None):
-    """Get all logged predictions with optional filtering"""
+async def get_all_predictions(
+    limit: int = 50,
+    prediction_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    order_by: str = "id",
+    fields: Optional[str] = None
+):
+    """Get logged predictions, newest first, one page at a time
+
+    Pass the returned `next_cursor` as `cursor` to fetch the next page, and
+    `fields` (comma-separated, e.g. `id,timestamp,prediction_type,outcome,success_probability`)
+    to leave out the heavy `input_data` and `prediction_result` objects.
+    """
+    limit = min(max(limit, 1), MAX_ADMIN_PAGE_SIZE)
+    selected_fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else list(DEFAULT_PREDICTION_FIELDS)
     try:
-        if not os.path.exists(PREDICTIONS_LOG_FILE):
+        await asyncio.to_thread(prediction_log.flush)
+        total = store.count_predictions(prediction_type)
+        if total == 0 and store.count_predictions() == 0:
             return {
                 "total": 0,
                 "predictions": [],
                 "message": "No predictions logged yet"
             }
         
-        with open(PREDICTIONS_LOG_FILE, 'r') as f:
-            logs = json.load(f)
-        
-        # Filter by prediction type if specified
-        if prediction_type:
-            logs = [log for log in logs if log["prediction_type"] == prediction_type]
-        
-        # Apply limit and reverse order (newest first)
-        limited_logs = logs[-limit:][::-1]
+        # Newest first, filtered by prediction type if specified
+        page, next_cursor = store.page_predictions(limit, prediction_type, cursor, order_by, selected_fields)
         
         return {
-            "total": len(logs),
-            "returned": len(limited_logs),
-            "predictions": limited_logs,
+            "total": total,
+            "returned": len(page),
+            "predictions": page,
+            "next_cursor": next_cursor,
             "filters": {"prediction_type": prediction_type, "limit": limit}
         }
     
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching predictions: {str(e)}")
 
 @app.get("/admin/stats", tags=["Admin"])
-async def get_prediction_stats():
-    """Get detailed prediction statistics"""
+async def get_prediction_stats(
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to")
+):
+    """Get detailed prediction statistics, optionally limited to predictions between `from` and `to`"""
+    start, end = validate_time_range(start, end)
     try:
-        if not os.path.exists(PREDICTIONS_LOG_FILE):
+        await asyncio.to_thread(prediction_log.flush)
+        summary = store.prediction_summary(start, end)
+        if not summary:
+            if start is not None or end is not None:
+                return {"message": "No predictions logged in this range", "range": {"from": start, "to": end}}
             return {"message": "No predictions logged yet"}
         
-        with open(PREDICTIONS_LOG_FILE, 'r') as f:
-            logs = json.load(f)
-        
         # Statistics by prediction type
         stats = {
             "new_business": {
@@ -1118,70 +2122,151 @@ async def get_prediction_stats():
             }
         }
         
-        # Process new business predictions
-        new_business_logs = [log for log in logs if log["prediction_type"] == "new_business"]
-        if new_business_logs:
-            stats["new_business"]["total"] = len(new_business_logs)
-            stats["new_business"]["successful"] = sum(1 for log in new_business_logs if log["prediction_result"].get("prediction") == 1)
-            stats["new_business"]["unsuccessful"] = sum(1 for log in new_business_logs if log["prediction_result"].get("prediction") == 0)
-            
-            success_probs = [log["prediction_result"].get("success_probability", 0) for log in new_business_logs]
-            stats["new_business"]["avg_success_probability"] = round(sum(success_probs) / len(success_probs), 4)
-            
-            stats["new_business"]["high_confidence"] = sum(1 for log in new_business_logs if log["prediction_result"].get("confidence_level") == "High")
-            stats["new_business"]["medium_confidence"] = sum(1 for log in new_business_logs if log["prediction_result"].get("confidence_level") == "Medium")
-            stats["new_business"]["low_confidence"] = sum(1 for log in new_business_logs if log["prediction_result"].get("confidence_level") == "Low")
-        
-        # Process existing business predictions
-        existing_business_logs = [log for log in logs if log["prediction_type"] == "existing_business"]
-        if existing_business_logs:
-            stats["existing_business"]["total"] = len(existing_business_logs)
-            stats["existing_business"]["successful"] = sum(1 for log in existing_business_logs if log["prediction_result"].get("prediction") == "Success")
-            stats["existing_business"]["unsuccessful"] = sum(1 for log in existing_business_logs if log["prediction_result"].get("prediction") == "Failure")
-            
-            success_probs = [log["prediction_result"].get("success_probability", 0) for log in existing_business_logs]
-            stats["existing_business"]["avg_success_probability"] = round(sum(success_probs) / len(success_probs), 4)
-            
-            confidences = [log["prediction_result"].get("confidence", 0) for log in existing_business_logs]
-            stats["existing_business"]["avg_confidence"] = round(sum(confidences) / len(confidences), 4)
-        
-        return {
-            "total_predictions": len(logs),
+        # Aggregates for each prediction type come from one GROUP BY query
+        for prediction_type, type_stats in stats.items():
+            counts = summary.get(prediction_type)
+            if not counts:
+                continue
+            for key in type_stats:
+                type_stats[key] = counts[key]
+            for key in ("avg_success_probability", "avg_confidence"):
+                if key in type_stats:
+                    type_stats[key] = round(counts[key], 4)
+        
+        response = {
+            "total_predictions": sum(counts["total"] for counts in summary.values()),
             "statistics": stats,
             "generated_at": datetime.now().isoformat()
         }
+        if start is not None or end is not None:
+            response["range"] = {"from": start, "to": end}
+        return response
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating statistics: {str(e)}")
 
+@app.get("/admin/timeseries", tags=["Admin"])
+async def get_prediction_timeseries(
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    resolution: str = "day",
+    prediction_type: Optional[str] = None
+):
+    """Hourly or daily prediction counts, successes and average success probability between `from` and `to` (inclusive)"""
+    start, end = validate_time_range(start, end, resolution)
+    try:
+        await asyncio.to_thread(prediction_log.flush)
+        buckets = store.prediction_rollups(resolution, start, end, prediction_type)
+        for bucket in buckets:
+            bucket["avg_success_probability"] = round(bucket["avg_success_probability"], 4)
+        
+        return {
+            "resolution": resolution,
+            "filters": {"from": start, "to": end, "prediction_type": prediction_type},
+            "total": sum(bucket["total"] for bucket in buckets),
+            "buckets": buckets
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching timeseries: {str(e)}")
+
 @app.delete("/admin/predictions/clear", tags=["Admin"])
 async def clear_prediction_logs():
     """Clear all prediction logs (use with caution!)"""
     try:
-        if os.path.exists(PREDICTIONS_LOG_FILE):
-            os.remove(PREDICTIONS_LOG_FILE)
+        if await asyncio.to_thread(prediction_log.clear):
+            publish_admin_event("predictions_cleared")
             return {"message": "Prediction logs cleared successfully", "cleared_at": datetime.now().isoformat()}
         else:
             return {"message": "No prediction logs to clear"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing logs: {str(e)}")
 
+@app.post("/admin/aggregates/rebuild", tags=["Admin"])
+async def rebuild_prediction_aggregates():
+    """Recompute the dashboard and stats aggregates from the prediction log"""
+    try:
+        await asyncio.to_thread(prediction_log.flush)
+        await asyncio.to_thread(store.rebuild_aggregates)
+        publish_admin_event()
+        return {"message": "Aggregates rebuilt successfully", "total_predictions": store.count_predictions(), "rebuilt_at": datetime.now().isoformat()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding aggregates: {str(e)}")
+
+# ===== MODEL REGISTRY =====
+
+def registry_kind(kind: str) -> str:
+    """The model kind from the path; 404 if unknown"""
+    if kind not in ("new_business", "existing_business"):
+        raise HTTPException(status_code=404, detail=f"Unknown model kind: {kind}")
+    return kind
+
+@app.get("/admin/models", tags=["Admin"])
+async def get_model_versions():
+    """Active, previous and available versions of each model, and the latest background load"""
+    return model_registry.stats()
+
+@app.post("/admin/models/{kind}/load", status_code=202, tags=["Admin"])
+async def load_model_version(kind: str, version: Optional[str] = Query(None, description="Version to load, e.g. 20251106_133503; defaults to the newest in models/")):
+    """Load a model version in the background and swap it in once it is warmed up; poll /admin/models for progress"""
+    try:
+        return model_registry.load_in_background(registry_kind(kind), version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/admin/models/{kind}/rollback", tags=["Admin"])
+async def rollback_model_version(kind: str):
+    """Swap the previous version of a model back in"""
+    try:
+        restored = await asyncio.to_thread(model_registry.rollback, registry_kind(kind))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": f"Rolled back to {kind} model version {restored.version}", "active": restored.info()}
+
+@app.get("/admin/events", tags=["Admin"])
+async def stream_admin_events():
+    """Server-sent events for the admin dashboard
+
+    Starts with a `counters` snapshot, then pushes `prediction`, `feedback`,
+    `feedback_read`, `predictions_cleared` and `counters` events as they
+    happen. A client that falls too far behind gets a single `resync` event
+    and should reload over the REST endpoints.
+    """
+    subscription = admin_events.subscribe()
+    try:
+        await asyncio.to_thread(prediction_log.flush)
+        snapshot = dashboard_counters()
+    except Exception as e:
+        admin_events.unsubscribe(subscription)
+        raise HTTPException(status_code=500, detail=f"Error opening event stream: {str(e)}")
+
+    async def event_stream():
+        try:
+            yield f"retry: 5000\nevent: counters\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                message = await subscription.next(EVENT_STREAM_HEARTBEAT_SECONDS)
+                if message is None:
+                    break
+                yield message
+        finally:
+            admin_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ===== FEEDBACK ENDPOINTS =====
 
 @app.post("/feedback", tags=["Feedback"])
 async def submit_feedback(feedback: FeedbackData):
     """Submit user feedback or comment"""
     try:
-        # Load existing feedback
-        if os.path.exists(FEEDBACK_LOG_FILE):
-            with open(FEEDBACK_LOG_FILE, 'r') as f:
-                feedback_logs = json.load(f)
-        else:
-            feedback_logs = []
-        
         # Create new feedback entry
         feedback_entry = {
-            "id": len(feedback_logs) + 1,
             "timestamp": datetime.now().isoformat(),
             "name": feedback.name,
             "email": feedback.email,
@@ -1190,15 +2275,14 @@ async def submit_feedback(feedback: FeedbackData):
             "status": "unread"
         }
         
-        # Append and save
-        feedback_logs.append(feedback_entry)
-        with open(FEEDBACK_LOG_FILE, 'w') as f:
-            json.dump(feedback_logs, f, indent=2)
+        # Save
+        feedback_id = store.insert_feedback(feedback_entry)
+        publish_admin_event("feedback", {"id": feedback_id, **feedback_entry})
         
         return {
             "success": True,
             "message": "Thank you for your feedback!",
-            "feedback_id": feedback_entry["id"]
+            "feedback_id": feedback_id
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving feedback: {str(e)}")
@@ -1207,7 +2291,8 @@ async def submit_feedback(feedback: FeedbackData):
 async def get_all_messages(limit: int = 100, status: Optional[str] = None):
     """Get all user feedback messages"""
     try:
-        if not os.path.exists(FEEDBACK_LOG_FILE):
+        total = store.count_feedback()
+        if total == 0:
             return {
                 "total": 0,
                 "unread": 0,
@@ -1215,24 +2300,12 @@ async def get_all_messages(limit: int = 100, status: Optional[str] = None):
                 "message": "No feedback messages yet"
             }
         
-        with open(FEEDBACK_LOG_FILE, 'r') as f:
-            messages = json.load(f)
-        
-        # Filter by status if provided
-        if status:
-            filtered_messages = [msg for msg in messages if msg.get("status") == status]
-        else:
-            filtered_messages = messages
-        
-        # Count unread
-        unread_count = sum(1 for msg in messages if msg.get("status") == "unread")
-        
-        # Apply limit and reverse (newest first)
-        limited_messages = filtered_messages[-limit:][::-1]
+        # Newest first, filtered by status if provided
+        limited_messages = store.recent_feedback(limit, status)
         
         return {
-            "total": len(messages),
-            "unread": unread_count,
+            "total": total,
+            "unread": store.count_feedback("unread"),
             "returned": len(limited_messages),
             "messages": limited_messages,
             "filters": {"status": status, "limit": limit}
@@ -1244,26 +2317,9 @@ async def get_all_messages(limit: int = 100, status: Optional[str] = None):
 async def mark_message_read(message_id: int):
     """Mark a message as read"""
     try:
-        if not os.path.exists(FEEDBACK_LOG_FILE):
-            raise HTTPException(status_code=404, detail="No messages found")
-        
-        with open(FEEDBACK_LOG_FILE, 'r') as f:
-            messages = json.load(f)
-        
-        # Find and update message
-        message_found = False
-        for msg in messages:
-            if msg["id"] == message_id:
-                msg["status"] = "read"
-                message_found = True
-                break
-        
-        if not message_found:
+        if not store.set_feedback_status(message_id, "read"):
             raise HTTPException(status_code=404, detail="Message not found")
-        
-        # Save updated messages
-        with open(FEEDBACK_LOG_FILE, 'w') as f:
-            json.dump(messages, f, indent=2)
+        publish_admin_event("feedback_read", {"id": message_id})
         
         return {"success": True, "message": "Message marked as read"}
     except HTTPException:
@@ -3,10 +3,10 @@ Existing Business Success Predictor API
 FastAPI application for predicting success of existing SMEs using historical performance data
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from contextlib import asynccontextmanager
 import joblib
 import pandas as pd
@@ -14,7 +14,8 @@ import numpy as np
 import os
 import json
 from datetime import datetime
-import shap
+from explainers import ExplainerCache, EXPLAIN_BY_DEFAULT, SOURCE_SHAP, SOURCE_FALLBACK, SOURCE_NONE, resolve_explain
+from scoring import score, EXISTING_BUSINESS_DECISION_THRESHOLD
 
 # Global variables for model components
 xgb_model = None
@@ -23,6 +24,9 @@ label_encoders = None
 feature_names = None
 model_metadata = None
 
+# SHAP explainer, built once per loaded model and shared across requests
+shap_explainers = ExplainerCache()
+
 # Model file paths (using the latest existing business model)
 MODEL_VERSION = "20251106_133503"
 MODEL_PATH = f"../models/existing_business_predictor_{MODEL_VERSION}.joblib"
@@ -43,6 +47,11 @@ async def lifespan(app: FastAPI):
         else:
             raise FileNotFoundError(f"Model file not found: {MODEL_PATH}")
         
+        # Build the SHAP explainer once for the loaded model, or leave it to the first explained request
+        if EXPLAIN_BY_DEFAULT:
+            build_time = shap_explainers.load("existing_business", xgb_model)
+            print(f"✓ Built SHAP explainer in {build_time:.2f}s")
+        
         # Load feature scaler
         if os.path.exists(SCALER_PATH):
             feature_scaler = joblib.load(SCALER_PATH)
@@ -242,6 +251,7 @@ class PredictionResponse(BaseModel):
     confidence: float = Field(description="Model confidence in the prediction (0.0 to 1.0). Higher values indicate more certainty")
     business_insights: Dict[str, Any] = Field(description="Key business metrics and performance indicators")
     recommendations: List[str] = Field(description="Actionable business recommendations based on the analysis")
+    recommendation_source: str = Field(default=SOURCE_SHAP, description="'shap', 'fallback' when SHAP failed, or 'none' when explanations were skipped")
     risk_factors: List[str] = Field(description="Identified potential risks that could impact business success")
     model_version: str = Field(description="Version of the machine learning model used for prediction")
     timestamp: str = Field(description="ISO timestamp when the prediction was made")
@@ -268,6 +278,7 @@ class PredictionResponse(BaseModel):
                     "Consider expanding to new markets to accelerate growth",
                     "Maintain current employment growth pace for sustainable scaling"
                 ],
+                "recommendation_source": "shap",
                 "risk_factors": [],
                 "model_version": "20251106_133503",
                 "timestamp": "2025-11-06T15:30:45.123456"
@@ -410,12 +421,12 @@ def encode_categorical_features(data: ExistingBusinessData, engineered: Dict) ->
     
     return encoded
 
-def generate_recommendations(data: ExistingBusinessData, engineered: Dict, prediction_prob: float, input_features: np.ndarray) -> List[str]:
-    """Generate SHAP-based business recommendations"""
+def generate_recommendations(data: ExistingBusinessData, engineered: Dict, prediction_prob: float, input_features: np.ndarray) -> Tuple[List[str], str]:
+    """Generate SHAP-based business recommendations, with their source"""
     
     try:
-        # Create SHAP explainer for the model
-        explainer = shap.TreeExplainer(xgb_model)
+        # Reuse the SHAP explainer built for the loaded model
+        explainer = shap_explainers.get("existing_business", xgb_model)
         
         # Calculate SHAP values for this specific prediction
         shap_values = explainer.shap_values(input_features.reshape(1, -1))
@@ -441,7 +452,7 @@ def generate_recommendations(data: ExistingBusinessData, engineered: Dict, predi
             else:  # Mild positive impact
                 recommendations.append(f"{i}. Optimize {feature_name}: Positive contributor - opportunities for further improvement (Impact: +{impact:.3f})")
         
-        return recommendations
+        return recommendations, SOURCE_SHAP
         
     except Exception as e:
         # Fallback to basic recommendations if SHAP fails
@@ -451,7 +462,7 @@ def generate_recommendations(data: ExistingBusinessData, engineered: Dict, predi
             "3. Strengthen financial management practices", 
             "4. Focus on business scaling indicators",
             "5. Enhance market positioning and competitiveness"
-        ]
+        ], SOURCE_FALLBACK
 
 def identify_risk_factors(data: ExistingBusinessData, engineered: Dict) -> List[str]:
     """Identify potential risk factors"""
@@ -545,6 +556,7 @@ async def health_check():
         "model_loaded": model_loaded,
         "scaler_loaded": scaler_loaded,
         "encoders_loaded": encoders_loaded,
+        "explanations": shap_explainers.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -577,11 +589,12 @@ async def health_check():
           - 25M RWF initial capital from bank loan
           - Expected prediction: Success with high confidence
           """)
-async def predict_existing_business(data: ExistingBusinessData):
+async def predict_existing_business(data: ExistingBusinessData, explain: Optional[bool] = Query(None, description="Generate SHAP recommendations; defaults to the server's EXPLAIN_BY_DEFAULT")):
     """
     Predict the continued success of an existing business
     """
     
+    explain = resolve_explain(explain)
     if xgb_model is None or feature_scaler is None or label_encoders is None:
         raise HTTPException(status_code=500, detail="Model components not loaded")
     
@@ -614,16 +627,18 @@ async def predict_existing_business(data: ExistingBusinessData):
         # Step 4: Scale features
         feature_vector_scaled = feature_scaler.transform(feature_vector)
         
-        # Step 5: Make prediction
-        prediction = xgb_model.predict(feature_vector_scaled)[0]
-        probabilities = xgb_model.predict_proba(feature_vector_scaled)[0]
+        # Step 5: Make prediction with a single pass over the ensemble
+        probabilities, labels, confidences = score(xgb_model, feature_vector_scaled, EXISTING_BUSINESS_DECISION_THRESHOLD)
         
-        success_probability = probabilities[1]
-        confidence = max(probabilities[0], probabilities[1])
+        prediction = labels[0]
+        success_probability = probabilities[0][1]
+        confidence = confidences[0]
         prediction_label = "Success" if prediction == 1 else "Failure"
         
         # Step 6: Generate insights and recommendations
-        recommendations = generate_recommendations(data, engineered, success_probability, feature_vector_scaled)
+        recommendations, recommendation_source = [], SOURCE_NONE
+        if explain:
+            recommendations, recommendation_source = generate_recommendations(data, engineered, success_probability, feature_vector_scaled)
         risk_factors = identify_risk_factors(data, engineered)
         
         # Step 7: Prepare business insights
@@ -644,6 +659,7 @@ async def predict_existing_business(data: ExistingBusinessData):
             confidence=round(confidence, 4),
             business_insights=business_insights,
             recommendations=recommendations,
+            recommendation_source=recommendation_source,
             risk_factors=risk_factors,
             model_version=MODEL_VERSION,
             timestamp=datetime.now().isoformat()
@@ -733,7 +749,7 @@ async def get_business_insights(data: ExistingBusinessData):
             engineered['revenue_per_employee_trend'], engineered['employment_efficiency'], data.business_capital,
             data.number_of_employees, 1, 1, 1  # dummy encoded values
         ])
-        recommendations = generate_recommendations(data, engineered, 0.8, dummy_features)
+        recommendations, _ = generate_recommendations(data, engineered, 0.8, dummy_features)
         
         return BusinessInsightsResponse(
             financial_health=financial_health,
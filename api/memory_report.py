@@ -0,0 +1,227 @@
+"""
+Per-worker and total server memory at several worker counts
+
+Starts the API with each server mode and worker count, sends every worker
+a few predictions so lazily built state is in place, then reads each
+server process's memory from /proc/<pid>/smaps_rollup:
+
+    rss      resident memory, counting shared pages in full in every process
+    pss      proportional set size: shared pages split between the processes
+             mapping them, so the PSS of all processes adds up to what the
+             server really uses
+    private  pages only this process has touched (incl. copied-on-write ones)
+
+Server modes: "uvicorn" is `uvicorn --workers N`, where every worker loads
+its own models; "prefork" is prefork.py, which loads them once and forks the
+workers afterwards; "prefork-no-preload" forks first and loads per worker.
+
+Usage (from the api directory):
+    python memory_report.py [--workers 1,4,8] [--servers uvicorn,prefork] [--output memory_report.json]
+    python memory_report.py --env COMPILED_TREE_MODELS=new_business,existing_business --env COMPILED_TREE_CACHE_DIR=/tmp/sme_trees
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from loadtest import SERVERS, free_port, process_tree, start_server, stop_server, wait_until_healthy
+from payloads import load_existing_business_payloads, load_new_business_payloads
+
+# smaps_rollup fields reported per process, in kB
+MEMORY_FIELDS = {
+    "rss": ("Rss",),
+    "pss": ("Pss",),
+    "shared": ("Shared_Clean", "Shared_Dirty"),
+    "private": ("Private_Clean", "Private_Dirty")
+}
+
+
+def memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """RSS, PSS, shared and private bytes of a process, or None if it is gone"""
+    totals: Dict[str, int] = {}
+    # smaps_rollup (Linux 4.14+) holds the sums; older kernels list every mapping in smaps
+    for filename in ("smaps_rollup", "smaps"):
+        try:
+            with open(f"/proc/{pid}/{filename}") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 3 and parts[2] == "kB":
+                        field = parts[0].rstrip(":")
+                        totals[field] = totals.get(field, 0) + int(parts[1]) * 1024
+            break
+        except FileNotFoundError:
+            continue
+        except OSError:
+            return None
+    if not totals:
+        return None
+    return {name: sum(totals.get(field, 0) for field in fields) for name, fields in MEMORY_FIELDS.items()}
+
+
+def parent_pid(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return int(f.read().rsplit(")", 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def command_line(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace").strip()
+    except OSError:
+        return ""
+
+
+def server_processes(root_pid: int) -> List[Dict[str, Any]]:
+    """Memory of every process in the server, labelled supervisor, worker or helper"""
+    processes = []
+    for pid in process_tree(root_pid):
+        usage = memory_usage(pid)
+        if usage is None:
+            continue
+        if pid == root_pid:
+            role = "supervisor"
+        elif parent_pid(pid) == root_pid and "resource_tracker" not in command_line(pid):
+            role = "worker"
+        else:
+            role = "helper"  # multiprocessing's resource tracker, process-pool workers
+        processes.append({"pid": pid, "role": role, **usage})
+    if processes and not any(process["role"] == "worker" for process in processes):
+        processes[0]["role"] = "worker"  # uvicorn with one worker serves from the root process itself
+    return processes
+
+
+async def exercise(url: str, new_payloads: List[Dict[str, Any]], existing_payloads: List[Dict[str, Any]], concurrency: int):
+    """Send every payload once, over fresh connections so the kernel spreads them across the workers"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+    requests = [("/predict", payload) for payload in new_payloads] + \
+               [("/predict-existing-business", payload) for payload in existing_payloads]
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        pending = iter(requests)
+
+        async def client_loop():
+            for path, payload in pending:
+                (await client.post(path, json=payload)).raise_for_status()
+
+        await asyncio.gather(*[client_loop() for _ in range(concurrency)])
+
+
+def summarize(server: str, workers: int, processes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    worker_rows = [process for process in processes if process["role"] == "worker"]
+
+    def mb(value: float) -> float:
+        return round(value / 2 ** 20, 1)
+
+    def mean(field: str) -> Optional[float]:
+        return mb(sum(row[field] for row in worker_rows) / len(worker_rows)) if worker_rows else None
+
+    return {
+        "server": server,
+        "workers": workers,
+        "workers_found": len(worker_rows),
+        "worker_rss_mb": mean("rss"),
+        "worker_pss_mb": mean("pss"),
+        "worker_private_mb": mean("private"),
+        "total_rss_mb": mb(sum(row["rss"] for row in processes)),
+        "total_pss_mb": mb(sum(row["pss"] for row in processes)),
+        "processes": [{**row, **{field: mb(row[field]) for field in MEMORY_FIELDS}} for row in processes]
+    }
+
+
+async def measure(server: str, workers: int, env: Dict[str, str], new_payloads: List[Dict[str, Any]],
+                  existing_payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    print(f"Starting {server} with {workers} worker(s)...")
+    process = start_server(workers, port, env, server)
+    try:
+        await wait_until_healthy(url, process)
+        await exercise(url, new_payloads, existing_payloads, concurrency=2 * workers)
+        await asyncio.sleep(1)
+        return summarize(server, workers, server_processes(process.pid))
+    finally:
+        stop_server(process)
+
+
+async def run_memory_report(args: argparse.Namespace) -> Dict[str, Any]:
+    env = dict(item.split("=", 1) for item in args.env)
+    store_dir = None
+    if "STORE_DB_FILE" not in env:
+        # Keep the warm-up predictions out of the real store
+        store_dir = tempfile.mkdtemp(prefix="sme_memory_")
+        env["STORE_DB_FILE"] = os.path.join(store_dir, "memory.db")
+
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    new_payloads = load_new_business_payloads(args.requests)
+    existing_payloads = load_existing_business_payloads(args.requests)
+    results = []
+    try:
+        for workers in worker_counts:
+            for server in args.servers.split(","):
+                result = await measure(server, workers, env, new_payloads * workers, existing_payloads * workers)
+                results.append(result)
+                print_result(result)
+    finally:
+        if store_dir is not None:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    return {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "env": env,
+            "requests_per_worker": 2 * args.requests,
+            "cpu_count": os.cpu_count()
+        },
+        "results": results
+    }
+
+
+def print_result(result: Dict[str, Any]):
+    print(f"  {result['server']:18} {result['workers']:>3} workers: "
+          f"worker RSS {result['worker_rss_mb']} MB, PSS {result['worker_pss_mb']} MB, private {result['worker_private_mb']} MB; "
+          f"total RSS {result['total_rss_mb']} MB, PSS {result['total_pss_mb']} MB")
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"\n{'server':18} {'workers':>7} {'worker RSS':>11} {'worker PSS':>11} {'private':>8} {'total RSS':>10} {'total PSS':>10}")
+    for result in results:
+        print(f"{result['server']:18} {result['workers']:7} {result['worker_rss_mb']:11.1f} {result['worker_pss_mb']:11.1f} "
+              f"{result['worker_private_mb']:8.1f} {result['total_rss_mb']:10.1f} {result['total_pss_mb']:10.1f}")
+    print("(MB; total PSS is the memory the whole server uses)")
+
+
+def main_memory_report(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,4,8", help="comma-separated worker counts")
+    parser.add_argument("--servers", default="uvicorn,prefork", help=f"comma-separated server modes: {', '.join(SERVERS)}")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="server environment, e.g. COMPILED_TREE_MODELS=new_business")
+    parser.add_argument("--requests", type=int, default=20, help="predictions of each kind sent per worker before measuring")
+    parser.add_argument("--output", default="memory_report.json")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.servers.split(",")) - set(SERVERS)
+    if unknown:
+        parser.error(f"Unknown server modes: {', '.join(sorted(unknown))}")
+    if not os.path.isdir("/proc"):
+        parser.error("memory_report.py reads /proc and needs Linux")
+
+    report = asyncio.run(run_memory_report(args))
+    print_table(report["results"])
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_memory_report())
@@ -0,0 +1,244 @@
+"""
+Per-stage latency histograms, request counters and a Prometheus text exposition
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Metrics configuration (override with environment variables)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (metric name, type, help, labels, value) reported by a collector at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+_NULL_STAGE = nullcontext()
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by name and label values, plus scrape-time collectors"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def record_stages(self, endpoint: str, model_version: str, samples: List[Tuple[str, float]]):
+        """Record stage timings collected by timed_call()"""
+        for stage_name, seconds in samples:
+            self.observe("sme_stage_duration_seconds",
+                         {"endpoint": endpoint, "model_version": model_version, "stage": stage_name}, seconds)
+
+    @contextmanager
+    def timed(self, endpoint: str, model_version: str, stage_name: str):
+        """Time a stage that runs in this process, outside any timed_call()"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stages(endpoint, model_version, [(stage_name, time.perf_counter() - start)])
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Register a function returning current values (gauges, counters kept elsewhere) at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (list(histogram.counts), histogram.sum, histogram.count, histogram.buckets)
+                for key, histogram in self._histograms.items()
+            }
+
+        lines: List[str] = []
+        described = set()
+
+        def header(name: str, kind: str, help_text: Optional[str] = None):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {help_text or self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(dict(labels))} {_format_value(value)}")
+
+        for (name, labels), (counts, total, count, buckets) in sorted(histograms.items()):
+            header(name, "histogram")
+            label_dict = dict(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + [float("inf")], counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(label_dict, le=le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(label_dict)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(label_dict)} {count}")
+
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, kind, help_text, labels, value in samples:
+                header(name, kind, help_text)
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# ----- stage timers for inference work -----
+
+def stage(name: str):
+    """Context manager timing one stage of the work run by timed_call(); a shared no-op otherwise"""
+    samples = getattr(_local, "samples", None)
+    if samples is None:
+        return _NULL_STAGE
+    return _StageTimer(name, samples)
+
+
+class _StageTimer:
+    __slots__ = ("name", "samples", "start")
+
+    def __init__(self, name: str, samples: List[Tuple[str, float]]):
+        self.name = name
+        self.samples = samples
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.samples.append((self.name, time.perf_counter() - self.start))
+
+
+def timed_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, List[Tuple[str, float]]]:
+    """Run fn(*args) collecting its stage() timings; returns (result, [(stage, seconds), ...]).
+
+    Module-level so the inference pool can pickle it, which brings timings
+    taken in worker processes back to the process serving /metrics.
+    """
+    previous = getattr(_local, "samples", None)
+    _local.samples = samples = []
+    try:
+        return fn(*args), samples
+    finally:
+        _local.samples = previous
+
+
+# ----- HTTP request metrics -----
+
+class RequestMetricsMiddleware:
+    """ASGI middleware counting requests and errors and timing them per route template.
+
+    Requests that match no route are reported under "unmatched", which
+    keeps label cardinality bounded.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+        self._handlers: Dict[Any, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            handler = self._handler(scope)
+            elapsed = time.perf_counter() - start
+            self.registry.inc("sme_http_requests_total",
+                              {"handler": handler, "method": scope["method"], "status": str(status["code"])})
+            if status["code"] >= 500:
+                self.registry.inc("sme_http_request_errors_total", {"handler": handler})
+            self.registry.observe("sme_http_request_duration_seconds", {"handler": handler}, elapsed)
+
+    def _handler(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        handler = self._handlers.get(endpoint)
+        if handler is None:
+            app = scope.get("app")
+            paths = {getattr(route, "endpoint", None): route.path for route in getattr(app, "routes", [])}
+            handler = self._handlers[endpoint] = paths.get(endpoint, endpoint.__name__)
+        return handler
+
+
+def _format_labels(labels: Dict[str, str], le: Optional[str] = None) -> str:
+    """Sorted label pairs, with a histogram bucket's le label last"""
+    pairs = sorted(labels.items()) + ([("le", le)] if le is not None else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,307 @@
+"""
+Registry of versioned model artifacts with background loading and atomic swaps
+"""
+
+import importlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import joblib
+
+from startup_profile import startup_profile
+
+# Registry configuration (override with environment variables)
+MODELS_DIR = os.environ.get("MODELS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models"))
+MODEL_HISTORY_SIZE = int(os.environ.get("MODEL_HISTORY_SIZE", 2))  # previous versions kept loaded for rollback
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))  # seconds between scans of MODELS_DIR; 0 disables
+
+# Artifact file names of each model kind; {version} is the training timestamp, e.g. 20251106_133503
+MODEL_ARTIFACTS = {
+    "new_business": {
+        "model": "sme_success_predictor_random_forest_{version}.joblib"
+    },
+    "existing_business": {
+        "model": "existing_business_predictor_{version}.joblib",
+        "scaler": "feature_scaler_{version}.joblib",
+        "encoders": "label_encoders_{version}.joblib",
+        "metadata": "model_metadata_{version}.json"
+    }
+}
+OPTIONAL_ARTIFACTS = {"metadata"}
+
+# Library each kind's model unpickles into, imported on its own first so its cost is profiled separately
+MODEL_LIBRARIES = {
+    "new_business": "sklearn.ensemble",
+    "existing_business": "xgboost"
+}
+
+VERSION_PATTERN = r"(?P<version>\d{8}_\d{6})"
+
+
+def drop_feature_names(estimator: Any):
+    """Forget the DataFrame column names a scikit-learn estimator was fitted with.
+
+    The API scores NumPy matrices built by the feature encoders, in the
+    fitted column order. Without the names, scikit-learn skips its
+    feature-name check instead of warning on every call. It still checks
+    the number of columns.
+    """
+    if hasattr(estimator, "feature_names_in_"):
+        del estimator.feature_names_in_
+
+
+class ModelVersion:
+    """One version of a model kind: its files and, once loaded, the objects read from them.
+
+    scorer is the model itself unless prepare() replaced it (e.g. with a
+    compiled evaluator). name identifies the version in per-version caches.
+    """
+
+    def __init__(self, kind: str, version: str, files: Dict[str, str]):
+        self.kind = kind
+        self.version = version
+        self.files = files
+        self.model: Any = None
+        self.scorer: Any = None
+        self.scaler: Any = None
+        self.encoders: Any = None
+        self.metadata: Optional[Dict[str, Any]] = None
+        self.loaded_at: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}:{self.version}"
+
+    def load(self):
+        """Read every artifact from disk, recording each step in the startup profile"""
+        start = time.perf_counter()
+        library = MODEL_LIBRARIES.get(self.kind)
+        if library is not None and library not in sys.modules:
+            with startup_profile.phase("import", library.partition(".")[0]):
+                importlib.import_module(library)
+        with startup_profile.phase("load", f"{self.kind} model", self.version):
+            self.model = joblib.load(self.files["model"])
+        drop_feature_names(self.model)
+        self.scorer = self.model
+        if "scaler" in self.files:
+            with startup_profile.phase("load", f"{self.kind} scaler", self.version):
+                self.scaler = joblib.load(self.files["scaler"])
+            drop_feature_names(self.scaler)
+        if "encoders" in self.files:
+            with startup_profile.phase("load", f"{self.kind} encoders", self.version):
+                self.encoders = joblib.load(self.files["encoders"])
+        if "metadata" in self.files:
+            with startup_profile.phase("parse", f"{self.kind} metadata", self.version):
+                with open(self.files["metadata"], "r") as f:
+                    self.metadata = json.load(f)
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_at = datetime.now().isoformat()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "files": {artifact: os.path.basename(path) for artifact, path in self.files.items()},
+            "loaded_at": self.loaded_at,
+            "load_seconds": None if self.load_seconds is None else round(self.load_seconds, 3)
+        }
+
+
+def scan_models(models_dir: str = MODELS_DIR) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Complete artifact sets in models_dir: {kind: {version: {artifact: path}}}"""
+    try:
+        filenames = os.listdir(models_dir)
+    except OSError:
+        filenames = []
+
+    found: Dict[str, Dict[str, Dict[str, str]]] = {kind: {} for kind in MODEL_ARTIFACTS}
+    for kind, artifacts in MODEL_ARTIFACTS.items():
+        for artifact, template in artifacts.items():
+            pattern = re.compile(re.escape(template).replace(re.escape("{version}"), VERSION_PATTERN) + "$")
+            for filename in filenames:
+                match = pattern.match(filename)
+                if match:
+                    found[kind].setdefault(match.group("version"), {})[artifact] = os.path.join(models_dir, filename)
+
+    required = {kind: set(artifacts) - OPTIONAL_ARTIFACTS for kind, artifacts in MODEL_ARTIFACTS.items()}
+    return {
+        kind: {version: files for version, files in sorted(versions.items()) if required[kind] <= set(files)}
+        for kind, versions in found.items()
+    }
+
+
+class ModelRegistry:
+    """Tracks the active version of each model kind and swaps in new ones without a restart.
+
+    A version is loaded, passed to prepare(version) to compile and warm it
+    up, and only then made active, in one assignment under a lock, so
+    requests see either the old version or the new one in full. Callers
+    hold on to the version they started with: get() keeps answering for the
+    last history_size versions, which also makes rollback() instant.
+    on_activate(version) runs after every swap; on_retire(version) when a
+    version is dropped from the history.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, history_size: int = MODEL_HISTORY_SIZE,
+                 prepare: Optional[Callable[[ModelVersion], None]] = None,
+                 on_activate: Optional[Callable[[ModelVersion], None]] = None,
+                 on_retire: Optional[Callable[[ModelVersion], None]] = None):
+        self.models_dir = models_dir
+        self.history_size = max(0, history_size)
+        self.prepare = prepare
+        self.on_activate = on_activate
+        self.on_retire = on_retire
+        self._lock = threading.Lock()
+        self._active: Dict[str, ModelVersion] = {}
+        self._history: Dict[str, List[ModelVersion]] = {kind: [] for kind in MODEL_ARTIFACTS}
+        self._loads: Dict[str, Dict[str, Any]] = {}  # latest background load per kind
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    def scan(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        return scan_models(self.models_dir)
+
+    def active(self, kind: str) -> Optional[ModelVersion]:
+        return self._active.get(kind)
+
+    def get(self, kind: str, version: Optional[str] = None) -> Optional[ModelVersion]:
+        """The given version if it is still loaded, else the active one"""
+        active = self._active.get(kind)
+        if version is None or (active is not None and active.version == version):
+            return active
+        for previous in reversed(self._history[kind]):
+            if previous.version == version:
+                return previous
+        return active
+
+    def load(self, kind: str, version: Optional[str] = None) -> ModelVersion:
+        """Load, prepare and activate a version (the newest on disk by default); raises ValueError if it does not exist"""
+        available = self.scan()[kind]
+        if not available:
+            raise ValueError(f"No complete {kind} model artifacts in {self.models_dir}")
+        version = version or max(available)
+        if version not in available:
+            raise ValueError(f"Unknown {kind} model version: {version}")
+
+        candidate = ModelVersion(kind, version, available[version])
+        candidate.load()
+        if self.prepare is not None:
+            self.prepare(candidate)
+        self.activate(candidate)
+        return candidate
+
+    def load_in_background(self, kind: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """Start loading a version on a background thread; the current version keeps serving until it is ready"""
+        available = self.scan()[kind]
+        version = version or (max(available) if available else None)
+        if version not in available:
+            raise ValueError(f"Unknown {kind} model version: {version}")
+        with self._lock:
+            current = self._loads.get(kind)
+            if current is not None and current["status"] == "loading":
+                raise RuntimeError(f"{kind} model version {current['version']} is already loading")
+            status = {"version": version, "status": "loading", "started_at": datetime.now().isoformat(),
+                      "completed_at": None, "error": None}
+            self._loads[kind] = status
+
+        def run():
+            try:
+                self.load(kind, version)
+                status["status"] = "active"
+            except Exception as e:
+                status["status"], status["error"] = "failed", str(e)
+                print(f"Error loading {kind} model version {version}: {e}")
+            status["completed_at"] = datetime.now().isoformat()
+
+        threading.Thread(target=run, name=f"model-loader-{kind}", daemon=True).start()
+        return dict(status)
+
+    def activate(self, candidate: ModelVersion):
+        """Swap a prepared version in; the one it replaces moves to the history"""
+        with self._lock:
+            previous = self._active.get(candidate.kind)
+            self._active[candidate.kind] = candidate
+            history = self._history[candidate.kind]
+            if previous is not None and previous.version != candidate.version:
+                history.append(previous)
+            history[:] = [entry for entry in history if entry.version != candidate.version]
+            retired = history[:-self.history_size] if self.history_size else list(history)
+            del history[:len(retired)]
+        self._activated(candidate, retired)
+
+    def rollback(self, kind: str) -> ModelVersion:
+        """Reactivate the previous version; raises ValueError if there is none"""
+        with self._lock:
+            history = self._history[kind]
+            if not history:
+                raise ValueError(f"No previous {kind} model version to roll back to")
+            restored = history.pop()
+            retired = [self._active[kind]]
+            self._active[kind] = restored
+        self._activated(restored, retired)
+        return restored
+
+    def _activated(self, version: ModelVersion, retired: List[ModelVersion]):
+        print(f"✓ {version.kind} model version {version.version} is active")
+        if self.on_activate is not None:
+            self.on_activate(version)
+        if self.on_retire is not None:
+            for old in retired:
+                self.on_retire(old)
+
+    def check_for_updates(self) -> List[str]:
+        """Start loading any kind whose newest version on disk is newer than the active one; returns those kinds"""
+        started = []
+        for kind, versions in self.scan().items():
+            if not versions:
+                continue
+            newest = max(versions)
+            active, load = self._active.get(kind), self._loads.get(kind)
+            if active is not None and newest <= active.version:
+                continue
+            if load is not None and load["version"] == newest and load["status"] in ("loading", "failed"):
+                continue  # a failed version is not retried until it is loaded explicitly
+            try:
+                self.load_in_background(kind, newest)
+                started.append(kind)
+            except (ValueError, RuntimeError) as e:
+                print(f"Skipping {kind} model update: {e}")
+        return started
+
+    def start_watching(self, interval: float = MODEL_WATCH_INTERVAL):
+        """Scan models_dir every interval seconds and load newer versions as they appear"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def run():
+            while not self._stop_watching.wait(interval):
+                self.check_for_updates()
+
+        self._watcher = threading.Thread(target=run, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        available = self.scan()
+        with self._lock:
+            return {
+                kind: {
+                    "active": self._active[kind].info() if kind in self._active else None,
+                    "previous": [entry.version for entry in reversed(self._history[kind])],
+                    "available": sorted(available.get(kind, {})),
+                    "load": dict(self._loads[kind]) if kind in self._loads else None
+                }
+                for kind in MODEL_ARTIFACTS
+            }
@@ -0,0 +1,72 @@
+"""
+Realistic request payloads drawn from the training datasets, for benchmarks and load tests
+"""
+
+import os
+from typing import Any, Dict, List
+
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+NEW_BUSINESS_DATA_PATHS = [os.path.join(DATA_DIR, "sme_best_enhanced.csv"), os.path.join(DATA_DIR, "sme_final_15k_enhanced.csv")]
+EXISTING_BUSINESS_DATA_PATH = os.path.join(DATA_DIR, "sme_final_15k_enhanced.csv")
+
+# owner_education_level in the datasets, on the API's 0-4 education_level_numeric scale
+EDUCATION_LEVELS = {
+    "No Formal Education": 0,
+    "Primary": 1,
+    "Secondary": 2,
+    "Vocational/Technical": 2,
+    "Certificate/Diploma": 2,
+    "Diploma": 3,
+    "Bachelor's Degree": 3,
+    "Master's Degree": 4,
+    "PhD": 4
+}
+
+
+def load_new_business_payloads(n_rows: int) -> List[Dict[str, Any]]:
+    """/predict payloads, half from each dataset"""
+    per_file = max(1, n_rows // len(NEW_BUSINESS_DATA_PATHS))
+    payloads = []
+    for path in NEW_BUSINESS_DATA_PATHS:
+        df = pd.read_csv(path).sample(n=per_file, random_state=42)
+        payloads.extend(
+            {
+                "business_capital": float(row.business_capital),
+                "owner_age": int(row.owner_age),
+                "owner_business_experience": int(row.owner_business_experience),
+                "capital_source": row.capital_source,
+                "business_sector": row.business_sector,
+                "number_of_employees": int(row.number_of_employees),
+                "business_location": row.business_location,
+                "entity_type": row.entity_type,
+                "owner_gender": str(row.owner_gender),
+                "education_level_numeric": EDUCATION_LEVELS.get(row.owner_education_level, 2)
+            }
+            for row in df.itertuples()
+        )
+    return payloads
+
+
+def load_existing_business_payloads(n_rows: int) -> List[Dict[str, Any]]:
+    """/predict-existing-business payloads with 4 years of turnover and employment history"""
+    df = pd.read_csv(EXISTING_BUSINESS_DATA_PATH).sample(n=n_rows, random_state=42)
+    return [
+        {
+            "business_capital": float(max(row.business_capital, 1)),
+            "business_sector": row.business_sector,
+            "entity_type": row.entity_type,
+            "business_location": row.business_location,
+            "capital_source": row.capital_source,
+            "turnover_first_year": float(row.turnover_2021),
+            "turnover_second_year": float(row.turnover_2022),
+            "turnover_third_year": float(row.turnover_2023),
+            "turnover_fourth_year": float(row.turnover_2024),
+            "employment_first_year": int(row.employment_2021),
+            "employment_second_year": int(row.employment_2022),
+            "employment_third_year": int(row.employment_2023),
+            "employment_fourth_year": int(row.employment_2024)
+        }
+        for row in df.itertuples()
+    ]
@@ -0,0 +1,103 @@
+"""
+Bounded LRU cache of full prediction responses for repeated submissions
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Cache configuration (override with environment variables); a size of 0 disables caching
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 1024))
+PREDICTION_CACHE_TTL_SECONDS = float(os.environ.get("PREDICTION_CACHE_TTL_SECONDS", 600))
+
+
+class PredictionCache:
+    """Maps a canonical hash of (prediction type, model version, validated input) to a response.
+
+    Holds at most max_size entries, evicting the least recently used, and
+    treats entries older than ttl_seconds as misses. invalidate() empties the
+    cache and is called whenever models are (re)loaded.
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def key(prediction_type: str, input_data: Dict[str, Any], model_version: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Canonical hash: key order and formatting of the input do not matter; options change the response shape"""
+        canonical = json.dumps(
+            {"type": prediction_type, "model_version": model_version, "input": input_data, "options": options or {}},
+            sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry, e.g. because the models behind them were reloaded"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,159 @@
+"""
+Buffered prediction log writer with a background flusher
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from store import SQLiteStore
+
+# Log configuration (override with environment variables)
+PREDICTION_LOG_FLUSH_INTERVAL = float(os.environ.get("PREDICTION_LOG_FLUSH_INTERVAL", 0.5))
+PREDICTION_LOG_CLOSE_RETRIES = int(os.environ.get("PREDICTION_LOG_CLOSE_RETRIES", 5))  # final flush attempts on shutdown
+PREDICTION_LOG_CLOSE_BACKOFF = float(os.environ.get("PREDICTION_LOG_CLOSE_BACKOFF", 0.2))  # seconds, doubled after each attempt
+
+
+class PredictionLogWriter:
+    """Buffers prediction entries in memory and inserts them into the store in batches.
+
+    append() only queues the entries; a background thread inserts everything
+    queued in one transaction every flush_interval seconds. The store assigns
+    the IDs in that transaction, so several processes (uvicorn or prefork
+    workers) can log to one database. A batch the database refuses for the
+    moment (locked, busy, disk full) goes back to the front of the buffer
+    and is retried on the next flush. on_flush, if set, is called with every
+    batch once it has been stored, each entry carrying its ID. On close(),
+    the final flush is retried close_retries times with a doubling backoff;
+    whatever is still buffered after that is counted as dropped.
+    """
+
+    def __init__(self, store: SQLiteStore, flush_interval: float = PREDICTION_LOG_FLUSH_INTERVAL,
+                 on_flush: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 close_retries: int = PREDICTION_LOG_CLOSE_RETRIES, close_backoff: float = PREDICTION_LOG_CLOSE_BACKOFF):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.close_retries = max(1, close_retries)
+        self.close_backoff = close_backoff
+        self._lock = threading.Lock()  # guards the buffer
+        self._write_lock = threading.Lock()  # keeps batches in order
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._buffer: List[Dict[str, Any]] = []
+
+        # Metrics
+        self.appended = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.retries = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the background flusher"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-log-flusher", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the flusher and write everything still buffered"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+
+        # A locked or busy database usually frees up within moments; keep trying briefly before giving up
+        delay = self.close_backoff
+        for attempt in range(self.close_retries):
+            self.flush()
+            if not self._buffer:
+                return
+            if attempt < self.close_retries - 1:
+                time.sleep(delay)
+                delay *= 2
+        with self._lock:
+            lost, self._buffer = len(self._buffer), []
+            self.dropped += lost
+        print(f"Error logging predictions: dropped {lost} entries still unwritten at shutdown")
+
+    def append(self, predictions: List[Tuple[str, dict, dict]]):
+        """Queue (prediction_type, input_data, prediction_result) entries sharing one timestamp"""
+        if not predictions:
+            return
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            self._buffer.extend(
+                {
+                    "timestamp": timestamp,
+                    "prediction_type": prediction_type,  # "new_business" or "existing_business"
+                    "input_data": input_data,
+                    "prediction_result": prediction_result
+                }
+                for prediction_type, input_data, prediction_result in predictions
+            )
+            self.appended += len(predictions)
+        if self._thread is None:
+            self.flush()
+
+    def flush(self) -> List[int]:
+        """Insert buffered entries in one transaction; returns the IDs they were given"""
+        with self._write_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return []
+            try:
+                ids = self.store.insert_predictions(entries)
+                self.flushes += 1
+            except sqlite3.OperationalError as e:
+                # Nothing was written; keep the batch, ahead of newer entries, for the next flush
+                self.write_errors += 1
+                self.retries += 1
+                with self._lock:
+                    self._buffer[:0] = entries
+                print(f"Error logging predictions, will retry {len(entries)}: {e}")
+                return []
+            except Exception as e:
+                # The entries themselves can't be stored (e.g. not JSON serializable), so retrying won't help
+                self.write_errors += 1
+                self.dropped += len(entries)
+                print(f"Error logging prediction: {e}")
+                return []
+            if self.on_flush is not None:
+                try:
+                    self.on_flush(entries)
+                except Exception as e:
+                    print(f"Error publishing logged predictions: {e}")
+            return ids
+
+    def clear(self) -> int:
+        """Drop buffered entries and delete every stored prediction; the store's IDs keep counting"""
+        with self._write_lock:
+            with self._lock:
+                buffered, self._buffer = len(self._buffer), []
+            return buffered + self.store.clear_predictions()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "appended": self.appended,
+            "buffered": buffered,
+            "flushes": self.flushes,
+            "write_errors": self.write_errors,
+            "retries": self.retries,
+            "dropped": self.dropped
+        }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
@@ -0,0 +1,148 @@
+"""
+Preload-then-fork server: load the models once, then fork the uvicorn workers
+
+With `uvicorn --workers N` every worker is a fresh interpreter that loads
+its own copy of the forest, the booster, the scaler and the SHAP
+explainers, so memory grows linearly with N. Here the parent process
+loads, compiles and warms up every model, moves the loaded objects out of
+the garbage collector's reach with gc.freeze(), and only then forks the
+workers, which all accept connections on one listening socket. Pages the
+workers only read stay shared copy-on-write, so each worker adds little
+more than the memory it writes while serving. Workers that die are
+replaced from the same preloaded parent.
+
+Usage (from the api directory):
+    python prefork.py [--workers 4] [--host 0.0.0.0] [--port 8000] [--no-preload]
+
+--no-preload forks the workers first and lets each load its own models,
+which is how `uvicorn --workers` behaves; memory_report.py compares both.
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+# Server configuration (override with environment variables)
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", 8000))
+PREFORK_WORKERS = int(os.environ.get("PREFORK_WORKERS", os.cpu_count() or 1))
+
+# Pending connections the shared socket queues before the kernel refuses new ones
+LISTEN_BACKLOG = 2048
+
+
+def preload_app() -> Any:
+    """Import the API and load every model in this process, ready to be inherited by forked workers"""
+    import main
+    start = time.perf_counter()
+    main.load_models()
+    main.startup_seconds = time.perf_counter() - start
+    main.models_preloaded = True
+    print(f"✓ Models preloaded in {main.startup_seconds:.2f}s")
+    # End the boot here, so the workers serve this profile instead of each logging their own
+    if main.startup_profile.mark_booted():
+        main.startup_profile.log()
+
+    # Freeze what is loaded so far: collections in the workers then skip these objects
+    # instead of writing to their headers, which would copy the shared pages
+    gc.collect()
+    gc.freeze()
+    return main.app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket shared by every worker"""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Forks the workers, replaces any that exit and stops them all on SIGINT or SIGTERM"""
+
+    def __init__(self, app: Any, sock: socket.socket, workers: int, log_level: str = "info"):
+        self.app = app  # the preloaded app, or an import string each worker loads itself
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.log_level = log_level
+        self.children: Dict[int, int] = {}  # pid -> worker slot
+        self.stopping = False
+
+    def spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            # Worker: uvicorn installs its own signal handlers and shuts down gracefully on SIGTERM
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            status = 0
+            try:
+                config = uvicorn.Config(self.app, log_level=self.log_level)
+                uvicorn.Server(config).run(sockets=[self.sock])
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {e}")
+                status = 1
+            finally:
+                os._exit(status)
+        self.children[pid] = slot
+
+    def stop(self, signum: int, frame: Optional[Any] = None):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for slot in range(self.workers):
+            self.spawn(slot)
+        print(f"✓ Forked {self.workers} worker(s): {sorted(self.children)}")
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot = self.children.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, starting a replacement")
+            time.sleep(1)  # avoid a tight respawn loop if workers fail at startup
+            self.spawn(slot)
+        self.sock.close()
+        return 0
+
+
+def serve(host: str = HOST, port: int = PORT, workers: int = PREFORK_WORKERS, preload: bool = True,
+          log_level: str = "info") -> int:
+    app = preload_app() if preload else "main:app"
+    sock = bind_socket(host, port)
+    print(f"✓ Listening on {host}:{port} ({'preloaded' if preload else 'per-worker'} models)")
+    return PreforkServer(app, sock, workers, log_level).run()
+
+
+def main_prefork(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=PREFORK_WORKERS, help="worker processes forked after loading")
+    parser.add_argument("--no-preload", action="store_true", help="load the models in each worker instead")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    return serve(args.host, args.port, args.workers, not args.no_preload, args.log_level)
+
+
+if __name__ == "__main__":
+    sys.exit(main_prefork())
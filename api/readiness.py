@@ -0,0 +1,107 @@
+"""
+Startup warmup and the readiness gate behind /ready
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Warmup configuration (override with environment variables)
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1").lower() not in ("0", "false", "no")
+WARMUP_ROUNDS = int(os.environ.get("WARMUP_ROUNDS", 3))  # rounds always run, however fast the first ones are
+WARMUP_MAX_ROUNDS = int(os.environ.get("WARMUP_MAX_ROUNDS", 20))  # give up (stay not ready) after this many
+READY_LATENCY_BUDGET_MS = float(os.environ.get("READY_LATENCY_BUDGET_MS", 250))
+
+# Gate states
+STATUS_PENDING = "pending"
+STATUS_WARMING = "warming"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+class ReadinessGate:
+    """Runs synthetic requests until every one answers within the latency budget, then reports ready.
+
+    run(checks) takes {name: async callable doing one request}. Each round
+    calls every check once and times it; a check that raises fails the
+    round. After min_rounds, the gate opens at the first round in which
+    every check succeeded within budget_ms. If max_rounds go by without
+    one, warmup has failed and the gate stays closed, so a load balancer
+    polling /ready keeps traffic away from a worker that is still slow.
+    """
+
+    def __init__(self, min_rounds: int = WARMUP_ROUNDS, max_rounds: int = WARMUP_MAX_ROUNDS,
+                 budget_ms: float = READY_LATENCY_BUDGET_MS, clock: Callable[[], float] = time.perf_counter):
+        self.min_rounds = max(1, min_rounds)
+        self.max_rounds = max(self.min_rounds, max_rounds)
+        self.budget_ms = budget_ms
+        self._clock = clock
+        self.status = STATUS_PENDING
+        self.rounds = 0
+        self.first_ms: Dict[str, float] = {}  # cold latency: what the first real request would have paid
+        self.latest_ms: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[str] = None
+        self.completed_at: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == STATUS_READY
+
+    def open(self):
+        """Report ready without warming up"""
+        self.status = STATUS_READY
+        self.completed_at = datetime.now().isoformat()
+
+    async def run(self, checks: Dict[str, Callable[[], Awaitable[Any]]]) -> bool:
+        """Warm up with the checks until they meet the budget; returns whether the gate opened"""
+        self.status = STATUS_WARMING
+        self.rounds = 0
+        self.first_ms, self.latest_ms, self.errors = {}, {}, {}
+        self.started_at, self.completed_at = datetime.now().isoformat(), None
+        start = self._clock()
+        while self.rounds < self.max_rounds:
+            within_budget = await self._run_round(checks)
+            if within_budget and self.rounds >= self.min_rounds:
+                self.status = STATUS_READY
+                break
+        else:
+            self.status = STATUS_FAILED
+        self.warmup_seconds = self._clock() - start
+        self.completed_at = datetime.now().isoformat()
+        return self.ready
+
+    async def _run_round(self, checks: Dict[str, Callable[[], Awaitable[Any]]]) -> bool:
+        self.rounds += 1
+        within_budget = True
+        for name, check in checks.items():
+            start = self._clock()
+            try:
+                await check()
+            except Exception as e:
+                self.errors[name] = str(e)
+                within_budget = False
+                continue
+            elapsed_ms = (self._clock() - start) * 1000
+            self.errors.pop(name, None)
+            self.first_ms.setdefault(name, elapsed_ms)
+            self.latest_ms[name] = elapsed_ms
+            if elapsed_ms > self.budget_ms:
+                within_budget = False
+        return within_budget
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "budget_ms": self.budget_ms,
+            "rounds": self.rounds,
+            "first_ms": {name: round(ms, 2) for name, ms in self.first_ms.items()},
+            "latest_ms": {name: round(ms, 2) for name, ms in self.latest_ms.items()},
+            "errors": dict(self.errors),
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "warmup_seconds": None if self.warmup_seconds is None else round(self.warmup_seconds, 3)
+        }
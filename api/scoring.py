@@ -0,0 +1,31 @@
+"""
+Shared scoring routine: one ensemble pass yields probabilities, labels and confidence
+"""
+
+import os
+from typing import Any, Sequence, Tuple
+
+import numpy as np
+
+# Success probability above which a business is labelled successful (class 1)
+NEW_BUSINESS_DECISION_THRESHOLD = float(os.environ.get("NEW_BUSINESS_DECISION_THRESHOLD", "0.5"))
+EXISTING_BUSINESS_DECISION_THRESHOLD = float(os.environ.get("EXISTING_BUSINESS_DECISION_THRESHOLD", "0.5"))
+
+
+def classify(probabilities: np.ndarray, classes: Sequence[Any], threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """Threshold binary class probabilities into labels and the probability of each chosen label.
+
+    At the default 0.5 this reproduces model.predict() and max(probabilities).
+    """
+    probabilities = np.asarray(probabilities).reshape(-1, len(classes))
+    positive = probabilities[:, 1] > threshold
+    labels = np.where(positive, classes[1], classes[0])
+    confidence = np.where(positive, probabilities[:, 1], probabilities[:, 0])
+    return labels, confidence
+
+
+def score(model: Any, X: Any, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score X with a single predict_proba pass, returning (probabilities, labels, confidence)"""
+    probabilities = model.predict_proba(X)
+    labels, confidence = classify(probabilities, model.classes_, threshold)
+    return probabilities, labels, confidence
@@ -0,0 +1,150 @@
+"""
+Startup profile: time and memory taken by each import and artifact load while the API boots
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def resident_bytes() -> Optional[int]:
+    """This process's current RSS, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def process_age_seconds() -> Optional[float]:
+    """Seconds since this process was started (to the kernel's clock tick), or None without /proc"""
+    try:
+        with open("/proc/self/stat") as f:
+            started_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return max(0.0, uptime - started_ticks / CLOCK_TICKS)
+
+
+def top_level_modules() -> Set[str]:
+    return {name.partition(".")[0] for name in list(sys.modules)}
+
+
+class StartupProfile:
+    """Phases of the boot (imports, artifact loads, parsing, explainer builds) with their cost.
+
+    Each phase() records its wall time, the growth of the process's RSS,
+    and the top-level packages first imported during it, which shows what
+    unpickling a model pulls in. Phases nest: own_seconds leaves out the
+    phases recorded inside it, while seconds and rss_added_mb include them.
+    RSS growth is approximate when other threads allocate at the same time.
+    Phases recorded after mark_booted(), such as a lazy shap import on the
+    first explained request, are flagged after_boot. interpreter_seconds is
+    the time from process start to this profile's creation: the
+    interpreter, the server and everything imported before main.py.
+    """
+
+    def __init__(self):
+        self.created_at = datetime.now().isoformat()
+        self._created = time.perf_counter()
+        self.interpreter_seconds = process_age_seconds()
+        self.baseline_rss = resident_bytes()
+        self.boot_seconds: Optional[float] = None
+        self.booted_rss: Optional[int] = None
+        self.phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()  # per-thread stack of child-phase seconds, for own_seconds
+
+    @contextmanager
+    def phase(self, kind: str, name: str, detail: Optional[str] = None) -> Iterator[None]:
+        """Record the enclosed block as one phase, e.g. phase("import", "shap") or phase("load", "new_business model", version)"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        modules_before = top_level_modules()
+        rss_before = resident_bytes()
+        started = time.perf_counter()
+        stack.append(0.0)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += seconds
+            rss_after = resident_bytes()
+            with self._lock:
+                self.phases.append({
+                    "kind": kind,
+                    "name": name,
+                    "detail": detail,
+                    "started_at_seconds": round(started - self._created, 4),
+                    "seconds": round(seconds, 4),
+                    "own_seconds": round(seconds - children, 4),
+                    "rss_added_mb": None if rss_before is None else round((rss_after - rss_before) / 2 ** 20, 1),
+                    "new_modules": sorted(top_level_modules() - modules_before),
+                    "after_boot": self.boot_seconds is not None
+                })
+
+    def mark_booted(self) -> bool:
+        """End the boot; returns False if it had already ended (e.g. in a worker forked after boot)"""
+        if self.boot_seconds is not None:
+            return False
+        self.boot_seconds = time.perf_counter() - self._created
+        self.booted_rss = resident_bytes()
+        return True
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per "kind.name" over the phases recorded during boot"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for phase in self.phases:
+                if not phase["after_boot"]:
+                    key = f"{phase['kind']}.{phase['name']}"
+                    totals[key] = round(totals.get(key, 0.0) + phase["seconds"], 4)
+        return totals
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = [dict(phase) for phase in self.phases]
+        by_kind: Dict[str, float] = {}
+        for phase in phases:
+            if not phase["after_boot"]:
+                by_kind[phase["kind"]] = round(by_kind.get(phase["kind"], 0.0) + phase["own_seconds"], 4)
+
+        def mb(value: Optional[int]) -> Optional[float]:
+            return None if value is None else round(value / 2 ** 20, 1)
+
+        return {
+            "pid": os.getpid(),
+            "created_at": self.created_at,
+            "interpreter_seconds": None if self.interpreter_seconds is None else round(self.interpreter_seconds, 3),
+            "boot_seconds": None if self.boot_seconds is None else round(self.boot_seconds, 3),
+            "rss_mb": {"at_profile_start": mb(self.baseline_rss), "at_boot": mb(self.booted_rss), "now": mb(resident_bytes())},
+            "seconds_by_kind": by_kind,
+            "phases": phases
+        }
+
+    def log(self):
+        """Print the boot's phases, slowest first"""
+        report = self.report()
+        booted = [phase for phase in report["phases"] if not phase["after_boot"]]
+        print(f"✓ Startup profile: {report['boot_seconds']}s from import of main to ready "
+              f"(+{report['interpreter_seconds']}s interpreter and server before that), RSS {report['rss_mb']['at_boot']} MB")
+        for phase in sorted(booted, key=lambda phase: phase["own_seconds"], reverse=True):
+            label = f"{phase['kind']} {phase['name']}" + (f" ({phase['detail']})" if phase["detail"] else "")
+            modules = f"  imports {', '.join(phase['new_modules'][:6])}" if phase["new_modules"] and phase["kind"] != "import" else ""
+            print(f"    {label:60} {phase['own_seconds']:8.3f}s {phase['rss_added_mb'] or 0:+8.1f} MB{modules}")
+
+
+# One profile per process, filled in by main.py, model_registry.py and explainers.py
+startup_profile = StartupProfile()
@@ -0,0 +1,599 @@
+"""
+Embedded SQLite store for prediction logs and user feedback
+
+Rebuild the dashboard aggregates from the prediction log (from the api directory):
+    python store.py rebuild-aggregates [--db sme_predictor.db]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Store configuration (override with environment variables); relative to the api directory, not the working directory
+STORE_DB_FILE = os.path.join(API_DIR, os.environ.get("STORE_DB_FILE", "sme_predictor.db"))
+
+# Earlier file-based logs, imported once; the JSON Lines log already contains the JSON one
+LEGACY_PREDICTION_LOG_FILES = [os.path.join(API_DIR, "predictions_log.jsonl"), os.path.join(API_DIR, "predictions_log.json")]
+LEGACY_FEEDBACK_LOG_FILE = os.path.join(API_DIR, "feedback_log.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    prediction_type TEXT NOT NULL,
+    input_data TEXT NOT NULL,
+    prediction_result TEXT NOT NULL,
+    -- Copied out of prediction_result so the admin statistics run in SQL
+    outcome INTEGER,
+    success_probability REAL,
+    confidence REAL,
+    confidence_level TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_type ON predictions (prediction_type, id);
+CREATE INDEX IF NOT EXISTS idx_predictions_type_timestamp ON predictions (prediction_type, timestamp);
+
+-- Running aggregates, updated in the same transaction as every insert
+CREATE TABLE IF NOT EXISTS prediction_totals (
+    prediction_type TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    successful INTEGER NOT NULL,
+    unsuccessful INTEGER NOT NULL,
+    success_probability_sum REAL NOT NULL,
+    confidence_sum REAL NOT NULL,
+    high_confidence INTEGER NOT NULL,
+    medium_confidence INTEGER NOT NULL,
+    low_confidence INTEGER NOT NULL
+);
+-- Hourly and daily buckets per prediction type, keyed by a timestamp prefix (see ROLLUP_RESOLUTIONS)
+CREATE TABLE IF NOT EXISTS prediction_rollups (
+    resolution TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    prediction_type TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    successful INTEGER NOT NULL,
+    unsuccessful INTEGER NOT NULL,
+    success_probability_sum REAL NOT NULL,
+    confidence_sum REAL NOT NULL,
+    high_confidence INTEGER NOT NULL,
+    medium_confidence INTEGER NOT NULL,
+    low_confidence INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket, prediction_type)
+) WITHOUT ROWID;
+-- Superseded by the daily rollups
+DROP TABLE IF EXISTS prediction_daily_counts;
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    prediction_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'unread'
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_status ON feedback (status, id);
+
+CREATE TABLE IF NOT EXISTS imported_logs (
+    kind TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+# Fields a prediction page can be projected onto; the first five are the logged entry itself
+PREDICTION_FIELDS = ("id", "timestamp", "prediction_type", "input_data", "prediction_result",
+                     "outcome", "success_probability", "confidence", "confidence_level")
+DEFAULT_PREDICTION_FIELDS = PREDICTION_FIELDS[:5]
+PREDICTION_ORDERS = ("id", "timestamp")
+
+FEEDBACK_COLUMNS = ("id", "timestamp", "name", "email", "prediction_type", "message", "status")
+
+TOTALS_COLUMNS = ("total", "successful", "unsuccessful", "success_probability_sum", "confidence_sum",
+                  "high_confidence", "medium_confidence", "low_confidence")
+
+# Rollup bucket keys are timestamp prefixes: "2025-11-20T10" for an hour, "2025-11-20" for a day
+ROLLUP_RESOLUTIONS = {"hour": 13, "day": 10}
+
+# Totals columns computed from the predictions table
+_TOTALS_SELECT = """
+       COUNT(*),
+       COALESCE(SUM(outcome = 1), 0),
+       COALESCE(SUM(outcome = 0), 0),
+       TOTAL(success_probability),
+       TOTAL(confidence),
+       COALESCE(SUM(confidence_level = 'High'), 0),
+       COALESCE(SUM(confidence_level = 'Medium'), 0),
+       COALESCE(SUM(confidence_level = 'Low'), 0)
+"""
+
+# Recomputes the running aggregates and rollups from the predictions table
+REBUILD_AGGREGATES = (
+    "DELETE FROM prediction_totals;\n"
+    "DELETE FROM prediction_rollups;\n"
+    f"INSERT INTO prediction_totals SELECT prediction_type, {_TOTALS_SELECT} FROM predictions GROUP BY prediction_type;\n"
+    + "".join(
+        f"INSERT INTO prediction_rollups SELECT '{resolution}', substr(timestamp, 1, {width}), prediction_type, {_TOTALS_SELECT} "
+        f"FROM predictions GROUP BY substr(timestamp, 1, {width}), prediction_type;\n"
+        for resolution, width in ROLLUP_RESOLUTIONS.items()
+    )
+)
+
+
+def normalize_time_bound(value: str) -> str:
+    """An ISO date or timestamp in any form fromisoformat accepts (space separator, compact, Z or offset),
+    rewritten the way the log's timestamps are: YYYY-MM-DD, or YYYY-MM-DDTHH:MM:SS in the server's local time.
+    Raises ValueError for anything else.
+    """
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        # Logged timestamps are naive local times (datetime.now())
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment.isoformat(timespec="seconds")
+
+
+def rollup_bucket(timestamp: str, resolution: str, end: bool = False) -> str:
+    """Bucket key holding a normalized ISO date or timestamp; a bare date as an end bound covers its last hour"""
+    width = ROLLUP_RESOLUTIONS[resolution]
+    bucket = timestamp[:width]
+    if end and len(bucket) == 10 and width == 13:
+        bucket += "T23"
+    return bucket
+
+
+def prediction_outcome(prediction_result: Dict[str, Any]) -> Optional[int]:
+    """1 for a predicted success, 0 for a predicted failure, for either prediction type"""
+    prediction = prediction_result.get("prediction")
+    if prediction == 1 or prediction == "Success":
+        return 1
+    if prediction == 0 or prediction == "Failure":
+        return 0
+    return None
+
+
+class SQLiteStore:
+    """Prediction and feedback tables in one SQLite database in WAL mode.
+
+    Each thread gets its own connection, so the log flusher can write while
+    admin requests read. The schema is created, and legacy JSON logs are
+    imported, on first use. All queries are parameterized.
+    """
+
+    def __init__(self, path: str = STORE_DB_FILE,
+                 legacy_prediction_files: Sequence[str] = LEGACY_PREDICTION_LOG_FILES,
+                 legacy_feedback_file: Optional[str] = LEGACY_FEEDBACK_LOG_FILE):
+        self.path = path
+        self.legacy_prediction_files = list(legacy_prediction_files)
+        self.legacy_feedback_file = legacy_feedback_file
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._initialized = False
+
+    # ----- connections -----
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        try:
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._initialized:
+                    connection.executescript(SCHEMA)
+                    self._import_legacy_logs(connection)
+                    # Databases created before the aggregate tables existed get them filled in once
+                    if connection.execute("SELECT 1 FROM predictions").fetchone() and (
+                            not connection.execute("SELECT 1 FROM prediction_totals").fetchone() or
+                            not connection.execute("SELECT 1 FROM prediction_rollups").fetchone()):
+                        self._rebuild_aggregates(connection)
+                    self._initialized = True
+                self._connections.append(connection)
+        except Exception:
+            # Not cached, so the next call on any thread retries the initialization
+            connection.close()
+            raise
+        self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Checkpoint the write-ahead log into the database file and close every connection"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for i, connection in enumerate(connections):
+            try:
+                if i == 0:
+                    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                connection.close()
+            except sqlite3.ProgrammingError:
+                pass  # already closed
+        self._local = threading.local()
+
+    # ----- predictions -----
+
+    def last_prediction_id(self) -> int:
+        """Highest prediction ID ever assigned, including deleted rows"""
+        connection = self._connect()
+        row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'predictions'").fetchone()
+        highest = connection.execute("SELECT MAX(id) FROM predictions").fetchone()[0]
+        return max(row[0] if row else 0, highest or 0)
+
+    def insert_predictions(self, entries: List[Dict[str, Any]]) -> List[int]:
+        """Insert log entries (timestamp, prediction_type, input_data, prediction_result) in one transaction.
+
+        SQLite assigns the IDs inside the transaction, so processes sharing the
+        database never hand out the same one; each entry's "id" is set to the
+        one it got, and the IDs are returned. An entry that already has an
+        "id" (an imported legacy log) keeps it.
+        """
+        if not entries:
+            return []
+        connection = self._connect()
+        with connection:
+            ids = self._insert_predictions(connection, entries)
+        for entry, prediction_id in zip(entries, ids):
+            entry["id"] = prediction_id
+        return ids
+
+    @staticmethod
+    def _insert_predictions(connection: sqlite3.Connection, entries: List[Dict[str, Any]]) -> List[int]:
+        """Insert the entries and their aggregate deltas inside the caller's transaction"""
+        rows = [
+            (
+                entry.get("id"),
+                entry["timestamp"],
+                entry["prediction_type"],
+                json.dumps(entry["input_data"]),
+                json.dumps(entry["prediction_result"]),
+                prediction_outcome(entry["prediction_result"]),
+                entry["prediction_result"].get("success_probability"),
+                entry["prediction_result"].get("confidence"),
+                entry["prediction_result"].get("confidence_level")
+            )
+            for entry in entries
+        ]
+        # Fold the batch into per-type and per-bucket deltas for the running aggregates
+        totals: Dict[str, List[float]] = {}
+        rollups: Dict[Tuple[str, str, str], List[float]] = {}
+        for _, timestamp, prediction_type, _, _, outcome, probability, confidence, confidence_level in rows:
+            deltas = (1, outcome == 1, outcome == 0, probability or 0, confidence or 0,
+                      confidence_level == "High", confidence_level == "Medium", confidence_level == "Low")
+            keys = [(resolution, timestamp[:width], prediction_type) for resolution, width in ROLLUP_RESOLUTIONS.items()]
+            for counts in [totals.setdefault(prediction_type, [0] * len(TOTALS_COLUMNS))] + \
+                    [rollups.setdefault(key, [0] * len(TOTALS_COLUMNS)) for key in keys]:
+                for i, delta in enumerate(deltas):
+                    counts[i] += delta
+
+        ids = [
+            connection.execute(
+                "INSERT INTO predictions (id, timestamp, prediction_type, input_data, prediction_result, "
+                "outcome, success_probability, confidence, confidence_level) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            ).lastrowid
+            for row in rows
+        ]
+        connection.executemany(
+            f"INSERT INTO prediction_totals (prediction_type, {', '.join(TOTALS_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' * len(TOTALS_COLUMNS))}) ON CONFLICT (prediction_type) DO UPDATE SET "
+            + ", ".join(f"{column} = {column} + excluded.{column}" for column in TOTALS_COLUMNS),
+            [(prediction_type, *counts) for prediction_type, counts in totals.items()]
+        )
+        connection.executemany(
+            f"INSERT INTO prediction_rollups (resolution, bucket, prediction_type, {', '.join(TOTALS_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(TOTALS_COLUMNS))}) "
+            "ON CONFLICT (resolution, bucket, prediction_type) DO UPDATE SET "
+            + ", ".join(f"{column} = {column} + excluded.{column}" for column in TOTALS_COLUMNS),
+            [(*key, *counts) for key, counts in rollups.items()]
+        )
+        return ids
+
+    def count_predictions(self, prediction_type: Optional[str] = None) -> int:
+        """Read from the running totals, so constant time"""
+        connection = self._connect()
+        if prediction_type:
+            query, params = "SELECT total FROM prediction_totals WHERE prediction_type = ?", (prediction_type,)
+        else:
+            query, params = "SELECT TOTAL(total) FROM prediction_totals", ()
+        row = connection.execute(query, params).fetchone()
+        return int(row[0]) if row else 0
+
+    def recent_predictions(self, limit: int, prediction_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest first; a limit of 0 or less returns every row"""
+        connection = self._connect()
+        query = "SELECT id, timestamp, prediction_type, input_data, prediction_result FROM predictions"
+        params: List[Any] = []
+        if prediction_type:
+            query += " WHERE prediction_type = ?"
+            params.append(prediction_type)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit if limit > 0 else -1)
+        return [self._prediction_row(row) for row in connection.execute(query, params)]
+
+    def page_predictions(self, limit: int, prediction_type: Optional[str] = None, cursor: Optional[str] = None,
+                         order_by: str = "id", fields: Sequence[str] = DEFAULT_PREDICTION_FIELDS
+                         ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of predictions, newest first, and the cursor for the next page (None on the last one).
+
+        Keyset pagination: the cursor holds the last row's sort key ("<id>",
+        or "<timestamp>|<id>" when ordering by timestamp), so every page is
+        an index range scan however deep it is. Only the requested fields
+        are read and decoded.
+        """
+        if order_by not in PREDICTION_ORDERS:
+            raise ValueError(f"order_by must be one of: {', '.join(PREDICTION_ORDERS)}")
+        unknown = [field for field in fields if field not in PREDICTION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        columns = list(dict.fromkeys(["id", "timestamp", *fields]))
+        query = f"SELECT {', '.join(columns)} FROM predictions"
+        conditions: List[str] = []
+        params: List[Any] = []
+        if prediction_type:
+            conditions.append("prediction_type = ?")
+            params.append(prediction_type)
+        if cursor:
+            try:
+                if order_by == "id":
+                    conditions.append("id < ?")
+                    params.append(int(cursor))
+                else:
+                    timestamp, last_id = cursor.rsplit("|", 1)
+                    conditions.append("(timestamp, id) < (?, ?)")
+                    params.extend([timestamp, int(last_id)])
+            except ValueError:
+                raise ValueError(f"Invalid cursor {cursor!r}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC" if order_by == "id" else " ORDER BY timestamp DESC, id DESC"
+        query += " LIMIT ?"
+        params.append(limit + 1)  # one extra row tells whether there is a next page
+
+        rows = self._connect().execute(query, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = str(last["id"]) if order_by == "id" else f"{last['timestamp']}|{last['id']}"
+        entries = [
+            {field: json.loads(row[field]) if field in ("input_data", "prediction_result") else row[field] for field in fields}
+            for row in rows
+        ]
+        return entries, next_cursor
+
+    def prediction_summary(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Per prediction type: totals, outcomes, probability and confidence averages and confidence levels.
+
+        Without a range this reads the running totals; with an inclusive
+        start and/or end (ISO dates or timestamps) it sums the daily
+        rollups, or the hourly ones when a bound has a time of day.
+        """
+        connection = self._connect()
+        if start is None and end is None:
+            rows = connection.execute("SELECT * FROM prediction_totals").fetchall()
+        else:
+            start, end = (normalize_time_bound(bound) if bound else bound for bound in (start, end))
+            resolution = "hour" if any(bound and len(bound) > 10 for bound in (start, end)) else "day"
+            where, params = self._rollup_range(resolution, start, end)
+            rows = connection.execute(
+                f"SELECT prediction_type, {', '.join(f'SUM({column}) AS {column}' for column in TOTALS_COLUMNS)} "
+                f"FROM prediction_rollups WHERE {where} GROUP BY prediction_type",
+                params
+            ).fetchall()
+        summary = {}
+        for row in rows:
+            counts = {column: row[column] for column in TOTALS_COLUMNS}
+            total = counts["total"]
+            counts["avg_success_probability"] = counts.pop("success_probability_sum") / total if total else 0
+            counts["avg_confidence"] = counts.pop("confidence_sum") / total if total else 0
+            summary[row["prediction_type"]] = counts
+        return summary
+
+    def prediction_rollups(self, resolution: str = "day", start: Optional[str] = None, end: Optional[str] = None,
+                           prediction_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Hourly or daily buckets between inclusive ISO bounds, oldest first, summed over prediction types
+        unless one is given. Buckets without predictions are left out.
+        """
+        where, params = self._rollup_range(resolution, start, end)
+        if prediction_type:
+            where += " AND prediction_type = ?"
+            params.append(prediction_type)
+        rows = self._connect().execute(
+            "SELECT bucket, SUM(total), SUM(successful), SUM(unsuccessful), SUM(success_probability_sum) "
+            f"FROM prediction_rollups WHERE {where} GROUP BY bucket ORDER BY bucket",
+            params
+        )
+        return [
+            {
+                "bucket": bucket,
+                "total": total,
+                "successful": successful,
+                "unsuccessful": unsuccessful,
+                "avg_success_probability": probability_sum / total if total else 0
+            }
+            for bucket, total, successful, unsuccessful, probability_sum in rows
+        ]
+
+    def predictions_on_date(self, date: str) -> int:
+        """Predictions logged on an ISO date"""
+        row = self._connect().execute(
+            "SELECT TOTAL(total) FROM prediction_rollups WHERE resolution = 'day' AND bucket = ?", (date,)
+        ).fetchone()
+        return int(row[0])
+
+    def predictions_by_date(self, days: int) -> Dict[str, int]:
+        """Counts for the most recent `days` dates that have predictions, oldest first"""
+        rows = self._connect().execute(
+            "SELECT bucket, SUM(total) FROM prediction_rollups WHERE resolution = 'day' "
+            "GROUP BY bucket ORDER BY bucket DESC LIMIT ?", (days,)
+        ).fetchall()
+        return {date: total for date, total in reversed(rows)}
+
+    def clear_predictions(self) -> int:
+        """Delete every prediction and reset the aggregates; IDs keep counting. Returns the number deleted"""
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM prediction_totals")
+            connection.execute("DELETE FROM prediction_rollups")
+            return connection.execute("DELETE FROM predictions").rowcount
+
+    def rebuild_aggregates(self):
+        """Recompute the running aggregates from the stored predictions, e.g. after manual edits"""
+        connection = self._connect()
+        with self._lock:
+            self._rebuild_aggregates(connection)
+
+    @staticmethod
+    def _rollup_range(resolution: str, start: Optional[str], end: Optional[str]) -> Tuple[str, List[Any]]:
+        """WHERE clause selecting the rollup buckets between inclusive ISO bounds"""
+        if resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"Unknown resolution {resolution!r}, expected one of {', '.join(ROLLUP_RESOLUTIONS)}")
+        where, params = "resolution = ?", [resolution]
+        if start:
+            where += " AND bucket >= ?"
+            params.append(rollup_bucket(normalize_time_bound(start), resolution))
+        if end:
+            where += " AND bucket <= ?"
+            params.append(rollup_bucket(normalize_time_bound(end), resolution, end=True))
+        return where, params
+
+    @staticmethod
+    def _rebuild_aggregates(connection: sqlite3.Connection):
+        connection.executescript("BEGIN IMMEDIATE;" + REBUILD_AGGREGATES + "COMMIT;")
+
+    @staticmethod
+    def _prediction_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "prediction_type": row["prediction_type"],
+            "input_data": json.loads(row["input_data"]),
+            "prediction_result": json.loads(row["prediction_result"])
+        }
+
+    # ----- feedback -----
+
+    def insert_feedback(self, entry: Dict[str, Any]) -> int:
+        """Insert a feedback entry (without id) and return its new ID"""
+        connection = self._connect()
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO feedback (timestamp, name, email, prediction_type, message, status) VALUES (?, ?, ?, ?, ?, ?)",
+                (entry["timestamp"], entry["name"], entry["email"], entry["prediction_type"], entry["message"], entry["status"])
+            )
+        return cursor.lastrowid
+
+    def count_feedback(self, status: Optional[str] = None) -> int:
+        connection = self._connect()
+        if status:
+            return connection.execute("SELECT COUNT(*) FROM feedback WHERE status = ?", (status,)).fetchone()[0]
+        return connection.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+    def recent_feedback(self, limit: int, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest first; a limit of 0 or less returns every row"""
+        query = f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit if limit > 0 else -1)
+        return [dict(row) for row in self._connect().execute(query, params)]
+
+    def set_feedback_status(self, feedback_id: int, status: str) -> bool:
+        """Returns False when no message has this ID"""
+        connection = self._connect()
+        with connection:
+            return connection.execute("UPDATE feedback SET status = ? WHERE id = ?", (status, feedback_id)).rowcount > 0
+
+    # ----- one-time import of the JSON logs -----
+
+    def _import_legacy_logs(self, connection: sqlite3.Connection):
+        """Import each legacy log and record it in imported_logs in one transaction.
+
+        BEGIN IMMEDIATE takes the write lock before imported_logs is checked,
+        so a worker booting at the same time, or a retry after a crash, finds
+        the import already recorded and does nothing.
+        """
+        prediction_file = next((path for path in self.legacy_prediction_files if os.path.exists(path)), None)
+        feedback_file = self.legacy_feedback_file if self.legacy_feedback_file and os.path.exists(self.legacy_feedback_file) else None
+        if not prediction_file and not feedback_file:
+            return
+
+        imported_now = []
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            imported = {row["kind"] for row in connection.execute("SELECT kind FROM imported_logs")}
+
+            if "predictions" not in imported and prediction_file:
+                entries = _read_legacy_file(prediction_file)
+                for position, entry in enumerate(entries, start=1):
+                    entry.setdefault("id", position)
+                self._insert_predictions(connection, entries)
+                imported_now.append(self._mark_imported(connection, "predictions", prediction_file, len(entries)))
+
+            if "feedback" not in imported and feedback_file:
+                entries = _read_legacy_file(feedback_file)
+                connection.executemany(
+                    f"INSERT INTO feedback ({', '.join(FEEDBACK_COLUMNS)}) VALUES ({', '.join('?' * len(FEEDBACK_COLUMNS))})",
+                    [
+                        (entry.get("id", position), entry["timestamp"], entry.get("name"), entry.get("email"),
+                         entry["prediction_type"], entry["message"], entry.get("status", "unread"))
+                        for position, entry in enumerate(entries, start=1)
+                    ]
+                )
+                imported_now.append(self._mark_imported(connection, "feedback", feedback_file, len(entries)))
+
+        for message in imported_now:
+            print(message)
+
+    def _mark_imported(self, connection: sqlite3.Connection, kind: str, path: str, rows: int) -> str:
+        """Record an import inside the caller's transaction; returns the message to print once it commits"""
+        connection.execute("INSERT INTO imported_logs (kind, path, rows) VALUES (?, ?, ?)", (kind, path, rows))
+        return f"✓ Imported {rows} {kind} log entries from {path} into {self.path}"
+
+
+def _read_legacy_file(path: str) -> List[Dict[str, Any]]:
+    """Entries of a JSON array or JSON Lines log"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".jsonl"):
+        entries = []
+        for line in content.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # blank or partially written line
+        return entries
+    return json.loads(content) if content.strip() else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rebuild-aggregates"])
+    parser.add_argument("--db", default=STORE_DB_FILE)
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.db)
+    store.rebuild_aggregates()
+    print(f"✓ Rebuilt aggregates for {store.count_predictions()} predictions in {args.db}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+In-process tests for the batch prediction endpoints
+"""
+
+import os
+import unittest
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import main
+from test_helpers import IsolatedStoreTestCase
+
+
+class TestBatchPredictions(IsolatedStoreTestCase):
+    """Batch endpoints must agree with their single-row counterparts"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+        cls.new_business_sample = cls.client.get("/sample-new-business").json()["sample_data"]
+        cls.existing_business_sample = cls.client.get("/sample-existing-business").json()["sample_data"]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def new_business_batch(self):
+        return [
+            self.new_business_sample,
+            dict(self.new_business_sample, business_capital=2500000, owner_age=35, capital_source="Bank Loan",
+                 business_sector="Information And Communication", number_of_employees=5,
+                 business_location="GASABO", entity_type="PRIVATE CORPORATION", owner_gender="F",
+                 education_level_numeric=3),
+            dict(self.new_business_sample, capital_source="Unknown Source", business_location="ELSEWHERE"),
+        ]
+
+    def test_batch_predict_matches_single_predictions(self):
+        """Every row of /batch-predict matches /predict for the same input"""
+        if main.trained_model is None:
+            self.skipTest("New business model not available")
+
+        batch = self.new_business_batch()
+        response = self.client.post("/batch-predict", json=batch)
+        self.assertEqual(response.status_code, 200)
+        predictions = response.json()["predictions"]
+        self.assertEqual([p["business_id"] for p in predictions], [1, 2, 3])
+
+        for business, batch_result in zip(batch, predictions):
+            single_result = self.client.post("/predict", json=business).json()
+            self.assertEqual(batch_result["result"], single_result)
+
+    def test_batch_predict_logs_every_row(self):
+        """A batch is written to the prediction log in one go, one entry per row"""
+        if main.trained_model is None:
+            self.skipTest("New business model not available")
+
+        self.client.post("/batch-predict", json=self.new_business_batch())
+        response = self.client.get("/admin/predictions", params={"limit": 10})
+        self.assertEqual(response.json()["total"], 3)
+
+    def existing_business_batch(self):
+        """Rows from the bundled dataset plus edge cases that hit every clamp and fallback"""
+        data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sme_final_15k_enhanced.csv")
+        df = pd.read_csv(data_path).sample(n=150, random_state=42)
+        batch = [
+            {
+                "business_capital": float(row.business_capital),
+                "business_sector": row.business_sector,
+                "entity_type": row.entity_type,
+                "business_location": row.business_location,
+                "capital_source": row.capital_source,
+                "turnover_first_year": float(row.turnover_2021),
+                "turnover_second_year": float(row.turnover_2022),
+                "turnover_third_year": float(row.turnover_2023),
+                "turnover_fourth_year": float(row.turnover_2024),
+                "employment_first_year": int(row.employment_2021),
+                "employment_second_year": int(row.employment_2022),
+                "employment_third_year": int(row.employment_2023),
+                "employment_fourth_year": int(row.employment_2024),
+            }
+            for row in df.itertuples()
+        ]
+        batch += [
+            dict(self.existing_business_sample, turnover_first_year=0, turnover_third_year=0),
+            dict(self.existing_business_sample, turnover_first_year=0, employment_first_year=0),
+            dict(self.existing_business_sample, business_capital=5e12, turnover_fourth_year=5e13, employment_fourth_year=50000),
+            dict(self.existing_business_sample, turnover_fourth_year=1000, employment_fourth_year=40, business_sector="Unknown Sector"),
+        ]
+        return batch
+
+    def test_batch_existing_business_matches_single_predictions(self):
+        """Every row of /batch-predict-existing-business matches /predict-existing-business exactly"""
+        if main.xgb_model is None or main.feature_scaler is None:
+            self.skipTest("Existing business model not available")
+
+        batch = self.existing_business_batch()
+        response = self.client.post("/batch-predict-existing-business", json=batch)
+        self.assertEqual(response.status_code, 200)
+        predictions = response.json()["predictions"]
+        self.assertEqual(len(predictions), len(batch))
+
+        for i, (business, batch_row) in enumerate(zip(batch, predictions)):
+            self.assertEqual(batch_row["business_id"], i + 1)
+            single_result = self.client.post("/predict-existing-business", json=business).json()
+            batch_result = batch_row["result"]
+            single_result.pop("timestamp")
+            batch_result.pop("timestamp")
+            self.assertEqual(batch_result, single_result, f"Row {i + 1} differs")
+
+    def test_batch_existing_business_logs_sanitized_inputs(self):
+        """Batch log entries carry the same sanitized inputs as single-row logs"""
+        if main.xgb_model is None or main.feature_scaler is None:
+            self.skipTest("Existing business model not available")
+
+        business = dict(self.existing_business_sample, business_capital=5e12, employment_first_year=0)
+        self.client.post("/batch-predict-existing-business", json=[business])
+        self.client.post("/predict-existing-business", json=business)
+        logs = self.client.get("/admin/predictions", params={"limit": 2}).json()["predictions"]
+        self.assertEqual(logs[0]["input_data"], logs[1]["input_data"])
+        self.assertEqual(logs[0]["prediction_result"], logs[1]["prediction_result"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
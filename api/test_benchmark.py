@@ -0,0 +1,39 @@
+"""
+Tests for the benchmark summaries and baseline comparison
+"""
+
+import unittest
+
+import numpy as np
+
+from benchmark import compare_results, summarize, top_k_agreement
+
+
+class TestBenchmarkReport(unittest.TestCase):
+    """Percentiles and regression flags, without running the benchmarks"""
+
+    def test_summarize_percentiles_and_per_row_time(self):
+        stats = summarize([i / 1000 for i in range(1, 101)], rows_per_call=10)
+        self.assertEqual((stats["calls"], stats["min_ms"], stats["p99_ms"]), (100, 1.0, 99.0))
+        self.assertAlmostEqual(stats["p50_ms"], 51.0)
+        self.assertAlmostEqual(stats["per_row_ms"], 5.05)
+
+    def test_compare_flags_only_slowdowns_beyond_tolerance(self):
+        baseline = {"results": {"a": {"p50_ms": 10.0}, "b": {"p50_ms": 10.0}, "c": {"p50_ms": 10.0}}}
+        current = {"results": {"a": {"p50_ms": 12.0}, "b": {"p50_ms": 13.0}, "c": {"p50_ms": 5.0}, "d": {"p50_ms": 1.0}}}
+        comparison = {row["case"]: row for row in compare_results(current, baseline, tolerance=0.25)}
+
+        self.assertEqual([case for case, row in comparison.items() if row["regression"]], ["b"])
+        self.assertEqual(comparison["c"]["change"], -0.5)
+        self.assertIsNone(comparison["d"]["baseline"])
+
+    def test_top_k_agreement_compares_magnitudes(self):
+        exact = np.array([[5.0, -4.0, 3.0, 0.1], [1.0, 2.0, 3.0, 4.0]])
+        fast = np.array([[-5.0, 3.0, 4.0, 0.2], [4.0, 3.0, 2.0, 1.0]])
+        agreement = top_k_agreement(exact, fast, k=2)
+        self.assertEqual((agreement["same_set"], agreement["same_order"], agreement["top1"]), (0.0, 0.0, 0.5))
+        self.assertEqual(agreement["mean_overlap"], 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
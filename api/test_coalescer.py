@@ -0,0 +1,56 @@
+"""
+Tests for the micro-batching request coalescer
+"""
+
+import asyncio
+import unittest
+
+from coalescer import RequestCoalescer
+
+
+class TestRequestCoalescer(unittest.IsolatedAsyncioTestCase):
+    """Concurrent submissions are scored together and routed back to their callers"""
+
+    async def asyncSetUp(self):
+        self.batches = []
+
+        async def batch_fn(items):
+            self.batches.append(list(items))
+            return [item * 10 for item in items]
+
+        self.batch_fn = batch_fn
+
+    async def test_requests_within_window_share_one_batch(self):
+        coalescer = RequestCoalescer("test", self.batch_fn, window_ms=20, max_batch_size=64)
+        results = await asyncio.gather(*(coalescer.submit(i) for i in range(5)))
+
+        self.assertEqual(results, [0, 10, 20, 30, 40])
+        self.assertEqual(self.batches, [[0, 1, 2, 3, 4]])
+        stats = coalescer.stats()
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["mean_batch_size"], 5)
+        self.assertEqual(stats["batch_size_histogram"], {"5-8": 1})
+
+    async def test_full_batch_flushes_before_window(self):
+        coalescer = RequestCoalescer("test", self.batch_fn, window_ms=10000, max_batch_size=3)
+        results = await asyncio.wait_for(asyncio.gather(*(coalescer.submit(i) for i in range(3))), timeout=1)
+
+        self.assertEqual(results, [0, 10, 20])
+        self.assertEqual(len(self.batches), 1)
+
+    async def test_batch_failure_reaches_every_caller(self):
+        async def failing_batch_fn(items):
+            raise RuntimeError("model unavailable")
+
+        coalescer = RequestCoalescer("test", failing_batch_fn, window_ms=5, max_batch_size=8)
+        results = await asyncio.gather(*(coalescer.submit(i) for i in range(3)), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_zero_window_disables_coalescing(self):
+        self.assertFalse(RequestCoalescer("test", self.batch_fn, window_ms=0).enabled)
+        self.assertTrue(RequestCoalescer("test", self.batch_fn, window_ms=2).enabled)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+"""
+Tests for the admin event broadcaster and the server-sent events endpoint
+"""
+
+import asyncio
+import json
+import threading
+import unittest
+
+import main
+from event_broadcaster import EventBroadcaster, RESYNC_EVENT
+from test_helpers import IsolatedStoreMixin
+
+
+def parse_event(message: str):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines() if not line.startswith(":"))
+    return fields.get("event"), json.loads(fields.get("data", "null"))
+
+
+class TestEventBroadcaster(unittest.IsolatedAsyncioTestCase):
+    """Fan-out, cross-thread publishing and backpressure"""
+
+    async def test_every_subscriber_gets_each_event(self):
+        broadcaster = EventBroadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish("prediction", {"id": 1})
+
+        for subscription in (first, second):
+            self.assertEqual(parse_event(await subscription.next(1)), ("prediction", {"id": 1}))
+        self.assertEqual(broadcaster.stats()["subscribers"], 2)
+
+    async def test_publish_from_another_thread(self):
+        broadcaster = EventBroadcaster()
+        subscription = broadcaster.subscribe()
+        thread = threading.Thread(target=broadcaster.publish, args=("counters", {"total_predictions": 3}))
+        thread.start()
+        thread.join()
+        self.assertEqual(parse_event(await subscription.next(1)), ("counters", {"total_predictions": 3}))
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        broadcaster = EventBroadcaster(queue_size=3)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        for i in range(3):
+            broadcaster.publish("prediction", {"id": i})
+            await fast.next(1)
+        broadcaster.publish("prediction", {"id": 3})
+
+        self.assertEqual(await slow.next(1), RESYNC_EVENT)
+        self.assertEqual(slow.queue.qsize(), 0)
+        self.assertEqual(parse_event(await fast.next(1)), ("prediction", {"id": 3}))
+        self.assertEqual((broadcaster.dropped, broadcaster.resyncs), (4, 1))
+
+    async def test_idle_stream_gets_heartbeat_and_close_ends_it(self):
+        broadcaster = EventBroadcaster()
+        subscription = broadcaster.subscribe()
+        self.assertTrue((await subscription.next(0.01)).startswith(":"))
+        broadcaster.close()
+        self.assertIsNone(await subscription.next(1))
+        self.assertFalse(broadcaster.has_subscribers)
+
+
+class TestAdminEventStream(IsolatedStoreMixin, unittest.IsolatedAsyncioTestCase):
+    """The stream starts with counters and follows logged predictions and feedback"""
+
+    async def next_event(self, stream):
+        return parse_event(await asyncio.wait_for(stream.__anext__(), 1))
+
+    async def test_stream_pushes_incremental_events(self):
+        response = await main.stream_admin_events()
+        stream = response.body_iterator
+        self.assertEqual(response.media_type, "text/event-stream")
+        event, counters = await self.next_event(stream)
+        self.assertEqual((event, counters["total_predictions"]), ("counters", 0))
+
+        main.log_prediction("new_business", {"owner_age": 30}, {"prediction": 1, "success_probability": 0.8, "confidence_level": "High"})
+        event, prediction = await self.next_event(stream)
+        self.assertEqual(event, "prediction")
+        self.assertEqual((prediction["id"], prediction["outcome"], prediction["success_probability"]), (1, 1, 0.8))
+        self.assertNotIn("input_data", prediction)
+        event, counters = await self.next_event(stream)
+        self.assertEqual((counters["total_predictions"], counters["success_rate_new"]), (1, 100.0))
+
+        await main.submit_feedback(main.FeedbackData(prediction_type="new_business", message="great"))
+        event, feedback = await self.next_event(stream)
+        self.assertEqual((event, feedback["id"], feedback["message"]), ("feedback", 1, "great"))
+        event, counters = await self.next_event(stream)
+        self.assertEqual(counters["unread_messages"], 1)
+
+        await stream.aclose()
+        self.assertFalse(main.admin_events.has_subscribers)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,80 @@
+"""
+Tests for the background explanation job queue
+"""
+
+import asyncio
+import unittest
+
+from explanation_jobs import ExplanationJobQueue, JOB_DONE, JOB_FAILED, JOB_PENDING
+
+
+class TestExplanationJobQueue(unittest.IsolatedAsyncioTestCase):
+    """Jobs are batched per kind, bounded while waiting and dropped after their TTL"""
+
+    async def asyncSetUp(self):
+        self.calls = []
+        self.now = 0.0
+
+        async def explain_fn(kind, payloads):
+            self.calls.append((kind, list(payloads)))
+            return [(None, "bad row") if payload < 0 else ({"value": payload * 10}, None) for payload in payloads]
+
+        self.explain_fn = explain_fn
+
+    def make_queue(self, **kwargs) -> ExplanationJobQueue:
+        queue = ExplanationJobQueue(self.explain_fn, clock=lambda: self.now, **kwargs)
+        self.addAsyncCleanup(queue.close)
+        return queue
+
+    async def test_waiting_jobs_are_explained_together_per_kind(self):
+        queue = self.make_queue(batch_size=8)
+        jobs = [queue.submit("a", 1), queue.submit("b", 2), queue.submit("a", -1)]
+        finished = await queue.wait(jobs[2].id, timeout=1)
+
+        self.assertEqual(self.calls, [("a", [1, -1]), ("b", [2])])
+        self.assertEqual((finished.status, finished.error), (JOB_FAILED, "bad row"))
+        self.assertEqual(queue.get(jobs[0].id).to_dict()["result"], {"value": 10})
+        self.assertEqual(queue.get(jobs[1].id).status, JOB_DONE)
+
+    async def test_full_queue_rejects_instead_of_growing(self):
+        queue = self.make_queue(queue_size=2)
+        self.assertIsNotNone(queue.submit("a", 1))
+        self.assertIsNotNone(queue.submit("a", 2))
+        self.assertIsNone(queue.submit("a", 3))
+        self.assertEqual(queue.stats()["rejected"], 1)
+
+    async def test_long_poll_returns_pending_job_after_timeout(self):
+        release = asyncio.Event()
+
+        async def slow_explain_fn(kind, payloads):
+            await release.wait()
+            return [({"value": 1}, None)] * len(payloads)
+
+        queue = ExplanationJobQueue(slow_explain_fn)
+        self.addAsyncCleanup(queue.close)
+        job = queue.submit("a", 1)
+        self.assertNotEqual((await queue.wait(job.id, timeout=0.05)).status, JOB_DONE)
+
+        release.set()
+        self.assertEqual((await queue.wait(job.id, timeout=1)).status, JOB_DONE)
+
+    async def test_finished_jobs_expire(self):
+        queue = self.make_queue(ttl_seconds=60, max_results=2)
+        jobs = [queue.submit("a", i) for i in range(3)]
+        await queue.wait(jobs[2].id, timeout=1)
+        self.assertIsNone(queue.get(jobs[0].id))  # beyond max_results
+
+        self.now += 61
+        self.assertIsNone(queue.get(jobs[2].id))
+        self.assertEqual(queue.stats()["expired"], 3)
+
+    async def test_close_fails_jobs_still_queued(self):
+        queue = ExplanationJobQueue(self.explain_fn)
+        job = queue.submit("a", 1)
+        self.assertEqual(job.status, JOB_PENDING)
+        await queue.close()
+        self.assertEqual(job.status, JOB_FAILED)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+"""
+Tests for optional SHAP explanations and the lazy shap import
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+import main
+from test_helpers import IsolatedStoreTestCase
+
+
+class TestLazyShapImport(unittest.TestCase):
+    """shap stays unloaded until an explainer is built"""
+
+    def test_startup_without_explanations_does_not_import_shap(self):
+        code = "import sys, main; main.load_models(); print('shap' in sys.modules, main.shap_explainers.stats()['explainers_built'])"
+        with tempfile.TemporaryDirectory() as log_dir:
+            env = dict(os.environ, EXPLAIN_BY_DEFAULT="0", STORE_DB_FILE=os.path.join(log_dir, "test.db"))
+            output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=env, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "False []")
+
+
+class TestExplainFlag(IsolatedStoreTestCase):
+    """explain=false skips SHAP and says so; the score is unchanged"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+        cls.new_business_sample = cls.client.get("/sample-new-business").json()["sample_data"]
+        cls.existing_business_sample = cls.client.get("/sample-existing-business").json()["sample_data"]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_new_business_explain_flag(self):
+        if main.trained_model is None:
+            self.skipTest("New business model not available")
+
+        explained = self.client.post("/predict", params={"explain": "true"}, json=self.new_business_sample).json()
+        plain = self.client.post("/predict", params={"explain": "false"}, json=self.new_business_sample).json()
+        self.assertEqual(explained["recommendation_source"], "shap")
+        self.assertEqual((plain["recommendations"], plain["recommendation_source"]), (None, "none"))
+        self.assertEqual(plain["success_probability"], explained["success_probability"])
+
+        batch = self.client.post("/batch-predict", params={"explain": "false"}, json=[self.new_business_sample] * 2).json()
+        self.assertEqual({row["result"]["recommendation_source"] for row in batch["predictions"]}, {"none"})
+
+    def test_existing_business_explain_flag(self):
+        if main.xgb_model is None or main.feature_scaler is None:
+            self.skipTest("Existing business model not available")
+
+        plain = self.client.post("/predict-existing-business", params={"explain": "false"}, json=self.existing_business_sample).json()
+        self.assertEqual((plain["recommendations"], plain["recommendation_source"]), ([], "none"))
+        self.assertTrue(plain["risk_factors"] or plain["business_insights"])
+
+        batch = self.client.post("/batch-predict-existing-business", params={"explain": "false"},
+                                 json=[self.existing_business_sample]).json()
+        self.assertEqual(batch["predictions"][0]["result"]["recommendation_source"], "none")
+
+    def test_fast_method_uses_tree_paths(self):
+        if main.xgb_model is None or main.feature_scaler is None:
+            self.skipTest("Existing business model not available")
+
+        exact = self.client.post("/predict-existing-business", json=self.existing_business_sample).json()
+        fast = self.client.post("/predict-existing-business", params={"explain_method": "fast"}, json=self.existing_business_sample).json()
+        self.assertEqual((exact["recommendation_source"], fast["recommendation_source"]), ("shap", "tree_path"))
+        self.assertEqual(len(fast["recommendations"]), 5)
+        self.assertAlmostEqual(fast["success_probability"], exact["success_probability"], places=6)
+
+        batch = self.client.post("/batch-predict-existing-business", params={"explain_method": "fast"},
+                                 json=[self.existing_business_sample] * 2).json()
+        self.assertEqual([row["result"]["recommendations"] for row in batch["predictions"]], [fast["recommendations"]] * 2)
+        self.assertEqual(self.client.post("/predict", params={"explain_method": "exact"}, json=self.new_business_sample).status_code, 400)
+
+    def test_async_explanation_ticket(self):
+        if main.xgb_model is None or main.feature_scaler is None:
+            self.skipTest("Existing business model not available")
+
+        exact = self.client.post("/predict-existing-business", json=self.existing_business_sample).json()
+        ticket = self.client.post("/predict-existing-business", params={"explain_async": "true"}, json=self.existing_business_sample).json()
+        self.assertEqual((ticket["recommendations"], ticket["recommendation_source"]), ([], "pending"))
+        self.assertEqual(ticket["success_probability"], exact["success_probability"])
+
+        job = self.client.get(f"/explanations/{ticket['explanation_id']}", params={"wait": 10}).json()
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"], {"recommendations": exact["recommendations"], "recommendation_source": "shap"})
+        self.assertEqual(self.client.get("/explanations/unknown").status_code, 404)
+
+        fast = self.client.post("/predict", params={"explain_async": "true", "explain_method": "fast"}, json=self.new_business_sample).json()
+        self.assertEqual((fast["recommendation_source"], fast["explanation_id"]), ("tree_path", None))
+
+    def test_per_row_flags_in_one_batch(self):
+        """Coalesced requests with different flags share one model call"""
+        if main.trained_model is None:
+            self.skipTest("New business model not available")
+
+        outcomes = main.run_new_business_predictions([self.new_business_sample] * 3, [True, False, True])
+        self.assertEqual([response.recommendation_source for response, _ in outcomes], ["shap", "none", "shap"])
+        self.assertEqual(outcomes[0][0].recommendations, outcomes[2][0].recommendations)
+        self.assertIsNone(outcomes[1][0].recommendations)
+
+        outcomes = main.run_new_business_predictions([self.new_business_sample] * 3, [True, True, False], ["fast", "shap", "fast"])
+        self.assertEqual([response.recommendation_source for response, _ in outcomes], ["tree_path", "shap", "none"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,54 @@
+"""
+Tests for the pandas-free feature encoder
+"""
+
+import unittest
+
+import numpy as np
+
+from feature_encoder import BusinessFeatureEncoder
+
+FEATURES = ['business_capital', 'capital_source', 'owner_age', 'owner_gender']
+MAPPINGS = {
+    'capital_source': {'Personal Savings': 0, 'Bank Loan': 1},
+    'owner_gender': {'M': 0, 'F': 1}
+}
+
+
+class TestBusinessFeatureEncoder(unittest.TestCase):
+    """The encoder writes rows in feature order and keeps the unknown-category behavior"""
+
+    def setUp(self):
+        self.encoder = BusinessFeatureEncoder(FEATURES, MAPPINGS)
+        self.record = {'owner_gender': 'F', 'owner_age': 30, 'capital_source': 'Bank Loan', 'business_capital': 1200000.0}
+
+    def test_encode_row_follows_feature_order(self):
+        row = self.encoder.encode_row(self.record)
+        np.testing.assert_array_equal(row, [[1200000.0, 1, 30, 1]])
+
+    def test_unknown_category_encodes_to_minus_one(self):
+        row = self.encoder.encode_row(dict(self.record, capital_source='Lottery', owner_gender=None))
+        np.testing.assert_array_equal(row, [[1200000.0, -1, 30, -1]])
+
+    def test_encode_row_writes_into_given_buffer(self):
+        buffer = np.zeros((1, len(FEATURES)))
+        self.assertIs(self.encoder.encode_row(self.record, out=buffer), buffer)
+        np.testing.assert_array_equal(buffer, [[1200000.0, 1, 30, 1]])
+
+    def test_missing_feature_raises(self):
+        record = dict(self.record)
+        del record['owner_age']
+        with self.assertRaises(ValueError):
+            self.encoder.encode_row(record)
+
+    def test_encode_batch_skips_and_reports_bad_rows(self):
+        bad = {k: v for k, v in self.record.items() if k != 'business_capital'}
+        matrix, row_ids, errors = self.encoder.encode_batch([self.record, bad, dict(self.record, owner_gender='M')])
+
+        self.assertEqual(row_ids, [0, 2])
+        self.assertEqual(list(errors), [1])
+        np.testing.assert_array_equal(matrix, [[1200000.0, 1, 30, 1], [1200000.0, 1, 30, 0]])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
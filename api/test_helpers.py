@@ -0,0 +1,35 @@
+"""
+Shared fixtures for the API tests
+"""
+
+import os
+import tempfile
+import unittest
+
+import main
+from prediction_log import PredictionLogWriter
+from store import SQLiteStore
+
+
+class IsolatedStoreMixin:
+    """Points main.store and main.prediction_log at a fresh database in a temporary directory for each test,
+    keeping test predictions out of the real store, and restores the originals afterwards
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.original_store, self.original_log = main.store, main.prediction_log
+        main.store = SQLiteStore(os.path.join(self.log_dir.name, "test.db"), legacy_prediction_files=[], legacy_feedback_file=None)
+        main.prediction_log = PredictionLogWriter(main.store, on_flush=main.publish_logged_predictions)
+
+    def tearDown(self):
+        main.prediction_log.close()
+        main.store.close()
+        main.store, main.prediction_log = self.original_store, self.original_log
+        self.log_dir.cleanup()
+        super().tearDown()
+
+
+class IsolatedStoreTestCase(IsolatedStoreMixin, unittest.TestCase):
+    pass
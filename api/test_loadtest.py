@@ -0,0 +1,55 @@
+"""
+Tests for the load generator's request mix and step reports
+"""
+
+import os
+import unittest
+
+from loadtest import RequestMix, find_saturation, parse_mix, process_tree, process_usage, summarize
+
+
+def step(concurrency, throughput):
+    stats = {"throughput_rps": throughput}
+    return {"concurrency": concurrency, "overall": stats, "endpoints": {"predict": stats}}
+
+
+class TestLoadTestReport(unittest.TestCase):
+    """Mix parsing, request building, summaries and saturation detection"""
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("predict=3, admin=1,batch=0"), {"predict": 3.0, "admin": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("predict=1,upload=1")
+        with self.assertRaises(ValueError):
+            parse_mix("predict=0")
+
+    def test_requests_defeat_the_cache_unless_allowed(self):
+        payload = {"business_capital": 1000.0, "owner_age": 30}
+        mix = RequestMix("batch=1", [payload], [], batch_size=3)
+        operation, method, path, body = mix.next_request()
+        self.assertEqual((operation, method, path, len(body)), ("batch", "POST", "/batch-predict", 3))
+        self.assertTrue(all(item["business_capital"] > 1000.0 for item in body))
+
+        mix = RequestMix("predict=1", [payload], [], batch_size=3, allow_cache_hits=True)
+        self.assertEqual(mix.next_request()[3], payload)
+
+    def test_summarize_and_saturation(self):
+        stats = summarize([0.01] * 90 + [0.1] * 10, errors=5, seconds=10)
+        self.assertEqual((stats["requests"], stats["error_rate"], stats["throughput_rps"]), (105, 0.0476, 10.0))
+        self.assertEqual((stats["p50_ms"], stats["p99_ms"]), (10.0, 100.0))
+
+        steps = [step(1, 10), step(4, 35), step(16, 37), step(64, 30)]
+        self.assertEqual(find_saturation(steps), 4)
+        self.assertEqual(find_saturation(steps, "predict"), 4)
+        self.assertIsNone(find_saturation(steps[:2]))
+
+    @unittest.skipUnless(os.path.isdir("/proc"), "Needs /proc")
+    def test_process_usage_of_this_process(self):
+        self.assertIn(os.getpid(), process_tree(os.getpid()))
+        cpu_seconds, rss = process_usage([os.getpid()])
+        self.assertGreater(cpu_seconds, 0)
+        self.assertGreater(rss, 10 * 2 ** 20)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
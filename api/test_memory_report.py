@@ -0,0 +1,58 @@
+"""
+Tests for the preload-then-fork server and the memory report
+"""
+
+import asyncio
+import os
+import signal
+import tempfile
+import time
+import unittest
+
+import httpx
+
+from loadtest import free_port, start_server, stop_server, wait_until_healthy
+from memory_report import memory_usage, server_processes
+
+
+@unittest.skipUnless(os.path.isdir("/proc"), "Needs /proc")
+class TestPreforkServer(unittest.TestCase):
+    """Workers forked from a preloaded parent serve, share its pages and are replaced when they exit"""
+
+    def test_memory_usage_of_this_process(self):
+        usage = memory_usage(os.getpid())
+        self.assertGreater(usage["rss"], 10 * 2 ** 20)
+        self.assertLessEqual(usage["pss"], usage["rss"])
+        self.assertIsNone(memory_usage(2 ** 22 + 1))
+
+    def test_prefork_workers_share_preloaded_models(self):
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        process = start_server(2, port, {"STORE_DB_FILE": os.path.join(store_dir.name, "test.db")}, "prefork")
+        self.addCleanup(stop_server, process)
+        asyncio.run(wait_until_healthy(url, process))
+
+        sample = httpx.get(f"{url}/sample-new-business").json()["sample_data"]
+        self.assertEqual(httpx.post(f"{url}/predict", json=sample, timeout=30).status_code, 200)
+
+        processes = server_processes(process.pid)
+        workers = [row for row in processes if row["role"] == "worker"]
+        self.assertEqual(len(workers), 2)
+        for worker in workers:
+            self.assertGreater(worker["shared"], worker["private"])  # models come from the parent's pages
+
+        # A worker that dies is replaced
+        os.kill(workers[0]["pid"], signal.SIGKILL)
+        for _ in range(100):
+            pids = {row["pid"] for row in server_processes(process.pid) if row["role"] == "worker"}
+            if len(pids) == 2 and workers[0]["pid"] not in pids:
+                break
+            time.sleep(0.1)
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(workers[0]["pid"], pids)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
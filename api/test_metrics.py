@@ -0,0 +1,102 @@
+"""
+Tests for the stage timers, metrics registry and /metrics endpoint
+"""
+
+import unittest
+
+from fastapi.testclient import TestClient
+
+import main
+from metrics import MetricsRegistry, stage, timed_call
+from test_helpers import IsolatedStoreTestCase
+
+
+def staged_work(value):
+    with stage("first"):
+        pass
+    with stage("second"):
+        return value * 2
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Stage collection, histogram layout and the disabled switch"""
+
+    def test_timed_call_collects_stages_only_inside(self):
+        result, samples = timed_call(staged_work, 21)
+        self.assertEqual(result, 42)
+        self.assertEqual([name for name, _ in samples], ["first", "second"])
+        self.assertTrue(all(seconds >= 0 for _, seconds in samples))
+
+        # Outside timed_call the stages are shared no-ops
+        self.assertIs(stage("first"), stage("second"))
+
+    def test_histogram_exposition(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.describe("sme_stage_duration_seconds", "Stage time")
+        registry.record_stages("predict", "v1", [("scale", 0.0001), ("scale", 0.003), ("scale", 20.0)])
+        registry.inc("sme_http_requests_total", {"handler": "/predict", "method": "POST", "status": "200"})
+        text = registry.render()
+
+        labels = 'endpoint="predict",model_version="v1",stage="scale"'
+        self.assertIn("# TYPE sme_stage_duration_seconds histogram", text)
+        self.assertIn(f'sme_stage_duration_seconds_bucket{{{labels},le="0.0005"}} 1', text)
+        self.assertIn(f'sme_stage_duration_seconds_bucket{{{labels},le="0.005"}} 2', text)
+        self.assertIn(f'sme_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 3', text)
+        self.assertIn(f"sme_stage_duration_seconds_count{{{labels}}} 3", text)
+        self.assertIn('sme_http_requests_total{handler="/predict",method="POST",status="200"} 1', text)
+
+    def test_disabled_registry_records_nothing(self):
+        registry = MetricsRegistry(enabled=False)
+        registry.inc("sme_http_requests_total", {"handler": "/predict"})
+        with registry.timed("predict", "v1", "log_prediction"):
+            pass
+        registry.add_collector(lambda: [("sme_inference_pool_queue_depth", "gauge", "Queue depth", {}, 3)])
+        self.assertEqual(registry.render(), "# HELP sme_inference_pool_queue_depth Queue depth\n"
+                                            "# TYPE sme_inference_pool_queue_depth gauge\n"
+                                            "sme_inference_pool_queue_depth 3\n")
+
+
+class TestMetricsEndpoint(IsolatedStoreTestCase):
+    """Requests show up as stage histograms and request counters on /metrics"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def setUp(self):
+        super().setUp()
+        main.prediction_cache.invalidate()
+
+    def test_existing_business_stages_are_exposed(self):
+        if main.xgb_model is None or not main.metrics_registry.enabled:
+            self.skipTest("Existing business model not available or metrics disabled")
+
+        sample = self.client.get("/sample-existing-business").json()["sample_data"]
+        self.assertEqual(self.client.post("/predict-existing-business", json=sample).status_code, 200)
+        response = self.client.get("/metrics")
+
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        version = main.existing_model_version()
+        for stage_name in ("sanitize", "engineer_features", "encode_categorical", "scale", "predict",
+                           "explain", "risk_factors", "log_prediction"):
+            self.assertIn(f'endpoint="predict_existing_business",model_version="{version}",stage="{stage_name}"', response.text)
+        self.assertIn('sme_http_requests_total{handler="/predict-existing-business",method="POST",status="200"}', response.text)
+        self.assertIn("sme_inference_pool_queue_depth 0", response.text)
+        self.assertIn("sme_prediction_cache_hits_total", response.text)
+
+    def test_unknown_paths_share_one_label(self):
+        if not main.metrics_registry.enabled:
+            self.skipTest("Metrics disabled")
+        self.client.get("/no-such-page-1")
+        self.client.get("/no-such-page-2")
+        self.assertIn('sme_http_requests_total{handler="unmatched",method="GET",status="404"}', self.client.get("/metrics").text)
+        self.assertNotIn("no-such-page", self.client.get("/metrics").text)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
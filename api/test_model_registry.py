@@ -0,0 +1,161 @@
+"""
+Tests for the versioned model registry and hot model swaps
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import StandardScaler
+
+import main
+from model_registry import ModelRegistry, scan_models
+from test_helpers import IsolatedStoreTestCase
+
+
+def write_version(models_dir: str, kind: str, version: str, scaler: bool = True):
+    """Stand-in artifacts: each file holds a dict naming its version"""
+    if kind == "new_business":
+        joblib.dump({"model": version}, os.path.join(models_dir, f"sme_success_predictor_random_forest_{version}.joblib"))
+        return
+    joblib.dump({"model": version}, os.path.join(models_dir, f"existing_business_predictor_{version}.joblib"))
+    joblib.dump({"encoders": version}, os.path.join(models_dir, f"label_encoders_{version}.joblib"))
+    if scaler:
+        joblib.dump({"scaler": version}, os.path.join(models_dir, f"feature_scaler_{version}.joblib"))
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Versions are found by file name, swapped in whole and rolled back"""
+
+    def setUp(self):
+        self.models_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.models_dir.cleanup)
+        self.activated, self.retired = [], []
+        self.registry = ModelRegistry(self.models_dir.name, history_size=1,
+                                      on_activate=lambda models: self.activated.append(models.version),
+                                      on_retire=lambda models: self.retired.append(models.version))
+
+    def test_scan_keeps_complete_artifact_sets(self):
+        write_version(self.models_dir.name, "new_business", "20250101_000000")
+        write_version(self.models_dir.name, "existing_business", "20250101_000000")
+        write_version(self.models_dir.name, "existing_business", "20250201_000000", scaler=False)
+        with open(os.path.join(self.models_dir.name, "model_metadata_20250101_000000.json"), "w") as f:
+            json.dump({"model_type": "test"}, f)
+
+        found = scan_models(self.models_dir.name)
+        self.assertEqual(list(found["new_business"]), ["20250101_000000"])
+        self.assertEqual(list(found["existing_business"]), ["20250101_000000"])
+        self.assertIn("metadata", found["existing_business"]["20250101_000000"])
+
+    def test_estimators_fitted_on_dataframes_score_arrays_without_warning(self):
+        write_version(self.models_dir.name, "existing_business", "20250101_000000")
+        scaler = StandardScaler().fit(pd.DataFrame({"capital": [1.0, 2.0, 3.0], "employees": [4.0, 5.0, 6.0]}))
+        joblib.dump(scaler, os.path.join(self.models_dir.name, "feature_scaler_20250101_000000.joblib"))
+
+        models = self.registry.load("existing_business", "20250101_000000")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            scaled = models.scaler.transform(np.array([[2.0, 5.0]]))
+        self.assertEqual(scaled.tolist(), [[0.0, 0.0]])
+        with self.assertRaises(ValueError):
+            models.scaler.transform(np.zeros((1, 3)))  # the column count is still checked
+
+    def test_swap_keeps_previous_versions_for_in_flight_requests_and_rollback(self):
+        for version in ("20250101_000000", "20250201_000000", "20250301_000000"):
+            write_version(self.models_dir.name, "existing_business", version)
+            self.registry.load("existing_business", version)
+
+        active = self.registry.active("existing_business")
+        self.assertEqual((active.version, active.model, active.scaler), ("20250301_000000", {"model": "20250301_000000"}, {"scaler": "20250301_000000"}))
+        self.assertEqual(self.registry.get("existing_business", "20250201_000000").version, "20250201_000000")
+        self.assertEqual(self.retired, ["20250101_000000"])  # beyond history_size
+        self.assertEqual(self.registry.get("existing_business", "20250101_000000").version, "20250301_000000")
+
+        self.assertEqual(self.registry.rollback("existing_business").version, "20250201_000000")
+        self.assertEqual(self.retired, ["20250101_000000", "20250301_000000"])
+        with self.assertRaises(ValueError):
+            self.registry.rollback("existing_business")
+        self.assertEqual(self.activated, ["20250101_000000", "20250201_000000", "20250301_000000", "20250201_000000"])
+
+    def test_failed_background_load_keeps_current_version(self):
+        write_version(self.models_dir.name, "new_business", "20250101_000000")
+        self.registry.load("new_business")
+        write_version(self.models_dir.name, "new_business", "20250201_000000")
+
+        def prepare(models):
+            raise ValueError("warmup failed")
+
+        self.registry.prepare = prepare
+        self.assertEqual(self.registry.check_for_updates(), ["new_business"])
+        for _ in range(100):
+            load = self.registry.stats()["new_business"]["load"]
+            if load["status"] != "loading":
+                break
+            time.sleep(0.01)
+
+        self.assertEqual((load["status"], load["error"]), ("failed", "warmup failed"))
+        self.assertEqual(self.registry.active("new_business").version, "20250101_000000")
+        self.assertEqual(self.registry.check_for_updates(), [])  # not retried automatically
+        with self.assertRaises(ValueError):
+            self.registry.load_in_background("new_business", "20990101_000000")
+
+
+class TestModelSwapEndpoints(IsolatedStoreTestCase):
+    """A new existing business version is loaded in the background, served, and rolled back"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_load_swap_and_rollback(self):
+        current = main.model_registry.active("existing_business")
+        if current is None:
+            self.skipTest("Existing business model not available")
+        self.assertEqual(self.client.post("/admin/models/unknown/rollback").status_code, 404)
+        self.assertEqual(self.client.post("/admin/models/existing_business/load", params={"version": "20990101_000000"}).status_code, 404)
+
+        # Publish the same artifacts as a newer version
+        models_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(models_dir.cleanup)
+        for artifact, path in current.files.items():
+            os.symlink(os.path.abspath(path), os.path.join(models_dir.name, os.path.basename(path).replace(current.version, "20991231_000000")))
+        original_dir, main.model_registry.models_dir = main.model_registry.models_dir, models_dir.name
+        self.addCleanup(setattr, main.model_registry, "models_dir", original_dir)
+
+        response = self.client.post("/admin/models/existing_business/load")
+        self.assertEqual((response.status_code, response.json()["version"]), (202, "20991231_000000"))
+        for _ in range(500):
+            load = self.client.get("/admin/models").json()["existing_business"]["load"]
+            if load["status"] != "loading":
+                break
+            time.sleep(0.02)
+        self.assertEqual(load["status"], "active")
+
+        sample = self.client.get("/sample-existing-business").json()["sample_data"]
+        self.assertEqual(self.client.get("/health").json()["model_versions"]["existing_business"], "20991231_000000")
+        self.assertEqual(self.client.post("/predict-existing-business", json=sample).json()["model_version"], "20991231_000000")
+
+        # A request that started on the old version finishes on it
+        outcome = main.run_existing_business_predictions([main.ExistingBusinessData(**sample)], model_version=current.version)[0]
+        self.assertEqual(outcome[0].model_version, current.version)
+
+        response = self.client.post("/admin/models/existing_business/rollback")
+        self.assertEqual(response.json()["active"]["version"], current.version)
+        self.assertIs(main.model_registry.active("existing_business"), current)
+        self.assertIs(main.xgb_model, current.model)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
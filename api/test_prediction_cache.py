@@ -0,0 +1,117 @@
+"""
+Tests for the LRU prediction response cache
+"""
+
+import unittest
+
+from fastapi.testclient import TestClient
+
+import main
+from prediction_cache import PredictionCache
+from test_helpers import IsolatedStoreTestCase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPredictionCache(unittest.TestCase):
+    """Size, TTL and invalidation limits with hit/miss accounting"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = PredictionCache(max_size=2, ttl_seconds=60, clock=self.clock)
+
+    def test_key_ignores_field_order_but_not_values_or_version(self):
+        key = PredictionCache.key("new_business", {"a": 1, "b": "x"}, "v1")
+        self.assertEqual(key, PredictionCache.key("new_business", {"b": "x", "a": 1}, "v1"))
+        self.assertNotEqual(key, PredictionCache.key("new_business", {"a": 2, "b": "x"}, "v1"))
+        self.assertNotEqual(key, PredictionCache.key("new_business", {"a": 1, "b": "x"}, "v2"))
+        self.assertNotEqual(key, PredictionCache.key("existing_business", {"a": 1, "b": "x"}, "v1"))
+        self.assertNotEqual(key, PredictionCache.key("new_business", {"a": 1, "b": "x"}, "v1", {"explain": False}))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (3, 1, 1))
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.put("a", 1)
+        self.clock.now = 59
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["expired"], 1)
+
+    def test_invalidate_empties_cache(self):
+        self.cache.put("a", 1)
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_zero_size_disables_cache(self):
+        cache = PredictionCache(max_size=0)
+        cache.put("a", 1)
+        self.assertFalse(cache.enabled)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["misses"], 0)
+
+
+class TestCachedEndpoints(IsolatedStoreTestCase):
+    """Repeated submissions are served from the cache and still logged"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+        cls.existing_business_sample = cls.client.get("/sample-existing-business").json()["sample_data"]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def setUp(self):
+        super().setUp()
+        main.prediction_cache.invalidate()
+
+    def test_repeated_existing_business_submission_hits_cache(self):
+        if main.xgb_model is None:
+            self.skipTest("Existing business model not available")
+
+        hits = main.prediction_cache.hits
+        first = self.client.post("/predict-existing-business", json=self.existing_business_sample).json()
+        reordered = dict(reversed(list(self.existing_business_sample.items())))
+        second = self.client.post("/predict-existing-business", json=reordered).json()
+
+        self.assertEqual(main.prediction_cache.hits, hits + 1)
+        first.pop("timestamp")
+        second.pop("timestamp")
+        self.assertEqual(first, second)
+
+        response = self.client.get("/admin/predictions", params={"limit": 10})
+        self.assertEqual(response.json()["total"], 2)
+
+    def test_model_reload_invalidates_cache(self):
+        if main.xgb_model is None:
+            self.skipTest("Existing business model not available")
+
+        self.client.post("/predict-existing-business", json=self.existing_business_sample)
+        main.load_models()
+        hits = main.prediction_cache.hits
+        self.client.post("/predict-existing-business", json=self.existing_business_sample)
+        self.assertEqual(main.prediction_cache.hits, hits)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
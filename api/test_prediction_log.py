@@ -0,0 +1,159 @@
+"""
+Tests for the buffered prediction log writer
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from prediction_log import PredictionLogWriter
+from store import SQLiteStore
+
+
+class TestPredictionLogWriter(unittest.TestCase):
+    """Buffered appends, store-assigned IDs, retries and flushing on close"""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.log_dir.name, "test.db")
+        self.store = self.open_store()
+
+    def tearDown(self):
+        self.store.close()
+        self.log_dir.cleanup()
+
+    def open_store(self):
+        return SQLiteStore(self.path, legacy_prediction_files=[], legacy_feedback_file=None)
+
+    def test_background_flusher_batches_appends(self):
+        writer = PredictionLogWriter(self.store, flush_interval=0.05)
+        writer.start()
+        try:
+            writer.append([("new_business", {"a": 1}, {"prediction": 1})])
+            writer.append([("existing_business", {"b": 2}, {"prediction": "Success"})] * 2)
+            time.sleep(0.3)
+            entries = self.store.recent_predictions(limit=10)[::-1]
+        finally:
+            writer.close()
+
+        self.assertEqual([entry["id"] for entry in entries], [1, 2, 3])
+        self.assertEqual(entries[0]["prediction_type"], "new_business")
+        self.assertEqual(entries[0]["input_data"], {"a": 1})
+        self.assertEqual(entries[1]["timestamp"], entries[2]["timestamp"])
+
+    def test_close_writes_everything_buffered(self):
+        writer = PredictionLogWriter(self.store, flush_interval=3600)
+        writer.start()
+        writer.append([("new_business", {}, {})] * 5)
+        self.assertEqual(self.store.count_predictions(), 0)
+        writer.close()
+        self.assertEqual(self.store.count_predictions(), 5)
+
+    def test_ids_continue_after_restart_and_clear(self):
+        writer = PredictionLogWriter(self.store, flush_interval=3600)
+        writer.start()
+        writer.append([("new_business", {}, {})] * 3)
+        self.assertEqual(writer.flush(), [1, 2, 3])
+        self.assertEqual(writer.clear(), 3)
+        writer.append([("new_business", {}, {})])
+        self.assertEqual(writer.flush(), [4])
+        writer.close()
+        self.store.close()
+
+        self.store = self.open_store()
+        reopened = PredictionLogWriter(self.store, flush_interval=3600)
+        reopened.start()
+        reopened.append([("new_business", {}, {})])
+        self.assertEqual(reopened.flush(), [5])
+        self.assertEqual([entry["id"] for entry in self.store.recent_predictions(limit=10)], [5, 4])
+        reopened.close()
+
+    def test_concurrent_appends_get_unique_ids(self):
+        writer = PredictionLogWriter(self.store, flush_interval=0.01)
+        writer.start()
+        threads = [
+            threading.Thread(target=lambda: [writer.append([("new_business", {}, {})]) for _ in range(50)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        ids = [entry["id"] for entry in self.store.recent_predictions(limit=0)]
+        self.assertEqual(sorted(ids), list(range(1, 401)))
+
+    def test_writers_in_separate_processes_share_one_database(self):
+        # Each worker process has its own store connection and writer
+        other_store = self.open_store()
+        self.addCleanup(other_store.close)
+        published = []
+        writers = [PredictionLogWriter(store, flush_interval=3600, on_flush=published.extend) for store in (self.store, other_store)]
+        for writer in writers:
+            writer.start()
+            writer.append([("new_business", {}, {})])
+        for writer in writers:
+            writer.append([("existing_business", {}, {})])
+            writer.close()
+
+        self.assertEqual(self.store.count_predictions(), 4)
+        self.assertEqual(sorted(entry["id"] for entry in published), [1, 2, 3, 4])
+        self.assertEqual(sum(writer.write_errors for writer in writers), 0)
+
+    def test_failed_batches_are_retried(self):
+        writer = PredictionLogWriter(self.store, flush_interval=3600)
+        writer.start()
+        writer.append([("new_business", {"n": 1}, {})])
+        insert = self.store.insert_predictions
+
+        def locked(entries):
+            raise sqlite3.OperationalError("database is locked")
+
+        self.store.insert_predictions = locked
+        self.assertEqual(writer.flush(), [])
+        writer.append([("new_business", {"n": 2}, {})])
+        self.store.insert_predictions = insert
+        self.assertEqual(writer.flush(), [1, 2])
+        writer.close()
+
+        entries = self.store.recent_predictions(limit=10)[::-1]
+        self.assertEqual([entry["input_data"]["n"] for entry in entries], [1, 2])
+        self.assertEqual((writer.stats()["retries"], writer.stats()["dropped"]), (1, 0))
+
+    def test_close_retries_then_counts_unwritten_entries_as_dropped(self):
+        insert = self.store.insert_predictions
+        attempts = []
+
+        def locked_twice(entries):
+            attempts.append(len(entries))
+            if len(attempts) <= 2:
+                raise sqlite3.OperationalError("database is locked")
+            return insert(entries)
+
+        self.store.insert_predictions = locked_twice
+        writer = PredictionLogWriter(self.store, flush_interval=3600, close_retries=3, close_backoff=0.01)
+        writer.start()
+        writer.append([("new_business", {}, {})])
+        writer.close()
+        self.assertEqual((attempts, self.store.count_predictions()), ([1, 1, 1], 1))
+        self.assertEqual(writer.stats()["dropped"], 0)
+
+        def locked(entries):
+            raise sqlite3.OperationalError("database is locked")
+
+        self.store.insert_predictions = locked
+        writer = PredictionLogWriter(self.store, flush_interval=3600, close_retries=3, close_backoff=0.01)
+        writer.start()
+        writer.append([("new_business", {}, {})] * 2)
+        writer.close()
+        stats = writer.stats()
+        # The flusher's last pass on stopping, then close()'s three attempts
+        self.assertEqual((stats["buffered"], stats["dropped"], stats["write_errors"]), (0, 2, 4))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+"""
+Tests for the startup warmup and the /ready gate
+"""
+
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+import main
+from readiness import ReadinessGate, STATUS_FAILED, STATUS_PENDING, STATUS_READY
+from test_helpers import IsolatedStoreTestCase
+
+
+class TestReadinessGate(unittest.IsolatedAsyncioTestCase):
+    """The gate opens at the first round within budget after the minimum, and stays shut otherwise"""
+
+    async def asyncSetUp(self):
+        self.now = 0.0
+        self.calls = 0
+
+    def check(self, latencies_ms):
+        """A check whose nth call takes latencies_ms[n] (the last value repeats) on the fake clock"""
+        async def run():
+            self.now += latencies_ms[min(self.calls, len(latencies_ms) - 1)] / 1000
+            self.calls += 1
+        return run
+
+    async def test_opens_once_warm_requests_meet_the_budget(self):
+        gate = ReadinessGate(min_rounds=2, max_rounds=10, budget_ms=50, clock=lambda: self.now)
+        self.assertEqual(gate.status, STATUS_PENDING)
+        self.assertTrue(await gate.run({"predict": self.check([900, 80, 40])}))
+
+        stats = gate.stats()
+        self.assertEqual((stats["status"], stats["rounds"]), (STATUS_READY, 3))
+        self.assertEqual((stats["first_ms"]["predict"], stats["latest_ms"]["predict"]), (900.0, 40.0))
+        self.assertAlmostEqual(stats["warmup_seconds"], 1.02)
+
+    async def test_minimum_rounds_run_even_when_fast(self):
+        gate = ReadinessGate(min_rounds=3, max_rounds=10, budget_ms=50, clock=lambda: self.now)
+        await gate.run({"predict": self.check([1])})
+        self.assertEqual(gate.rounds, 3)
+
+    async def test_slow_or_failing_checks_keep_the_gate_shut(self):
+        gate = ReadinessGate(min_rounds=1, max_rounds=4, budget_ms=50, clock=lambda: self.now)
+        self.assertFalse(await gate.run({"predict": self.check([100])}))
+        self.assertEqual((gate.status, gate.rounds), (STATUS_FAILED, 4))
+
+        async def broken():
+            raise RuntimeError("model not loaded")
+
+        self.assertFalse(await gate.run({"predict": self.check([1]), "explain": broken}))
+        self.assertEqual(gate.stats()["errors"], {"explain": "model not loaded"})
+
+
+class TestReadyEndpoint(IsolatedStoreTestCase):
+    """/ready turns 200 once the sample payloads have gone through every loaded model"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_ready_after_warmup(self):
+        if main.trained_model is None or main.xgb_model is None:
+            self.skipTest("Models not available")
+        for _ in range(300):
+            response = self.client.get("/ready")
+            if response.json()["warmup"]["status"] not in ("pending", "warming"):
+                break
+            time.sleep(0.1)
+
+        body = response.json()
+        self.assertEqual((response.status_code, body["ready"]), (200, True))
+        self.assertEqual(set(body["warmup"]["latest_ms"]), set(main.warmup_checks()))
+        self.assertIn("existing_business:batch", body["warmup"]["latest_ms"])
+        self.assertEqual(main.store.count_predictions(), 0)  # warmup requests are not logged
+        self.assertTrue(self.client.get("/health").json()["ready"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,49 @@
+"""
+Tests for the shared single-pass scoring routine
+"""
+
+import unittest
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+from scoring import classify, score
+
+
+class TestScoring(unittest.TestCase):
+    """One predict_proba pass reproduces predict() and supports other thresholds"""
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.randn(300, 5)
+        self.y = (self.X[:, 0] - self.X[:, 1] > 0).astype(int)
+
+    def test_default_threshold_matches_predict(self):
+        for model in (RandomForestClassifier(n_estimators=10, random_state=0), XGBClassifier(n_estimators=10)):
+            model.fit(self.X, self.y)
+            probabilities, labels, confidence = score(model, self.X)
+
+            np.testing.assert_array_equal(probabilities, model.predict_proba(self.X))
+            np.testing.assert_array_equal(labels, model.predict(self.X))
+            np.testing.assert_array_equal(confidence, probabilities.max(axis=1))
+
+    def test_threshold_moves_labels_and_confidence(self):
+        probabilities = np.array([[0.7, 0.3], [0.45, 0.55], [0.1, 0.9]])
+
+        labels, confidence = classify(probabilities, [0, 1], threshold=0.6)
+        np.testing.assert_array_equal(labels, [0, 0, 1])
+        np.testing.assert_array_equal(confidence, [0.7, 0.45, 0.9])
+
+        labels, confidence = classify(probabilities, [0, 1], threshold=0.25)
+        np.testing.assert_array_equal(labels, [1, 1, 1])
+        np.testing.assert_array_equal(confidence, [0.3, 0.55, 0.9])
+
+    def test_tie_goes_to_negative_class(self):
+        labels, confidence = classify(np.array([[0.5, 0.5]]), [0, 1])
+        np.testing.assert_array_equal(labels, [0])
+        np.testing.assert_array_equal(confidence, [0.5])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
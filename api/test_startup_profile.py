@@ -0,0 +1,73 @@
+"""
+Tests for the startup profile and /debug/startup
+"""
+
+import os
+import sys
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+import main
+from startup_profile import StartupProfile
+from test_helpers import IsolatedStoreTestCase
+
+
+class TestStartupProfile(unittest.TestCase):
+    """Phases nest, own_seconds leaves out the inner phases, and the boot ends once"""
+
+    def test_nested_phases(self):
+        profile = StartupProfile()
+        sys.modules.pop("colorsys", None)
+        with profile.phase("load", "model", "v1"):
+            time.sleep(0.02)
+            with profile.phase("import", "colorsys"):
+                import colorsys  # noqa: F401
+                time.sleep(0.03)
+
+        inner, outer = profile.phases
+        self.assertEqual((outer["kind"], outer["name"], outer["detail"]), ("load", "model", "v1"))
+        self.assertIn("colorsys", inner["new_modules"])
+        self.assertIn("colorsys", outer["new_modules"])
+        self.assertGreaterEqual(outer["seconds"], inner["seconds"] + 0.02)
+        self.assertAlmostEqual(outer["own_seconds"], outer["seconds"] - inner["seconds"], delta=0.001)
+        self.assertEqual(profile.totals(), {"load.model": outer["seconds"], "import.colorsys": inner["seconds"]})
+
+    def test_phases_after_boot_are_flagged(self):
+        profile = StartupProfile()
+        with profile.phase("import", "fastapi"):
+            pass
+        self.assertTrue(profile.mark_booted())
+        self.assertFalse(profile.mark_booted())
+        with profile.phase("import", "shap"):
+            pass
+
+        report = profile.report()
+        self.assertEqual([phase["after_boot"] for phase in report["phases"]], [False, True])
+        self.assertEqual(set(profile.totals()), {"import.fastapi"})
+        self.assertEqual(set(report["seconds_by_kind"]), {"import"})
+        self.assertIsNotNone(report["boot_seconds"])
+
+
+class TestStartupEndpoint(IsolatedStoreTestCase):
+    """/debug/startup breaks down the imports and artifact loads of this process's boot"""
+
+    def test_startup_report(self):
+        with TestClient(main.app) as client:
+            report = client.get("/debug/startup").json()
+
+        self.assertEqual(report["pid"], os.getpid())
+        self.assertIsNotNone(report["boot_seconds"])
+        names = {(phase["kind"], phase["name"]) for phase in report["phases"]}
+        for name in ("fastapi", "numpy", "joblib", "api modules"):
+            self.assertIn(("import", name), names)
+        if main.trained_model is not None:
+            self.assertIn(("load", "new_business model"), names)
+        if main.xgb_model is not None:
+            self.assertIn(("load", "existing_business model"), names)
+            self.assertIn(("parse", "existing_business metadata"), names)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
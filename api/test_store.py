@@ -0,0 +1,366 @@
+"""
+Tests for the SQLite prediction and feedback store and the admin endpoints on top of it
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+import main
+from store import SQLiteStore, normalize_time_bound
+from test_helpers import IsolatedStoreTestCase
+
+NEW_SUCCESS = {"prediction": 1, "prediction_label": "Successful", "success_probability": 0.8, "confidence_level": "High"}
+NEW_FAILURE = {"prediction": 0, "prediction_label": "Unsuccessful", "success_probability": 0.3, "confidence_level": "Medium"}
+EXISTING_SUCCESS = {"prediction": "Success", "success_probability": 0.9, "confidence": 0.9, "business_insights": {}}
+
+
+class TestLegacyImport(unittest.TestCase):
+    """The JSON logs are imported once, keeping their IDs"""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.predictions_file = os.path.join(self.log_dir.name, "predictions_log.json")
+        self.feedback_file = os.path.join(self.log_dir.name, "feedback_log.json")
+        with open(self.predictions_file, "w") as f:
+            json.dump([
+                {"id": 1, "timestamp": "2025-11-28T18:11:34", "prediction_type": "new_business", "input_data": {"a": 1}, "prediction_result": NEW_SUCCESS},
+                {"id": 2, "timestamp": "2025-11-29T09:00:00", "prediction_type": "existing_business", "input_data": {}, "prediction_result": EXISTING_SUCCESS}
+            ], f)
+        with open(self.feedback_file, "w") as f:
+            json.dump([{"id": 1, "timestamp": "2025-11-28T21:43:13", "name": None, "email": None,
+                        "prediction_type": "new_business", "message": "its good", "status": "read"}], f)
+
+    def tearDown(self):
+        self.log_dir.cleanup()
+
+    def open_store(self):
+        return SQLiteStore(os.path.join(self.log_dir.name, "test.db"), [self.predictions_file], self.feedback_file)
+
+    def test_legacy_logs_are_imported_once(self):
+        store = self.open_store()
+        self.assertEqual([entry["id"] for entry in store.recent_predictions(limit=10)], [2, 1])
+        self.assertEqual(store.recent_predictions(limit=10)[1]["prediction_result"], NEW_SUCCESS)
+        self.assertEqual(store.recent_feedback(limit=10)[0]["status"], "read")
+        store.clear_predictions()
+        store.close()
+
+        # Clearing does not bring the legacy entries back on the next start
+        store = self.open_store()
+        self.assertEqual(store.count_predictions(), 0)
+        self.assertEqual(store.count_feedback(), 1)
+        self.assertEqual(store.last_prediction_id(), 2)
+        store.close()
+
+    def test_interrupted_import_is_rolled_back_and_redone(self):
+        store = self.open_store()
+
+        def crash(*args):
+            raise RuntimeError("killed before the import was recorded")
+
+        store._mark_imported = crash
+        with self.assertRaises(RuntimeError):
+            store.count_predictions()
+        store.close()
+
+        store = self.open_store()
+        self.assertEqual(store.count_predictions(), 2)
+        self.assertEqual(store.count_feedback(), 1)
+        store.close()
+
+    def test_concurrent_first_use_imports_once(self):
+        stores = [self.open_store() for _ in range(4)]
+        threads = [threading.Thread(target=store.count_predictions) for store in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([store.count_predictions() for store in stores], [2] * 4)
+        self.assertEqual(stores[0].count_feedback(), 1)
+        for store in stores:
+            store.close()
+
+    def test_failed_initialization_is_retried(self):
+        store = self.open_store()
+        import_legacy_logs = store._import_legacy_logs
+
+        def fail_once(connection):
+            store._import_legacy_logs = import_legacy_logs
+            raise sqlite3.OperationalError("disk I/O error")
+
+        store._import_legacy_logs = fail_once
+        with self.assertRaises(sqlite3.OperationalError):
+            store.count_predictions()
+        # The same thread does not get a half-initialized connection back
+        self.assertEqual(store.count_predictions(), 2)
+        self.assertEqual(len(store._connections), 1)
+        store.close()
+
+
+class TestRunningAggregates(unittest.TestCase):
+    """Running totals match a full recomputation and survive restarts"""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.log_dir.name, "test.db")
+        self.store = SQLiteStore(self.path, legacy_prediction_files=[], legacy_feedback_file=None)
+        results = [NEW_SUCCESS, NEW_FAILURE, EXISTING_SUCCESS, {"prediction": "Failure", "success_probability": 0.2, "confidence": 0.8}]
+        entries = []
+        for i in range(40):
+            result = results[i % len(results)]
+            entries.append({
+                "id": i + 1,
+                "timestamp": f"2025-11-{20 + i % 5:02d}T{10 + i % 2}:00:00",
+                "prediction_type": "existing_business" if isinstance(result["prediction"], str) else "new_business",
+                "input_data": {},
+                "prediction_result": result
+            })
+        for start in range(0, 40, 7):
+            self.store.insert_predictions(entries[start:start + 7])
+
+    def tearDown(self):
+        self.store.close()
+        self.log_dir.cleanup()
+
+    def test_incremental_totals_match_rebuild(self):
+        summary, by_date = self.store.prediction_summary(), self.store.predictions_by_date(days=7)
+        self.assertEqual(summary["new_business"]["total"], 20)
+        self.assertEqual(summary["existing_business"]["unsuccessful"], 10)
+        self.assertEqual(by_date, {f"2025-11-{day}": 8 for day in range(20, 25)})
+        self.assertEqual(self.store.predictions_on_date("2025-11-22"), 8)
+
+        self.store.rebuild_aggregates()
+        rebuilt = self.store.prediction_summary()
+        for prediction_type, counts in summary.items():
+            for key, value in counts.items():
+                self.assertAlmostEqual(rebuilt[prediction_type][key], value)
+        self.assertEqual(self.store.predictions_by_date(days=7), by_date)
+
+    def test_keyset_pages_cover_every_prediction_once(self):
+        for order_by in ("id", "timestamp"):
+            seen, cursor = [], None
+            while True:
+                page, cursor = self.store.page_predictions(6, cursor=cursor, order_by=order_by, fields=["id", "timestamp"])
+                seen.extend(page)
+                if cursor is None:
+                    break
+            self.assertEqual(sorted(entry["id"] for entry in seen), list(range(1, 41)))
+            keys = [(entry[order_by], entry["id"]) for entry in seen]
+            self.assertEqual(keys, sorted(keys, reverse=True))
+
+        page, cursor = self.store.page_predictions(3, prediction_type="new_business", fields=["id", "outcome"])
+        self.assertEqual(page, [{"id": 38, "outcome": 0}, {"id": 37, "outcome": 1}, {"id": 34, "outcome": 0}])
+        self.assertEqual(cursor, "34")
+        with self.assertRaises(ValueError):
+            self.store.page_predictions(3, fields=["id", "secret"])
+        with self.assertRaises(ValueError):
+            self.store.page_predictions(3, cursor="abc", order_by="timestamp")
+
+    def test_rollup_range_queries(self):
+        daily = self.store.prediction_rollups("day", "2025-11-21", "2025-11-22")
+        self.assertEqual([bucket["bucket"] for bucket in daily], ["2025-11-21", "2025-11-22"])
+        self.assertEqual([bucket["total"] for bucket in daily], [8, 8])
+
+        hourly = self.store.prediction_rollups("hour", "2025-11-22", "2025-11-22", prediction_type="new_business")
+        self.assertEqual([bucket["bucket"] for bucket in hourly], ["2025-11-22T10", "2025-11-22T11"])
+        self.assertEqual([(bucket["total"], bucket["successful"]) for bucket in hourly], [(2, 2), (2, 0)])
+        self.assertAlmostEqual(hourly[0]["avg_success_probability"], 0.8)
+
+        # Bounds with a time of day are summed from the hourly buckets
+        self.assertEqual(self.store.prediction_summary("2025-11-20T11:00", "2025-11-20T11:59")["new_business"]["unsuccessful"], 2)
+        self.assertEqual(self.store.prediction_summary(start="2025-11-24")["existing_business"]["total"], 4)
+        self.assertEqual(self.store.prediction_summary(end="2025-11-19"), {})
+
+        # Other ISO forms are normalized before bucketing, rather than compared as text
+        self.assertEqual(self.store.prediction_summary("2025-11-20 11:00", "2025-11-20 11:59")["new_business"]["unsuccessful"], 2)
+        self.assertEqual(self.store.prediction_rollups("day", "20251121", "20251122"), daily)
+        self.assertEqual(self.store.prediction_rollups("hour", "20251122T10", "20251122T10"),
+                         self.store.prediction_rollups("hour", "2025-11-22T10:00", "2025-11-22T10:59"))
+
+    def test_normalize_time_bound(self):
+        self.assertEqual(normalize_time_bound("20251120"), "2025-11-20")
+        self.assertEqual(normalize_time_bound("2025-11-20 10:00"), "2025-11-20T10:00:00")
+        self.assertEqual(normalize_time_bound("20251120T1000"), "2025-11-20T10:00:00")
+        offset = datetime(2025, 11, 20, 10, tzinfo=timezone.utc).astimezone().replace(tzinfo=None).isoformat(timespec="seconds")
+        self.assertEqual(normalize_time_bound("2025-11-20T10:00Z"), offset)
+        self.assertEqual(normalize_time_bound("2025-11-20T12:00+02:00"), offset)
+        with self.assertRaises(ValueError):
+            normalize_time_bound("yesterday")
+
+        rollups = {resolution: self.store.prediction_rollups(resolution) for resolution in ("hour", "day")}
+        self.store.rebuild_aggregates()
+        for resolution, buckets in rollups.items():
+            self.assertEqual(self.store.prediction_rollups(resolution), buckets)
+
+    def test_totals_survive_restart(self):
+        summary = self.store.prediction_summary()
+        self.store.close()
+        self.store = SQLiteStore(self.path, legacy_prediction_files=[], legacy_feedback_file=None)
+        self.assertEqual(self.store.prediction_summary(), summary)
+
+    def test_rebuild_recovers_lost_aggregates(self):
+        connection = sqlite3.connect(self.path)
+        with connection:
+            connection.execute("UPDATE prediction_totals SET total = 0")
+            connection.execute("DELETE FROM prediction_rollups")
+        connection.close()
+
+        self.store.rebuild_aggregates()
+        self.assertEqual(self.store.count_predictions(), 40)
+        self.assertEqual(sum(self.store.predictions_by_date(days=7).values()), 40)
+
+
+class TestAdminEndpoints(IsolatedStoreTestCase):
+    """Admin responses keep their shapes when served from SQLite"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def log_sample_predictions(self):
+        main.log_predictions([
+            ("new_business", {"owner_age": 30}, NEW_SUCCESS),
+            ("new_business", {"owner_age": 40}, NEW_FAILURE),
+            ("new_business", {"owner_age": 50}, NEW_SUCCESS),
+            ("existing_business", {"business_capital": 1.0}, EXISTING_SUCCESS)
+        ])
+
+    def test_empty_store_messages(self):
+        self.assertEqual(self.client.get("/admin/dashboard").json()["message"], "No predictions logged yet")
+        self.assertEqual(self.client.get("/admin/predictions").json()["total"], 0)
+        self.assertEqual(self.client.get("/admin/stats").json(), {"message": "No predictions logged yet"})
+        self.assertEqual(self.client.get("/admin/messages").json()["messages"], [])
+
+    def test_dashboard(self):
+        self.log_sample_predictions()
+        dashboard = self.client.get("/admin/dashboard").json()
+
+        self.assertEqual(dashboard["total_predictions"], 4)
+        self.assertEqual(dashboard["new_business_predictions"], 3)
+        self.assertEqual(dashboard["existing_business_predictions"], 1)
+        self.assertEqual(dashboard["success_rate_new"], 66.67)
+        self.assertEqual(dashboard["success_rate_existing"], 100.0)
+        self.assertEqual(dashboard["predictions_today"], 4)
+        self.assertEqual(list(dashboard["predictions_by_date"].values()), [4])
+        self.assertEqual([entry["id"] for entry in dashboard["recent_predictions"]], [4, 3, 2, 1])
+
+    def test_predictions_filter_and_limit(self):
+        self.log_sample_predictions()
+        response = self.client.get("/admin/predictions", params={"limit": 2, "prediction_type": "new_business"}).json()
+
+        self.assertEqual(response["total"], 3)
+        self.assertEqual(response["returned"], 2)
+        self.assertEqual([entry["input_data"]["owner_age"] for entry in response["predictions"]], [50, 40])
+        self.assertEqual(response["filters"], {"prediction_type": "new_business", "limit": 2})
+
+    def test_predictions_cursor_and_fields(self):
+        self.log_sample_predictions()
+        first = self.client.get("/admin/predictions", params={"limit": 3, "fields": "id,prediction_type,success_probability"}).json()
+        self.assertEqual(first["predictions"][0], {"id": 4, "prediction_type": "existing_business", "success_probability": 0.9})
+        self.assertIsNotNone(first["next_cursor"])
+
+        second = self.client.get("/admin/predictions", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+        self.assertEqual([entry["id"] for entry in second["predictions"]], [1])
+        self.assertEqual(second["predictions"][0]["input_data"], {"owner_age": 30})
+        self.assertIsNone(second["next_cursor"])
+
+        self.assertEqual(self.client.get("/admin/predictions", params={"fields": "id,password"}).status_code, 400)
+        self.assertEqual(self.client.get("/admin/predictions", params={"order_by": "probability"}).status_code, 400)
+
+    def test_log_is_flushed_and_cleared_off_the_event_loop(self):
+        on_loop = []
+
+        def recording(method):
+            def call():
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append((method.__name__, True))
+                except RuntimeError:
+                    on_loop.append((method.__name__, False))
+                return method()
+            return call
+
+        main.prediction_log.flush = recording(main.prediction_log.flush)
+        main.prediction_log.clear = recording(main.prediction_log.clear)
+        for path in ("/admin/dashboard", "/admin/predictions", "/admin/stats", "/admin/timeseries"):
+            self.assertEqual(self.client.get(path).status_code, 200)
+        self.assertEqual(self.client.post("/admin/aggregates/rebuild").status_code, 200)
+        self.assertEqual(self.client.delete("/admin/predictions/clear").status_code, 200)
+        self.assertEqual(on_loop, [("flush", False)] * 5 + [("clear", False)])
+
+    def test_stats(self):
+        self.log_sample_predictions()
+        stats = self.client.get("/admin/stats").json()
+
+        self.assertEqual(stats["total_predictions"], 4)
+        self.assertEqual(stats["statistics"]["new_business"], {
+            "total": 3, "successful": 2, "unsuccessful": 1, "avg_success_probability": 0.6333,
+            "high_confidence": 2, "medium_confidence": 1, "low_confidence": 0
+        })
+        self.assertEqual(stats["statistics"]["existing_business"], {
+            "total": 1, "successful": 1, "unsuccessful": 0, "avg_success_probability": 0.9, "avg_confidence": 0.9
+        })
+
+    def test_time_range_queries(self):
+        self.log_sample_predictions()
+        today = datetime.now().date().isoformat()
+
+        timeseries = self.client.get("/admin/timeseries", params={"from": today, "to": today, "resolution": "hour"}).json()
+        self.assertEqual(timeseries["total"], 4)
+        self.assertEqual(timeseries["buckets"][0]["bucket"][:10], today)
+        self.assertEqual(self.client.get("/admin/timeseries", params={"to": "2000-01-01"}).json()["buckets"], [])
+        for start, end in ((f"{today} 00:00", f"{today} 23:59"), (today.replace("-", ""), today.replace("-", ""))):
+            response = self.client.get("/admin/timeseries", params={"from": start, "to": end, "resolution": "hour"}).json()
+            self.assertEqual(response["total"], 4)
+        self.assertEqual(response["filters"]["from"], today)
+
+        stats = self.client.get("/admin/stats", params={"from": today}).json()
+        self.assertEqual(stats["statistics"]["new_business"]["successful"], 2)
+        self.assertEqual(stats["range"], {"from": today, "to": None})
+        self.assertEqual(self.client.get("/admin/stats", params={"to": "2000-01-01"}).json()["message"], "No predictions logged in this range")
+
+        dashboard = self.client.get("/admin/dashboard", params={"from": today, "resolution": "hour"}).json()
+        self.assertEqual(sum(dashboard["predictions_by_date"].values()), 4)
+
+        self.assertEqual(self.client.get("/admin/timeseries", params={"resolution": "week"}).status_code, 400)
+        self.assertEqual(self.client.get("/admin/stats", params={"from": "yesterday"}).status_code, 400)
+
+    def test_clear_predictions(self):
+        self.assertEqual(self.client.delete("/admin/predictions/clear").json()["message"], "No prediction logs to clear")
+        self.log_sample_predictions()
+        self.assertEqual(self.client.delete("/admin/predictions/clear").json()["message"], "Prediction logs cleared successfully")
+        self.assertEqual(self.client.get("/admin/predictions").json()["total"], 0)
+
+    def test_feedback_round_trip(self):
+        for message in ("first", "second"):
+            response = self.client.post("/feedback", json={"prediction_type": "new_business", "message": message})
+            self.assertTrue(response.json()["success"])
+        self.assertEqual(response.json()["feedback_id"], 2)
+
+        self.assertEqual(self.client.patch("/admin/messages/1/read").status_code, 200)
+        self.assertEqual(self.client.patch("/admin/messages/99/read").status_code, 404)
+
+        messages = self.client.get("/admin/messages").json()
+        self.assertEqual((messages["total"], messages["unread"], messages["returned"]), (2, 1, 2))
+        self.assertEqual([message["message"] for message in messages["messages"]], ["second", "first"])
+
+        unread = self.client.get("/admin/messages", params={"status": "unread"}).json()
+        self.assertEqual([message["id"] for message in unread["messages"]], [2])
+        self.assertEqual(set(unread["messages"][0]), {"id", "timestamp", "name", "email", "prediction_type", "message", "status"})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
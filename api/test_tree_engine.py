@@ -0,0 +1,153 @@
+"""
+Tests for the compiled flat-array tree evaluator
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+import main
+from benchmark_preprocess import load_records
+from tree_engine import CompiledTreeEnsemble, compile_ensemble
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def existing_business_matrix():
+    """Scaled model rows for every business in the bundled existing business dataset"""
+    df = pd.read_csv(os.path.join(DATA_DIR, "sme_final_15k_enhanced.csv"))
+    businesses = [
+        main.ExistingBusinessData(
+            business_capital=max(float(row.business_capital), 1.0),
+            business_sector=row.business_sector,
+            turnover_first_year=float(row.turnover_2021),
+            turnover_second_year=float(row.turnover_2022),
+            turnover_third_year=float(row.turnover_2023),
+            turnover_fourth_year=float(row.turnover_2024),
+            employment_first_year=int(row.employment_2021),
+            employment_second_year=int(row.employment_2022),
+            employment_third_year=int(row.employment_2023),
+            employment_fourth_year=int(row.employment_2024)
+        )
+        for row in df.itertuples()
+    ]
+    columns = main.sanitize_existing_business_batch(businesses)
+    engineered = main.engineer_features_batch(columns)
+    encoded = main.encode_categorical_features_batch([b.business_sector for b in businesses], engineered)
+    return main.feature_scaler.transform(main.build_existing_feature_matrix(columns, engineered, encoded))
+
+
+class TestCompiledModels(unittest.TestCase):
+    """Compiled ensembles reproduce the bundled models on the bundled datasets"""
+
+    @classmethod
+    def setUpClass(cls):
+        main.load_models()
+
+    def test_existing_business_model_matches_predict_proba(self):
+        if main.xgb_model is None or main.feature_scaler is None:
+            self.skipTest("Existing business model not available")
+
+        matrix = existing_business_matrix()
+        compiled = compile_ensemble(main.xgb_model)
+        expected = main.xgb_model.predict_proba(matrix)
+
+        np.testing.assert_allclose(compiled.predict_proba(matrix), expected, atol=1e-6)
+        self.assertGreater(np.mean(compiled.predict_proba(matrix) == expected), 0.99)
+        np.testing.assert_array_equal(compiled.predict(matrix), main.xgb_model.predict(matrix))
+
+    def test_new_business_model_matches_predict_proba(self):
+        if main.trained_model is None:
+            self.skipTest("New business model not available")
+
+        matrix, _, _ = main.preprocess_business_batch(load_records(20000))
+        compiled = compile_ensemble(main.trained_model)
+        expected = main.trained_model.predict_proba(matrix)
+
+        np.testing.assert_allclose(compiled.predict_proba(matrix), expected, atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(matrix), main.trained_model.predict(matrix))
+
+
+class TestCompiledTreeEnsemble(unittest.TestCase):
+    """Split rules, missing values and the large-batch fallback follow the libraries"""
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.randn(400, 6)
+        self.y = (self.X[:, 0] + self.X[:, 1] * self.X[:, 2] > 0).astype(int)
+        self.X_missing = self.X.copy()
+        self.X_missing[rng.rand(*self.X.shape) < 0.1] = np.nan
+
+    def test_forest_with_missing_values(self):
+        model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(self.X_missing, self.y)
+        compiled = compile_ensemble(model)
+        np.testing.assert_allclose(compiled.predict_proba(self.X_missing), model.predict_proba(self.X_missing), atol=1e-12)
+
+    def test_xgboost_with_missing_values(self):
+        model = XGBClassifier(n_estimators=30, max_depth=4).fit(self.X_missing, self.y)
+        compiled = compile_ensemble(model)
+        np.testing.assert_allclose(compiled.predict_proba(self.X_missing), model.predict_proba(self.X_missing), atol=1e-6)
+
+    def test_large_inputs_use_fallback_model(self):
+        model = XGBClassifier(n_estimators=5, max_depth=3).fit(self.X, self.y)
+        compiled = compile_ensemble(model)
+        compiled.fallback_model, compiled.max_rows = model, 10
+        compiled.leaf_values[:] = 0  # the compiled walk now gives every row the base score
+
+        small = compiled.predict_proba(self.X[:10])
+        np.testing.assert_array_equal(small, np.repeat(small[:1], 10, axis=0))
+        np.testing.assert_array_equal(compiled.predict_proba(self.X), model.predict_proba(self.X))
+
+    def test_tree_path_contributions_add_up_to_the_output(self):
+        """Forest contributions sum to the positive-class probability, XGBoost's to the margin"""
+        forest = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(self.X_missing, self.y)
+        compiled = compile_ensemble(forest)
+        probabilities, contributions = compiled.predict_proba_with_contributions(self.X_missing)
+        np.testing.assert_allclose(probabilities, forest.predict_proba(self.X_missing), atol=1e-12)
+        np.testing.assert_allclose(contributions.sum(axis=1) + compiled.expected_value, probabilities[:, 1], atol=1e-12)
+
+        booster = XGBClassifier(n_estimators=30, max_depth=4).fit(self.X_missing, self.y)
+        compiled = compile_ensemble(booster)
+        probabilities, contributions = compiled.predict_proba_with_contributions(self.X_missing)
+        np.testing.assert_allclose(probabilities, booster.predict_proba(self.X_missing), atol=1e-6)
+        np.testing.assert_allclose(contributions.sum(axis=1) + compiled.expected_value,
+                                   booster.predict(self.X_missing, output_margin=True), atol=1e-5)
+
+    def test_xgboost_contributions_match_approx_contribs(self):
+        """XGBoost's approx_contribs is the same tree-path attribution"""
+        from xgboost import DMatrix
+        model = XGBClassifier(n_estimators=30, max_depth=4).fit(self.X_missing, self.y)
+        _, contributions = compile_ensemble(model).predict_proba_with_contributions(self.X_missing)
+        expected = model.get_booster().predict(DMatrix(self.X_missing), pred_contribs=True, approx_contribs=True)
+        np.testing.assert_allclose(contributions, expected[:, :-1], atol=1e-5)
+
+    def test_saved_ensembles_are_memory_mapped_read_only(self):
+        forest = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(self.X_missing, self.y)
+        booster = XGBClassifier(n_estimators=10, max_depth=3).fit(self.X_missing, self.y)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for model in (forest, booster):
+                compiled = compile_ensemble(model)
+                path = os.path.join(cache_dir, type(model).__name__)
+                compiled.save(path)
+                compiled.save(path)  # a second writer finds it in place
+                loaded = CompiledTreeEnsemble.load(path)
+
+                self.assertFalse(loaded.threshold.flags.writeable)  # mapped, not copied
+                np.testing.assert_array_equal(loaded.predict_proba(self.X_missing), compiled.predict_proba(self.X_missing))
+                np.testing.assert_array_equal(loaded.predict_proba_with_contributions(self.X_missing)[1],
+                                              compiled.predict_proba_with_contributions(self.X_missing)[1])
+                self.assertEqual(loaded.expected_value, compiled.expected_value)
+            self.assertEqual(sorted(os.listdir(cache_dir)), ["RandomForestClassifier", "XGBClassifier"])
+
+    def test_unsupported_model_raises(self):
+        with self.assertRaises(TypeError):
+            compile_ensemble(object())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,343 @@
+"""
+Flat array tree-ensemble evaluator for low-latency scoring
+
+Exports a fitted scikit-learn random forest or XGBoost binary classifier
+into contiguous NumPy arrays (feature index, threshold, children, leaf
+value) and scores rows by walking every tree at once with vectorized
+NumPy indexing, skipping the per-call overhead of the library wrappers.
+The same walk can also return tree-path (Saabas) feature contributions.
+The arrays can be saved as .npy files and memory-mapped read-only, so
+every worker process scores from the same pages.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+# Models scored by the compiled engine instead of their library wrapper, e.g. "new_business,existing_business"
+COMPILED_TREE_MODELS = {
+    name.strip() for name in os.environ.get("COMPILED_TREE_MODELS", "").split(",") if name.strip()
+}
+# Larger inputs go back to the library, whose native batch loop overtakes the NumPy walk
+COMPILED_TREE_MAX_ROWS = int(os.environ.get("COMPILED_TREE_MAX_ROWS", "16"))
+# Directory where compiled ensembles are stored once and memory-mapped by every process; empty compiles in memory
+COMPILED_TREE_CACHE_DIR = os.environ.get("COMPILED_TREE_CACHE_DIR", "")
+
+# Arrays written by save() and memory-mapped by load()
+ARRAY_FIELDS = ("feature", "threshold", "left", "right", "missing_left", "leaf_values", "roots", "node_values")
+
+
+class CompiledTreeEnsemble:
+    """A tree ensemble flattened into contiguous arrays.
+
+    All trees share one node array; leaves point to themselves so the walk
+    can run a fixed max_depth steps for every tree without branching.
+    Exposes predict, predict_proba and classes_ like the wrapped model.
+    With a fallback_model set, inputs over max_rows rows are scored by it.
+
+    node_values holds every node's expected positive-class output (the
+    class proportion for forests, the cover-weighted mean leaf margin for
+    XGBoost); the change along each row's path is credited to the split
+    feature, giving tree-path contributions.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, leaf_values, roots,
+                 max_depth, classes, kind, base_margin, node_values, n_features):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=bool)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.kind = kind  # "forest" (mean of leaf class probabilities) or "logistic" (sum of leaf margins)
+        self.base_margin = base_margin
+        self.fallback_model = None
+        self.max_rows = None
+        self.node_values = np.ascontiguousarray(node_values, dtype=np.float64)
+        self.n_features = int(n_features)
+
+        # Work in the same precision as the library: sklearn splits float32 inputs on float64
+        # thresholds with <=, XGBoost splits on float32 thresholds with < and sums leaves in float32
+        precision = np.float64 if kind == "forest" else np.float32
+        self.threshold = np.ascontiguousarray(threshold, dtype=precision)
+        self.leaf_values = np.ascontiguousarray(leaf_values, dtype=precision)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def expected_value(self) -> float:
+        """Output before any split: the base the contributions add to"""
+        total = self.node_values[self.roots].sum()
+        if self.kind == "forest":
+            return float(total / self.n_trees)
+        return float(self.base_margin + total)
+
+    @classmethod
+    def from_sklearn_forest(cls, model: Any) -> "CompiledTreeEnsemble":
+        """Flatten a fitted RandomForestClassifier"""
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        positive = 1 if len(model.classes_) > 1 else 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            missing.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)))
+            # Node values are class proportions; normalize in case of weighted counts
+            node_values = tree.value[:, 0, :]
+            values.append(node_values / node_values.sum(axis=1, keepdims=True))
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            leaf_values=np.concatenate(values),
+            roots=roots,
+            max_depth=max_depth,
+            classes=model.classes_,
+            kind="forest",
+            base_margin=0.0,
+            # Internal nodes keep their class proportions too
+            node_values=np.concatenate(values)[:, positive],
+            n_features=model.n_features_in_
+        )
+
+    @classmethod
+    def from_xgboost(cls, model: Any) -> "CompiledTreeEnsemble":
+        """Flatten a fitted binary:logistic XGBClassifier"""
+        learner = json.loads(model.get_booster().save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+        features, thresholds, lefts, rights, missing, values, means, roots = [], [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for tree in learner["gradient_booster"]["model"]["trees"]:
+            left = np.array(tree["left_children"])
+            right = np.array(tree["right_children"])
+            node_ids = np.arange(len(left))
+            is_leaf = left == -1
+            # Leaf nodes keep their output in split_conditions
+            split_conditions = np.array(tree["split_conditions"], dtype=np.float32)
+
+            features.append(np.where(is_leaf, 0, tree["split_indices"]))
+            thresholds.append(np.where(is_leaf, np.float32(0), split_conditions))
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            missing.append(np.array(tree["default_left"], dtype=bool))
+            values.append(np.where(is_leaf, split_conditions, np.float32(0))[:, None])
+            means.append(_node_means(left, right, split_conditions, np.array(tree["sum_hessian"], dtype=np.float64)))
+            roots.append(offset)
+
+            offset += len(left)
+            max_depth = max(max_depth, _tree_depth(left, right))
+
+        # base_score is stored as a probability; the trees add to its logit, computed as XGBoost does
+        base_score = np.float32(learner["learner_model_param"]["base_score"])
+        base_margin = -np.log(np.float32(1) / base_score - np.float32(1))
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            leaf_values=np.concatenate(values),
+            roots=roots,
+            max_depth=max_depth,
+            classes=model.classes_,
+            kind="logistic",
+            base_margin=base_margin,
+            node_values=np.concatenate(means),
+            n_features=int(learner["learner_model_param"]["num_feature"])
+        )
+
+    def save(self, path: str):
+        """Write the arrays to a directory of .npy files, plus a JSON header, that load() can memory-map.
+
+        The directory is written under a temporary name and renamed into
+        place, so concurrent writers never leave a partial ensemble behind.
+        """
+        staging = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        for field in ARRAY_FIELDS:
+            np.save(os.path.join(staging, f"{field}.npy"), getattr(self, field))
+        with open(os.path.join(staging, "ensemble.json"), "w") as f:
+            json.dump({
+                "kind": self.kind,
+                "max_depth": self.max_depth,
+                "classes": self.classes_.tolist(),
+                "base_margin": float(self.base_margin),
+                "n_features": self.n_features
+            }, f)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)  # another process saved it first
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "CompiledTreeEnsemble":
+        """Open an ensemble written by save(); its arrays are memory-mapped read-only unless mmap_mode is None"""
+        with open(os.path.join(path, "ensemble.json"), "r") as f:
+            header = json.load(f)
+        arrays = {field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode=mmap_mode) for field in ARRAY_FIELDS}
+        base_margin = header["base_margin"]
+        return cls(
+            **arrays,
+            max_depth=header["max_depth"],
+            classes=np.array(header["classes"]),
+            kind=header["kind"],
+            base_margin=np.float32(base_margin) if header["kind"] == "logistic" else base_margin,
+            n_features=header["n_features"]
+        )
+
+    def _prepare(self, X: Any) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X.astype(np.float64) if self.kind == "forest" else X
+
+    def apply(self, X: Any) -> np.ndarray:
+        """Return the (n_rows, n_trees) matrix of leaf node indices reached by each row"""
+        return self._walk(self._prepare(X))
+
+    def _walk(self, X: np.ndarray, contributions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Leaf indices per row and tree; adds each step's change in node value to contributions if given"""
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        rows = np.arange(X.shape[0])[:, None]
+        has_missing = np.isnan(X).any()
+        if contributions is not None:
+            # Flat (row, feature) slot of every tree's split, offset by row
+            row_offsets = rows * self.n_features
+
+        for _ in range(self.max_depth):
+            split_features = self.feature[nodes]
+            values = X[rows, split_features]
+            if self.kind == "forest":
+                go_left = values <= self.threshold[nodes]
+            else:
+                go_left = values < self.threshold[nodes]
+            if has_missing:
+                go_left = np.where(np.isnan(values), self.missing_left[nodes], go_left)
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            if contributions is not None:
+                # Leaves point to themselves, so finished trees add zero
+                contributions += np.bincount(
+                    (row_offsets + split_features).ravel(),
+                    weights=(self.node_values[children] - self.node_values[nodes]).ravel(),
+                    minlength=contributions.size
+                ).reshape(contributions.shape)
+            nodes = children
+
+        return nodes
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        if self.fallback_model is not None and np.ndim(X) == 2 and len(X) > self.max_rows:
+            return self.fallback_model.predict_proba(X)
+        return self._probabilities(self.apply(X))
+
+    def predict_proba_with_contributions(self, X: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Probabilities and (n_rows, n_features) tree-path contributions from one walk.
+
+        Contributions are for the positive class in the output space TreeSHAP
+        uses for the same model (probability for forests, log-odds for
+        XGBoost); each row's sum plus expected_value is that output. Unlike
+        predict_proba this never hands large inputs to the fallback model.
+        """
+        X = self._prepare(X)
+        contributions = np.zeros((X.shape[0], self.n_features), dtype=np.float64)
+        leaves = self._walk(X, contributions)
+        if self.kind == "forest":
+            contributions /= self.n_trees
+        return self._probabilities(leaves), contributions
+
+    def _probabilities(self, leaves: np.ndarray) -> np.ndarray:
+        if self.kind == "forest":
+            return self.leaf_values[leaves].mean(axis=1)
+
+        # Accumulate tree by tree from the base margin in float32, like XGBoost's predictor
+        contributions = np.empty((leaves.shape[0], leaves.shape[1] + 1), dtype=np.float32)
+        contributions[:, 0] = self.base_margin
+        contributions[:, 1:] = self.leaf_values[leaves, 0]
+        margin = np.cumsum(contributions, axis=1, dtype=np.float32)[:, -1]
+        positive = np.float32(1) / (np.float32(1) + np.exp(-margin.astype(np.float64)).astype(np.float32))
+        return np.column_stack([np.float32(1) - positive, positive])
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _node_means(left: np.ndarray, right: np.ndarray, leaf_values: np.ndarray, cover: np.ndarray) -> np.ndarray:
+    """Expected output of every node: its leaves' values weighted by cover (hessian sum)"""
+    means = np.where(left == -1, leaf_values, 0).astype(np.float64)
+    for node in range(len(left) - 1, -1, -1):  # children are numbered after their parent
+        if left[node] != -1:
+            l, r = left[node], right[node]
+            means[node] = (cover[l] * means[l] + cover[r] * means[r]) / (cover[l] + cover[r])
+    return means
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=int)
+    for node in range(len(left)):  # XGBoost numbers children after their parent
+        if left[node] != -1:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def compile_ensemble(model: Any) -> CompiledTreeEnsemble:
+    """Flatten a supported fitted ensemble"""
+    if hasattr(model, "get_booster"):
+        return CompiledTreeEnsemble.from_xgboost(model)
+    if hasattr(model, "estimators_"):
+        return CompiledTreeEnsemble.from_sklearn_forest(model)
+    raise TypeError(f"Cannot compile model of type {type(model).__name__}")
+
+
+def compile_shared(model: Any, key: Optional[str] = None) -> CompiledTreeEnsemble:
+    """Flatten a model, memory-mapping it from COMPILED_TREE_CACHE_DIR when that is set.
+
+    key names the model version (e.g. "existing_business:20251106_133503");
+    the first process to need it compiles and saves it, the rest map the
+    saved arrays. Without a cache directory or key it is compiled in memory.
+    """
+    if not COMPILED_TREE_CACHE_DIR or not key:
+        return compile_ensemble(model)
+    path = os.path.join(COMPILED_TREE_CACHE_DIR, key.replace(":", "_"))
+    if not os.path.isdir(path):
+        os.makedirs(COMPILED_TREE_CACHE_DIR, exist_ok=True)
+        compile_ensemble(model).save(path)
+    return CompiledTreeEnsemble.load(path)
+
+
+def select_scorer(name: str, model: Optional[Any], version: Optional[str] = None) -> Optional[Any]:
+    """Return the compiled ensemble when name is listed in COMPILED_TREE_MODELS, else the model itself"""
+    if model is None or name not in COMPILED_TREE_MODELS:
+        return model
+    compiled = compile_shared(model, f"{name}:{version}" if version else None)
+    compiled.fallback_model = model
+    compiled.max_rows = COMPILED_TREE_MAX_ROWS
+    return compiled